@@ -6,13 +6,16 @@ FastAPI server for the Traceback incident triage system.
 
 import os
 import sys
+import math
 import time
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Literal, Tuple
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 import uvicorn
 
@@ -20,6 +23,18 @@ import uvicorn
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
+from tracebackcore.scheduler import AdmissionScheduler, AdmissionRejected, AdmissionTicket
+from tracebackcore.feedback import FeedbackStore
+from tracebackcore.warmup import CacheWarmer
+from tracebackcore.impact import summarize_impact
+from tracebackcore.api.responses import CompressionMiddleware, json_response_class, project
+from tracebackcore import profiling
+from tracebackcore.subgraph import to_dot
+from tracebackcore.cascade import RetrieverCascade
+from tracebackcore import deadlines
+from tracebackcore.deadlines import DeadlineExceeded, ProviderUnavailable
+from tracebackcore.checkpoints import TriageConflict
+
 # Import our core system components
 # Global variables for the core system
 traceback_graph = None
@@ -27,15 +42,29 @@ lineage_retriever = None
 vectorstore = None
 llm = None
 
+# Admission control in front of the triage pipeline
+admission_scheduler = AdmissionScheduler.from_env()
+
+# Append-only feedback log (opened in lifespan)
+feedback_store = None
+
+# Optional startup cache warming (TRACEBACK_WARMUP=true)
+cache_warmer = None
+
+def make_search_filter(filters: Optional[Dict[str, Any]]):
+    """Build a Qdrant metadata filter (type, file_name, schema, pipeline) for a vector query."""
+    from tracebackcore.core import build_search_filter
+    return build_search_filter(filters)
+
 # Advanced retriever functions
-def generate_hybrid_response(question: str) -> Dict[str, Any]:
+def generate_hybrid_response(question: str, filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """Generate response using hybrid search (vector + BM25)."""
     try:
         # Simple hybrid implementation for evaluation
         import re
         
         # Get vector search results
-        docs = vectorstore.similarity_search(question, k=10)
+        docs = vectorstore.similarity_search(question, k=10, filter=make_search_filter(filters))
         
         # Simple BM25-style scoring
         query_words = set(re.findall(r'\b\w+\b', question.lower()))
@@ -80,23 +109,13 @@ Answer:"""
             'method': 'Hybrid Search (Error)'
         }
 
-def generate_lineage_aware_response(question: str) -> Dict[str, Any]:
+def generate_lineage_aware_response(question: str, filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """Generate response using lineage-aware retrieval."""
     try:
-        # Extract table names from question
-        import re
-        table_patterns = [
-            r'(curated\.\w+)',
-            r'(raw\.\w+)',
-            r'(analytics\.\w+)',
-            r'(bi\.\w+)',
-            r'(ops\.\w+)'
-        ]
-        
+        # Link table names in the question to lineage ids
         table_names = []
-        for pattern in table_patterns:
-            matches = re.findall(pattern, question.lower())
-            table_names.extend(matches)
+        if lineage_retriever:
+            table_names = lineage_retriever.find_tables(question)
         
         # Enhance query with lineage context
         enhanced_query = question
@@ -106,35 +125,46 @@ def generate_lineage_aware_response(question: str) -> Dict[str, Any]:
         # Search with enhanced query using lineage-aware retriever when available
         search_docs = []
         if lineage_retriever:
-            search_docs = lineage_retriever.search_with_lineage(enhanced_query, k=5)
+            search_docs = lineage_retriever.search_with_lineage(enhanced_query, k=5, filters=filters)
         else:
-            search_docs = vectorstore.similarity_search(enhanced_query, k=5)
+            search_docs = vectorstore.similarity_search(enhanced_query, k=5, filter=make_search_filter(filters))
         
-        docs = search_docs[:5]
-        context_docs = [doc.page_content for doc in docs]
-        context_sources = [
-            doc.metadata.get("file_name", doc.metadata.get("table", "unknown"))
-            for doc in docs
-        ]
+        return write_lineage_brief(question, search_docs[:5], table_names, 'Lineage-Aware Retrieval')
         
-        # Generate answer
-        context_text = "\n\n".join(context_docs)
-        
-        # Determine blast radius using lineage information
-        all_table_names = set(table_names)
-        table_regex_matches = re.findall(r'\b(?:raw|curated|analytics|bi|ops)\.[a-z0-9_]+\b', context_text, flags=re.IGNORECASE)
-        for table in table_regex_matches:
-            all_table_names.add(table.lower())
-        
-        blast_radius = []
-        if lineage_retriever and all_table_names:
-            downstream = []
-            for table_name in all_table_names:
-                downstream.extend(lineage_retriever.find_downstream_impact(table_name))
-            blast_radius = sorted(set(downstream))
-        
-        # Generate comprehensive incident brief
-        brief_prompt = f"""
+    except Exception as e:
+        return {
+            'question': question,
+            'answer': f"Error generating response: {str(e)}",
+            'context': [],
+            'blast_radius': [],
+            'method': 'Lineage-Aware Retrieval (Error)'
+        }
+
+def write_lineage_brief(question: str, docs: List[Any], table_names: List[str], method: str) -> Dict[str, Any]:
+    """Incident brief over retrieved documents, with blast radius and affected assets from lineage."""
+    context_docs = [doc.page_content for doc in docs]
+    context_sources = [
+        doc.metadata.get("file_name", doc.metadata.get("table", "unknown"))
+        for doc in docs
+    ]
+    
+    # Generate answer
+    context_text = "\n\n".join(context_docs)
+    
+    # Determine blast radius using lineage information
+    blast_radius = []
+    affected_assets = None
+    if lineage_retriever:
+        # Single linear pass over the retrieved context for further table mentions
+        all_table_names = set(table_names) | set(lineage_retriever.find_tables(context_text, fuzzy=False))
+        downstream = []
+        for table_name in all_table_names:
+            downstream.extend(lineage_retriever.find_downstream_impact(table_name))
+        blast_radius = sorted(set(downstream))
+        affected_assets = lineage_retriever.find_affected_assets(sorted(all_table_names))
+    
+    # Generate comprehensive incident brief
+    brief_prompt = f"""
 You are the Incident Writer for the Traceback data pipeline triage system.
 
 Question: {question}
@@ -144,6 +174,8 @@ Context:
 
 Known downstream impact: {', '.join(blast_radius) if blast_radius else 'None identified'}
 
+Affected {summarize_impact(affected_assets)}
+
 Compose a single, structured incident brief that blends business and technical insights using these sections:
 1. **Incident Summary**
 2. **Business Impact**
@@ -155,32 +187,50 @@ Compose a single, structured incident brief that blends business and technical i
 
 Use concise paragraphs or bullet points under each heading.
 """
-        brief_response = llm.invoke(brief_prompt)
+    degraded = False
+    try:
+        with deadlines.stage("writer"):
+            brief_response = llm.invoke(brief_prompt)
         incident_brief = brief_response.content if hasattr(brief_response, 'content') else str(brief_response)
-        
-        return {
-            'question': question,
-            'incident_brief': incident_brief,
-            'blast_radius': blast_radius,
-            'context': context_docs,
-            'sources': context_sources,
-            'method': 'Lineage-Aware Retrieval'
-        }
-        
-    except Exception as e:
-        return {
-            'question': question,
-            'answer': f"Error generating response: {str(e)}",
-            'context': [],
-            'blast_radius': [],
-            'method': 'Lineage-Aware Retrieval (Error)'
-        }
+    except (ProviderUnavailable, DeadlineExceeded) as e:
+        from tracebackcore.core import render_degraded_brief, lineage_only_assessment
+        print(f"⚠️ {method} brief degraded to lineage only: {e}")
+        incident_brief = render_degraded_brief(
+            question, lineage_only_assessment(blast_radius, affected_assets), blast_radius, affected_assets,
+            "full brief skipped: provider unavailable or out of time"
+        )
+        degraded = True
+    
+    return {
+        'question': question,
+        'incident_brief': incident_brief,
+        'blast_radius': blast_radius,
+        'context': context_docs,
+        'sources': context_sources,
+        'affected_assets': affected_assets,
+        'degraded': degraded,
+        'method': method
+    }
+
+def cohere_rerank(question: str, documents: List[str], top_n: int = 5) -> List[Tuple[int, float]]:
+    """(index, relevance score) of the ``top_n`` documents most relevant to the question, per Cohere."""
+    import cohere
+    cohere_client = cohere.Client(os.getenv("COHERE_API_KEY"), timeout=deadlines.PROVIDER_TIMEOUT)
+    with deadlines.stage("rerank"):
+        rerank_response = deadlines.breaker("cohere").call(
+            cohere_client.rerank,
+            model="rerank-english-v2.0",
+            query=question,
+            documents=documents,
+            top_n=top_n
+        )
+    return [(result.index, result.relevance_score) for result in rerank_response.results]
 
-def generate_cohere_reranking_response(question: str) -> Dict[str, Any]:
+def generate_cohere_reranking_response(question: str, filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """Generate response using Cohere reranking."""
     try:
         # Get documents from vectorstore
-        docs = vectorstore.similarity_search(question, k=10)  # Get more candidates for reranking
+        docs = vectorstore.similarity_search(question, k=10, filter=make_search_filter(filters))  # Get more candidates for reranking
         context_docs = [doc.page_content for doc in docs]
         
         if not context_docs:
@@ -193,19 +243,8 @@ def generate_cohere_reranking_response(question: str) -> Dict[str, Any]:
         
         # Use Cohere reranking if available
         try:
-            import cohere
-            cohere_client = cohere.Client(os.getenv("COHERE_API_KEY"))
-            
-            # Rerank the documents
-            rerank_response = cohere_client.rerank(
-                model="rerank-english-v2.0",
-                query=question,
-                documents=context_docs,
-                top_n=5  # Fixed parameter name
-            )
-            
             # Get top reranked documents
-            reranked_docs = [doc.document.text for doc in rerank_response.results]
+            reranked_docs = [context_docs[index] for index, _ in cohere_rerank(question, context_docs, top_n=5)]
             context_text = "\n\n".join(reranked_docs)
             
         except Exception as e:
@@ -239,11 +278,9 @@ Answer:"""
             'method': 'Cohere Reranking (Error)'
         }
 
-def generate_query_expansion_response(question: str) -> Dict[str, Any]:
-    """Generate response using query expansion."""
-    try:
-        # Expand the query
-        expansion_prompt = f"""Given this question: "{question}"
+def expand_query(question: str) -> List[str]:
+    """Up to 3 alternative phrasings of the question (one LLM call)."""
+    expansion_prompt = f"""Given this question: "{question}"
 
 Generate 3 alternative phrasings that might help find relevant information:
 1. Technical/implementation focused version
@@ -252,20 +289,25 @@ Generate 3 alternative phrasings that might help find relevant information:
 
 Return only the 3 alternative questions, one per line."""
 
+    with deadlines.stage("expansion"):
         expansion_response = llm.invoke(expansion_prompt)
-        expansion_text = expansion_response.content if hasattr(expansion_response, 'content') else str(expansion_response)
-        
-        # Parse expanded queries
-        expanded_queries = [line.strip() for line in expansion_text.split('\n') if line.strip()]
-        expanded_queries = [q for q in expanded_queries if not q.startswith(('1.', '2.', '3.'))]
-        
+    expansion_text = expansion_response.content if hasattr(expansion_response, 'content') else str(expansion_response)
+    
+    # Parse expanded queries
+    expanded_queries = [line.strip() for line in expansion_text.split('\n') if line.strip()]
+    expanded_queries = [q for q in expanded_queries if not q.startswith(('1.', '2.', '3.'))]
+    return expanded_queries[:3]
+
+def generate_query_expansion_response(question: str, filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Generate response using query expansion."""
+    try:
         # Add original query
-        all_queries = [question] + expanded_queries[:3]
+        all_queries = [question] + expand_query(question)
         
         # Search for each query and combine results
         all_docs = []
         for query in all_queries:
-            docs = vectorstore.similarity_search(query, k=3)
+            docs = vectorstore.similarity_search(query, k=3, filter=make_search_filter(filters))
             all_docs.extend(docs)
         
         # Remove duplicates and get top 5
@@ -307,26 +349,52 @@ Answer:"""
             'method': 'Query Expansion (Error)'
         }
 
+def generate_auto_response(question: str, filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Generate response from the cheapest retrieval stage that is confident enough (see cascade.py)."""
+    try:
+        cascade = RetrieverCascade(
+            vectorstore,
+            lineage_retriever,
+            rerank=cohere_rerank if os.getenv("COHERE_API_KEY") else None,
+            expand=expand_query
+        )
+        selected = cascade.run(question, filters)
+        result = write_lineage_brief(question, selected.documents, selected.table_names, f"Auto ({selected.stage})")
+        result['confidence'] = selected.confidence
+        result['decision_trail'] = selected.trail
+        return result
+        
+    except Exception as e:
+        return {
+            'question': question,
+            'answer': f"Error generating response: {str(e)}",
+            'context': [],
+            'blast_radius': [],
+            'method': 'Auto (Error)'
+        }
+
 # Available retriever methods
 RETRIEVER_METHODS = {
     'Original RAG': None,  # Use default traceback_graph
     'Hybrid Search': generate_hybrid_response,
     'Lineage-Aware Retrieval': generate_lineage_aware_response,
     'Cohere Reranking': generate_cohere_reranking_response,
-    'Query Expansion': generate_query_expansion_response
+    'Query Expansion': generate_query_expansion_response,
+    'Auto': generate_auto_response
 }
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Initialize the Traceback system on startup."""
-    global traceback_graph, lineage_retriever, vectorstore, llm
+    global traceback_graph, lineage_retriever, vectorstore, llm, feedback_store, cache_warmer
     
     print("🚀 Initializing Traceback system...")
     
     try:
-        # Initialize core components
-        from tracebackcore.core import initialize_system
-        initialize_system()
+        # Initialize core components (importing core already initializes it once)
+        from tracebackcore import core
+        if core.traceback_graph is None:
+            core.initialize_system()
         
         # Update global variables
         from tracebackcore.core import traceback_graph as tg, lineage_retriever as lr, vectorstore as vs, llm as llm_obj
@@ -335,6 +403,15 @@ async def lifespan(app: FastAPI):
         vectorstore = vs
         llm = llm_obj
         
+        feedback_store = FeedbackStore()
+        
+        # Warm caches for critical tables in the background so readiness isn't delayed
+        if os.getenv("TRACEBACK_WARMUP", "false").lower() in ("1", "true", "yes"):
+            from tracebackcore.core import create_initial_state
+            cache_warmer = CacheWarmer.from_env(lineage_retriever, traceback_graph, create_initial_state)
+            cache_warmer.start_background()
+            print(f"🔥 Warming caches for top {cache_warmer.top_n} critical tables in the background")
+        
         print("✅ Traceback system initialized successfully")
         
     except Exception as e:
@@ -344,15 +421,28 @@ async def lifespan(app: FastAPI):
     yield
     
     print("🛑 Shutting down Traceback system...")
+    if feedback_store:
+        feedback_store.close()
+    from tracebackcore import core
+    if core.incident_history:
+        core.incident_history.close()
 
 # Create FastAPI app
 app = FastAPI(
     title="Traceback API",
     description="AI-powered data pipeline incident triage system",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=json_response_class()
 )
 
+# br/gzip per Accept-Encoding for larger responses (see responses.py)
+app.add_middleware(CompressionMiddleware)
+
+# Per-request profiles for callers presenting TRACEBACK_PROFILE_TOKEN (see profiling.py)
+if profiling.PROFILE_TOKEN:
+    app.add_middleware(profiling.ProfilingMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -368,6 +458,10 @@ class IncidentRequest(BaseModel):
     priority: Optional[str] = "medium"
     context: Optional[Dict[str, Any]] = None
     retriever: Optional[str] = "Original RAG"
+    single_pass: Optional[bool] = None
+    filters: Optional[Dict[str, Any]] = None
+    triage_id: Optional[str] = None  # Re-requesting a known id resumes it (409 for a different question)
+    timeout: Optional[float] = None  # Seconds the caller will wait (capped by TRACEBACK_TRIAGE_DEADLINE)
 
 class IncidentResponse(BaseModel):
     incident_brief: str
@@ -375,6 +469,23 @@ class IncidentResponse(BaseModel):
     impact_assessment: Dict[str, Any]
     processing_time: float
     sources_used: List[str]
+    priority: str = "medium"
+    queue_wait_time: float = 0.0
+    degraded: bool = False
+    feedback_id: Optional[str] = None
+    affected_dashboards: List[Dict[str, Any]] = []
+    affected_teams: List[str] = []
+    affected_owners: List[str] = []
+    triage_id: Optional[str] = None
+
+class FeedbackRequest(BaseModel):
+    question: str
+    interaction_id: Optional[str] = None
+    rating: Optional[int] = None
+    comment: Optional[str] = None
+    retriever: Optional[str] = None
+    tables: Optional[List[str]] = None
+    response: Optional[str] = None
 
 class HealthResponse(BaseModel):
     status: str
@@ -422,95 +533,327 @@ async def get_available_retrievers():
             "Hybrid Search": "Vector search combined with BM25 scoring",
             "Lineage-Aware Retrieval": "Context-aware search with data lineage",
             "Cohere Reranking": "Advanced reranking with Cohere API",
-            "Query Expansion": "Semantic query enhancement with multiple search strategies"
+            "Query Expansion": "Semantic query enhancement with multiple search strategies",
+            "Auto": "Cheapest retrieval first, escalating to lineage, reranking and expansion only when confidence is low"
         }
     }
 
+def affected_asset_fields(question: str, affected_assets: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """IncidentResponse fields for the dashboards, teams and owners affected by a question."""
+    if affected_assets is None:
+        affected_assets = lineage_retriever.find_affected_assets(lineage_retriever.find_tables(question)) if lineage_retriever else {}
+    return {
+        "affected_dashboards": affected_assets.get("dashboards", []),
+        "affected_teams": affected_assets.get("teams", []),
+        "affected_owners": affected_assets.get("owners", [])
+    }
+
+def run_triage(request: IncidentRequest, ticket: AdmissionTicket) -> IncidentResponse:
+    """Run a single admitted triage request."""
+    start_time = time.time()
+    
+    # Check if using advanced retriever
+    retriever_method = request.retriever or "Original RAG"
+    
+    # While the LLM provider's circuit is open, answer from caches and lineage alone
+    degraded = ticket.degraded or not deadlines.breaker("openai").available()
+    
+    # Degraded requests always take the cheapest path (Original RAG without the writer call)
+    if not degraded and retriever_method != "Original RAG" and retriever_method in RETRIEVER_METHODS:
+        # Use advanced retriever
+        retriever_func = RETRIEVER_METHODS[retriever_method]
+        if retriever_func:
+            result = retriever_func(request.question, filters=request.filters)
+            
+            processing_time = time.time() - start_time
+            
+            # Convert advanced retriever result to IncidentResponse format
+            incident_brief = result.get("incident_brief") or result.get("answer", "No response generated")
+            blast_radius = result.get("blast_radius", [])
+            context_sources = result.get("sources", [])
+            impact_assessment_value = result.get("impact_assessment") or "See incident brief for combined analysis."
+
+            impact_assessment = {
+                "assessment": impact_assessment_value,
+                "context_sources": [{"source": src} for src in context_sources] or [{"source": f"Advanced Retriever: {retriever_method}"}],
+                "method": result.get("method", retriever_method)
+            }
+            if result.get("decision_trail"):
+                impact_assessment["confidence"] = result["confidence"]
+                impact_assessment["decision_trail"] = result["decision_trail"]
+            
+            return IncidentResponse(
+                incident_brief=incident_brief,
+                blast_radius=blast_radius,
+                impact_assessment=impact_assessment,
+                processing_time=processing_time,
+                sources_used=context_sources if context_sources else [f"Advanced Retriever: {retriever_method}"],
+                priority=ticket.priority,
+                queue_wait_time=ticket.queue_wait_time,
+                degraded=bool(result.get("degraded")),
+                **affected_asset_fields(request.question, result.get("affected_assets"))
+            )
+    
+    # Use original RAG workflow
+    from tracebackcore import core
+    from tracebackcore.core import run_triage_graph
+    
+    # Briefs precomputed by the cache warmer for this question, options and lineage version
+    result = None
+    if cache_warmer and not request.filters and not request.triage_id:
+        result = cache_warmer.get_brief(
+            request.question,
+            single_pass=core.SINGLE_PASS_DEFAULT if request.single_pass is None else request.single_pass,
+            degraded=degraded,
+            lineage_version=getattr(core.lineage_retriever, "lineage_version", None)
+        )
+    
+    if result is None:
+        # Checkpointed per node, so a retry with the same triage_id resumes
+        result = run_triage_graph(
+            request.question,
+            triage_id=request.triage_id,
+            degraded=degraded,
+            single_pass=request.single_pass,
+            filters=request.filters,
+            priority=request.priority
+        )
+    
+    processing_time = time.time() - start_time
+    
+    # Extract sources used
+    sources_used = []
+    if result.get("impact_assessment"):
+        assessment = result["impact_assessment"]
+        if isinstance(assessment, dict):
+            context_sources = assessment.get("context_sources", [])
+            sources_used = [source.get("source", "unknown") for source in context_sources]
+    
+    return IncidentResponse(
+        incident_brief=result.get("incident_brief", "No brief generated"),
+        blast_radius=result.get("blast_radius", []),
+        impact_assessment=result.get("impact_assessment", {}),
+        processing_time=processing_time,
+        sources_used=sources_used,
+        priority=ticket.priority,
+        queue_wait_time=ticket.queue_wait_time,
+        degraded=bool(result.get("degraded")),
+        triage_id=result.get("triage_id"),
+        **affected_asset_fields(request.question, result.get("affected_assets"))
+    )
+
+def log_interaction(request: IncidentRequest, response: IncidentResponse) -> Optional[str]:
+    """Queue the triage interaction in the feedback log (never blocks on disk)."""
+    if not feedback_store:
+        return None
+    tables = list(response.blast_radius)
+    if lineage_retriever:
+        tables.extend(lineage_retriever.find_tables(request.question))
+    return feedback_store.submit(
+        question=request.question,
+        kind="interaction",
+        retriever=request.retriever or "Original RAG",
+        priority=response.priority,
+        response=response.incident_brief,
+        tables=tables,
+        payload={
+            "processing_time": response.processing_time,
+            "queue_wait_time": response.queue_wait_time,
+            "degraded": response.degraded,
+            "sources_used": response.sources_used
+        }
+    )
+
+def admit_and_run_triage(request: IncidentRequest) -> IncidentResponse:
+    """Wait for admission according to priority, then run the triage, all within the request deadline."""
+    with deadlines.request_deadline(deadlines.budget(request.timeout)):
+        with admission_scheduler.admit(request.priority) as ticket:
+            response = run_triage(request, ticket)
+    response.feedback_id = log_interaction(request, response)
+    return response
+
+# Response projections shared by endpoints with large payloads
+FIELDS_QUERY = Query(None, description="Comma-separated fields to return (dotted paths for nested fields)")
+INCLUDE_CONTEXT_QUERY = Query(True, description="false drops retrieved document text from the response")
+
 @app.post("/incident/triage", response_model=IncidentResponse)
-async def triage_incident(request: IncidentRequest):
+async def triage_incident(
+    request: IncidentRequest,
+    fields: Optional[str] = FIELDS_QUERY,
+    include_context: bool = INCLUDE_CONTEXT_QUERY
+):
     """Main incident triage endpoint."""
     if not traceback_graph:
         raise HTTPException(status_code=503, detail="Traceback system not initialized")
     
-    start_time = time.time()
-    
     try:
-        # Check if using advanced retriever
-        retriever_method = request.retriever or "Original RAG"
-        
-        if retriever_method != "Original RAG" and retriever_method in RETRIEVER_METHODS:
-            # Use advanced retriever
-            retriever_func = RETRIEVER_METHODS[retriever_method]
-            if retriever_func:
-                result = retriever_func(request.question)
-                
-                processing_time = time.time() - start_time
-                
-                # Convert advanced retriever result to IncidentResponse format
-                incident_brief = result.get("incident_brief") or result.get("answer", "No response generated")
-                blast_radius = result.get("blast_radius", [])
-                context_sources = result.get("sources", [])
-                impact_assessment_value = result.get("impact_assessment") or "See incident brief for combined analysis."
-
-                impact_assessment = {
-                    "assessment": impact_assessment_value,
-                    "context_sources": [{"source": src} for src in context_sources] or [{"source": f"Advanced Retriever: {retriever_method}"}],
-                    "method": result.get("method", retriever_method)
-                }
-                
-                return IncidentResponse(
-                    incident_brief=incident_brief,
-                    blast_radius=blast_radius,
-                    impact_assessment=impact_assessment,
-                    processing_time=processing_time,
-                    sources_used=context_sources if context_sources else [f"Advanced Retriever: {retriever_method}"]
-                )
-        
-        # Use original RAG workflow
-        from tracebackcore.core import AgentState
-        
-        initial_state = AgentState(
-            question=request.question,
-            context=[],
-            impact_assessment=None,
-            blast_radius=None,
-            recommended_actions=None,
-            incident_brief=None,
-            current_step="supervisor",
-            error=None
+        # Run in the threadpool so queued requests don't block the event loop
+        response = await run_in_threadpool(profiling.profiled(admit_and_run_triage), request)
+        return project(response, fields, include_context)
+        
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Incident triage shed: {str(e)}",
+            headers={"Retry-After": "5"}
         )
-        
-        result = traceback_graph.invoke(initial_state)
-        
-        processing_time = time.time() - start_time
-        
-        # Extract sources used
-        sources_used = []
-        if result.get("impact_assessment"):
-            assessment = result["impact_assessment"]
-            if isinstance(assessment, dict):
-                context_sources = assessment.get("context_sources", [])
-                sources_used = [source.get("source", "unknown") for source in context_sources]
-        
-        return IncidentResponse(
-            incident_brief=result.get("incident_brief", "No brief generated"),
-            blast_radius=result.get("blast_radius", []),
-            impact_assessment=result.get("impact_assessment", {}),
-            processing_time=processing_time,
-            sources_used=sources_used
+    except ProviderUnavailable as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Incident triage unavailable: {str(e)}",
+            headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))}
         )
-        
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=f"Incident triage timed out: {str(e)}")
+    except TriageConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Incident triage failed: {str(e)}")
 
+@app.get("/incident/triage/{triage_id}")
+async def get_triage_checkpoints(triage_id: str):
+    """Get the status and per-node checkpoints of a triage run."""
+    from tracebackcore import core
+    if not core.checkpoint_store:
+        raise HTTPException(status_code=503, detail="Triage checkpoints are disabled")
+    triage = core.checkpoint_store.get_triage(triage_id)
+    if triage is None:
+        raise HTTPException(status_code=404, detail=f"Triage {triage_id} not found")
+    return triage
+
+@app.post("/incident/triage/{triage_id}/resume", response_model=IncidentResponse)
+async def resume_incident_triage(
+    triage_id: str,
+    priority: str = "medium",
+    fields: Optional[str] = FIELDS_QUERY,
+    include_context: bool = INCLUDE_CONTEXT_QUERY
+):
+    """Resume a failed or interrupted triage from its last completed node."""
+    from tracebackcore import core
+    if not core.checkpoint_store:
+        raise HTTPException(status_code=503, detail="Triage checkpoints are disabled")
+    triage = core.checkpoint_store.get_triage(triage_id)
+    if triage is None:
+        raise HTTPException(status_code=404, detail=f"Triage {triage_id} not found")
+    
+    request = IncidentRequest(
+        question=triage["question"],
+        priority=priority,
+        single_pass=triage["options"].get("single_pass"),
+        filters=triage["options"].get("filters"),
+        triage_id=triage_id
+    )
+    return await triage_incident(request, fields=fields, include_context=include_context)
+
+@app.get("/incidents/similar")
+async def get_similar_incidents(
+    q: str = Query(..., min_length=1, description="Incident question or alert text"),
+    table: Optional[List[str]] = Query(None, description="Table ids (default: tables linked from q)"),
+    k: int = Query(3, ge=1, le=50)
+):
+    """Most similar past incidents by vector, keyword and table-id indexes."""
+    from tracebackcore import core
+    if not core.incident_history:
+        raise HTTPException(status_code=503, detail="Incident history is disabled")
+    tables = table or (lineage_retriever.find_tables(q) if lineage_retriever else [])
+    start = time.perf_counter()
+    incidents = await run_in_threadpool(profiling.profiled(core.incident_history.similar), q, tables, k)
+    return {
+        "query": q,
+        "tables": tables,
+        "incidents": incidents,
+        "search_time_ms": (time.perf_counter() - start) * 1000
+    }
+
+@app.get("/system/warmup")
+async def get_warmup_status():
+    """Get cache warm-up progress, table ranking and cache hit counters."""
+    return {
+        "enabled": cache_warmer is not None,
+        "status": cache_warmer.status if cache_warmer else None,
+        "cache_stats": lineage_retriever.cache_stats if lineage_retriever else None
+    }
+
+@app.get("/system/scheduler")
+async def get_scheduler_stats():
+    """Get admission scheduler load and per-priority queue wait statistics."""
+    return admission_scheduler.get_stats()
+
+@app.post("/feedback")
+async def submit_feedback(request: FeedbackRequest):
+    """Record user feedback; the write is batched in the background."""
+    if not feedback_store:
+        raise HTTPException(status_code=503, detail="Feedback store not initialized")
+    
+    tables = list(request.tables or [])
+    if lineage_retriever:
+        tables.extend(lineage_retriever.find_tables(request.question))
+    
+    feedback_id = feedback_store.submit(
+        question=request.question,
+        kind="feedback",
+        retriever=request.retriever,
+        interaction_id=request.interaction_id,
+        rating=request.rating,
+        comment=request.comment,
+        response=request.response,
+        tables=tables
+    )
+    return {"id": feedback_id, "status": "queued"}
+
+@app.get("/feedback")
+async def list_feedback(
+    question: Optional[str] = None,
+    table: Optional[str] = None,
+    retriever: Optional[str] = None,
+    kind: Optional[str] = None,
+    interaction_id: Optional[str] = None,
+    limit: int = 50
+):
+    """Look up recent feedback by question, table, retriever method or interaction."""
+    if not feedback_store:
+        raise HTTPException(status_code=503, detail="Feedback store not initialized")
+    
+    entries = feedback_store.lookup(
+        question=question,
+        table=table,
+        retriever=retriever,
+        kind=kind,
+        interaction_id=interaction_id,
+        limit=limit
+    )
+    return {"entries": entries, "total": len(entries)}
+
+@app.get("/feedback/{feedback_id}")
+async def get_feedback(feedback_id: str):
+    """Get a single feedback entry."""
+    if not feedback_store:
+        raise HTTPException(status_code=503, detail="Feedback store not initialized")
+    
+    entry = feedback_store.get(feedback_id)
+    if not entry:
+        raise HTTPException(status_code=404, detail=f"Feedback {feedback_id} not found")
+    return entry
+
 @app.get("/incident/search")
-async def search_documents(query: str, limit: int = 5):
-    """Search documents using RAG."""
+async def search_documents(
+    query: str,
+    limit: int = 5,
+    type: Optional[List[str]] = Query(None, description="Document type(s): markdown, sql, lineage"),
+    file_name: Optional[List[str]] = Query(None, description="Source file name(s)"),
+    schema: Optional[List[str]] = Query(None, description="Schema(s) referenced by the document"),
+    pipeline: Optional[List[str]] = Query(None, description="Pipeline id(s), e.g. sales_orders_pipeline"),
+    fields: Optional[str] = FIELDS_QUERY,
+    include_context: bool = INCLUDE_CONTEXT_QUERY
+):
+    """Search documents using RAG, with metadata filters pushed down into the vector query."""
     if not lineage_retriever:
         raise HTTPException(status_code=503, detail="RAG system not initialized")
     
+    filters = {"type": type, "file_name": file_name, "schema": schema, "pipeline": pipeline}
+    
     try:
-        results = lineage_retriever.search_with_lineage(query, k=limit)
+        results = lineage_retriever.search_with_lineage(query, k=limit, filters=filters)
         
         search_results = []
         for doc in results:
@@ -521,45 +864,131 @@ async def search_documents(query: str, limit: int = 5):
                 "metadata": doc.metadata
             })
         
-        return {
+        return project({
             "query": query,
+            "filters": {key: value for key, value in filters.items() if value},
             "results": search_results,
             "total": len(search_results)
-        }
+        }, fields, include_context)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
 
+@app.get("/suggest")
+async def suggest_names(
+    prefix: str = Query(..., min_length=1, max_length=200, description="Start of a table, dashboard or pipeline id or name"),
+    limit: int = Query(10, ge=1, le=50)
+):
+    """Autocomplete lineage names, most critical first (cheap enough for every keystroke)."""
+    if not lineage_retriever:
+        raise HTTPException(status_code=503, detail="Lineage system not initialized")
+    
+    start = time.perf_counter()
+    suggestions = lineage_retriever.suggest_index.suggest(prefix, limit)
+    return {
+        "prefix": prefix,
+        "suggestions": suggestions,
+        "elapsed_ms": (time.perf_counter() - start) * 1000
+    }
+
 @app.get("/lineage/{table_name}")
-async def get_lineage(table_name: str):
-    """Get lineage information for a specific table."""
+async def get_lineage(
+    table_name: str,
+    direction: Literal["both", "upstream", "downstream"] = "both",
+    max_depth: Optional[int] = Query(None, ge=1, description="Maximum hops from the table"),
+    limit: int = Query(100, ge=1, le=1000, description="Nodes per direction per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from a previous page (single direction only)"),
+    order: Literal["distance", "criticality"] = "distance",
+    fields: Optional[str] = FIELDS_QUERY
+):
+    """Get lineage information for a specific table.
+
+    Nodes carry their hop distance and path from the table; results are
+    paginated per direction and ordered by distance or dashboard criticality.
+    """
     if not lineage_retriever:
         raise HTTPException(status_code=503, detail="Lineage system not initialized")
+    if cursor and direction == "both":
+        raise HTTPException(status_code=400, detail="cursor requires direction=upstream or direction=downstream")
     
     try:
-        downstream = lineage_retriever.find_downstream_impact(table_name)
-        upstream = lineage_retriever.find_upstream_dependencies(table_name)
-        
-        return {
-            "table": table_name,
-            "upstream_dependencies": upstream,
-            "downstream_impact": downstream,
-            "total_dependencies": len(upstream) + len(downstream)
+        directions = ["upstream", "downstream"] if direction == "both" else [direction]
+        pages = {
+            name: lineage_retriever.traverse(
+                table_name, name, max_depth=max_depth, limit=limit, cursor=cursor, order=order
+            )
+            for name in directions
         }
+        upstream = pages.get("upstream", {}).get("nodes", [])
+        downstream = pages.get("downstream", {}).get("nodes", [])
         
+        return project({
+            "table": table_name,
+            "upstream_dependencies": [node["id"] for node in upstream],
+            "downstream_impact": [node["id"] for node in downstream],
+            "total_dependencies": len(upstream) + len(downstream),
+            "upstream": pages.get("upstream"),
+            "downstream": pages.get("downstream"),
+            "affected_assets": lineage_retriever.find_affected_assets([table_name]),
+            "producing_code": [
+                {key: doc.metadata.get(key) for key in ("doc_id", "file_name", "type", "pipeline")}
+                for doc in lineage_retriever.code_index.documents_for_table(table_name)
+            ]
+        }, fields)
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Lineage query failed: {str(e)}")
 
+@app.get("/lineage/{table_name}/graph")
+async def get_lineage_graph(
+    table_name: str,
+    depth: int = Query(2, ge=1, le=10, description="Hops from the table"),
+    direction: Literal["both", "upstream", "downstream"] = "both",
+    budget: int = Query(100, ge=2, le=2000, description="Maximum nodes before collapsing into clusters"),
+    group_by: Literal["schema", "pipeline"] = "schema",
+    format: Literal["json", "dot"] = "json"
+):
+    """Lineage neighborhood of a table as nodes/edges or Graphviz DOT.
+
+    Beyond ``budget`` nodes, the farther and less critical tables are collapsed
+    into schema or pipeline clusters. Results are cached per lineage version.
+    """
+    if not lineage_retriever:
+        raise HTTPException(status_code=503, detail="Lineage system not initialized")
+    if not lineage_retriever.subgraphs.knows(table_name):
+        raise HTTPException(status_code=404, detail=f"Unknown table: {table_name}")
+    
+    try:
+        graph = lineage_retriever.subgraphs.subgraph(table_name, depth, direction, budget, group_by)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if format == "dot":
+        return PlainTextResponse(
+            to_dot(graph),
+            media_type="text/vnd.graphviz",
+            headers={"X-Lineage-Version": graph["lineage_version"]}
+        )
+    return graph
+
 @app.get("/system/stats")
 async def get_system_stats():
     """Get system statistics."""
+    from tracebackcore import core
+    
     # Get document count from Qdrant collection info
     vectorstore_count = 0
     if vectorstore:
         try:
-            # Get collection info to determine document count
-            collection_info = vectorstore.client.get_collection(vectorstore.collection_name)
-            vectorstore_count = collection_info.points_count
+            if hasattr(vectorstore, "count"):
+                # Memory-mapped snapshot store
+                vectorstore_count = vectorstore.count()
+            else:
+                # Get collection info to determine document count
+                collection_info = vectorstore.client.get_collection(vectorstore.collection_name)
+                vectorstore_count = collection_info.points_count
         except Exception as e:
             print(f"Warning: Could not get vectorstore count: {e}")
             vectorstore_count = 0
@@ -568,6 +997,15 @@ async def get_system_stats():
         "vectorstore_documents": vectorstore_count,
         "lineage_nodes": len(lineage_retriever.lineage_data.get("nodes", [])) if lineage_retriever else 0,
         "lineage_edges": len(lineage_retriever.lineage_data.get("edges", [])) if lineage_retriever else 0,
+        "snapshot": os.getenv("TRACEBACK_SNAPSHOT") if hasattr(vectorstore, "snapshot") else None,
+        "worker_pid": os.getpid(),
+        "llm_cache": core.llm_cache.get_stats() if core.llm_cache else None,
+        "incident_history": core.incident_history.get_stats() if core.incident_history else None,
+        "shards": dict(vectorstore.stats, domains=len(vectorstore.shards)) if hasattr(vectorstore, "shards") else None,
+        "profiling": profiling.get_profile_stats(),
+        "lineage_version": lineage_retriever.lineage_version if lineage_retriever else None,
+        "subgraph_cache": lineage_retriever.subgraphs.stats if lineage_retriever else None,
+        "circuit_breakers": deadlines.get_breaker_stats(),
         "uptime": time.time(),
         "api_version": "1.0.0"
     }
@@ -0,0 +1,197 @@
+"""
+Traceback API Response Encoding
+
+Three independent ways to make large responses cheaper:
+
+    TRACEBACK_FAST_JSON=true   render JSON with orjson (FastJSONResponse) instead of the stdlib encoder
+    CompressionMiddleware      br or gzip, negotiated from Accept-Encoding, for bodies over a size floor
+    project()                  ``fields=`` / ``include_context=false`` projections chosen by the client
+
+orjson and brotli are optional (``pip install tracebackcore[fast]``); without
+them responses fall back to the stdlib encoder and gzip.
+"""
+
+import os
+import gzip
+from typing import List, Dict, Any, Optional, Iterable
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+FAST_JSON = os.getenv("TRACEBACK_FAST_JSON", "false").lower() in ("1", "true", "yes")
+
+# Encodings the compression middleware may use, in server preference order
+COMPRESSION = [
+    encoding.strip() for encoding in os.getenv("TRACEBACK_COMPRESSION", "br,gzip").lower().split(",")
+    if encoding.strip() in ("br", "gzip") and (encoding.strip() != "br" or brotli is not None)
+]
+COMPRESSION_MIN_BYTES = int(os.getenv("TRACEBACK_COMPRESSION_MIN_BYTES", "1024"))
+
+# Content types worth compressing
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+# Keys holding retrieved document text, dropped by include_context=false
+CONTEXT_KEYS = ("content", "page_content")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (numpy arrays and datetimes included)."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+def json_response_class():
+    """FastJSONResponse when TRACEBACK_FAST_JSON is set and orjson is installed, else JSONResponse."""
+    if FAST_JSON and orjson is not None:
+        return FastJSONResponse
+    if FAST_JSON:
+        print("⚠️ TRACEBACK_FAST_JSON is set but orjson is not installed; using the standard JSON encoder")
+    return JSONResponse
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """``"a,b.c"`` -> ``["a", "b.c"]``; None or empty means every field."""
+    if not fields:
+        return None
+    return [field.strip() for field in fields.split(",") if field.strip()]
+
+
+def _select(payload: Dict[str, Any], paths: Iterable[List[str]]) -> Dict[str, Any]:
+    selected: Dict[str, Any] = {}
+    nested: Dict[str, List[List[str]]] = {}
+    for path in paths:
+        head = path[0]
+        if head not in payload:
+            continue
+        if len(path) == 1:
+            selected[head] = payload[head]
+        else:
+            nested.setdefault(head, []).append(path[1:])
+    for head, rest in nested.items():
+        if head in selected:
+            continue
+        value = payload[head]
+        if isinstance(value, dict):
+            selected[head] = _select(value, rest)
+        elif isinstance(value, list):
+            selected[head] = [_select(item, rest) if isinstance(item, dict) else item for item in value]
+    return selected
+
+
+def strip_context(value: Any) -> Any:
+    """Copy of ``value`` without document text (``content`` / ``page_content`` keys)."""
+    if isinstance(value, dict):
+        return {key: strip_context(item) for key, item in value.items() if key not in CONTEXT_KEYS}
+    if isinstance(value, list):
+        return [strip_context(item) for item in value]
+    return value
+
+
+def project(payload: Any, fields: Optional[str] = None, include_context: bool = True) -> Any:
+    """Apply a ``fields=`` selection (dotted paths for nested keys) and/or drop context text.
+
+    Returns ``payload`` untouched when neither is requested, so response models
+    keep their normal validation and encoding.
+    """
+    selected = parse_fields(fields)
+    if selected is None and include_context:
+        return payload
+    data = payload.model_dump() if hasattr(payload, "model_dump") else payload
+    if selected is not None:
+        data = _select(data, [field.split(".") for field in selected])
+    if not include_context:
+        data = strip_context(data)
+    return json_response_class()(data)
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Best of COMPRESSION acceptable to the client (honours ``q=0``)."""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip()] = quality
+    for encoding in COMPRESSION:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=4)
+    return gzip.compress(body, compresslevel=6)
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing buffered responses with br or gzip per Accept-Encoding."""
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not COMPRESSION:
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get("headers") or [])
+        encoding = choose_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        chunks: List[bytes] = []
+        passthrough = False
+
+        async def buffered_send(message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                response_headers = dict(message.get("headers") or [])
+                content_type = response_headers.get(b"content-type", b"").decode("latin-1")
+                passthrough = (
+                    b"content-encoding" in response_headers
+                    or not content_type.startswith(COMPRESSIBLE_TYPES)
+                )
+                if passthrough:
+                    await send(message)
+                else:
+                    start_message = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            vary = [value for name, value in start_message.get("headers", []) if name.lower() == b"vary"]
+            response_headers = [
+                (name, value) for name, value in start_message.get("headers", [])
+                if name.lower() not in (b"content-length", b"vary")
+            ]
+            if len(body) >= self.minimum_size:
+                body = compress(body, encoding)
+                response_headers.append((b"content-encoding", encoding.encode("latin-1")))
+            response_headers.append((b"content-length", str(len(body)).encode("latin-1")))
+            response_headers.append((b"vary", b", ".join(vary + [b"Accept-Encoding"])))
+            await send({**start_message, "headers": response_headers})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, buffered_send)
@@ -0,0 +1,146 @@
+"""
+Auto retriever cascade benchmark
+
+Runs every golden-set question through the fixed retrievers and through
+``Auto`` at several confidence thresholds. For each it reports mean and p95
+latency, and the recall of ground-truth terms in the retrieved context and in
+the brief. For ``Auto`` it also reports which stage answered.
+
+With ``--fake``, the LLM and embeddings are the offline fakes with injected
+latencies, and Cohere is replaced by a lexical reranker with its own latency.
+Hashed fake embeddings score lower than OpenAI's, so the similarity scale
+is recalibrated for them (``--similarity-scale``).
+
+Usage:
+    python -m tracebackcore.benchmarks.auto_retriever [--fake] [--thresholds 0.5,0.6,0.7]
+        [--llm-latency 0.8] [--rerank-latency 0.25] [--limit N] [--output results.json]
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import statistics
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from tracebackcore.benchmarks.single_pass import GOLDEN_SET, ground_truth_recall
+
+FIXED_METHODS = ["Hybrid Search", "Lineage-Aware Retrieval", "Cohere Reranking", "Query Expansion"]
+
+
+def lexical_reranker(latency: float):
+    """Stand-in for Cohere: query-term overlap as relevance, after ``latency`` seconds."""
+    def rerank(question: str, documents: List[str], top_n: int = 5) -> List[Tuple[int, float]]:
+        time.sleep(latency)
+        terms = set(re.findall(r"\b\w+\b", question.lower()))
+        scores = [
+            len(terms & set(re.findall(r"\b\w+\b", document.lower()))) / len(terms) if terms else 0.0
+            for document in documents
+        ]
+        return sorted(enumerate(scores), key=lambda item: item[1], reverse=True)[:top_n]
+    return rerank
+
+
+def run_method(api_main, name: str, questions: List[Dict[str, Any]]) -> Dict[str, Any]:
+    rows = []
+    for item in questions:
+        start = time.perf_counter()
+        result = api_main.RETRIEVER_METHODS[name](item["question"])
+        elapsed = time.perf_counter() - start
+        brief = result.get("incident_brief") or result.get("answer") or ""
+        rows.append({
+            "question": item["question"],
+            "latency": elapsed,
+            "context_recall": ground_truth_recall("\n".join(result.get("context", [])), item["ground_truth"]),
+            "brief_recall": ground_truth_recall(brief, item["ground_truth"]),
+            "method": result.get("method"),
+            "trail": [step["stage"] for step in result.get("decision_trail", [])],
+        })
+    latencies = sorted(row["latency"] for row in rows)
+    stages: Dict[str, int] = {}
+    for row in rows:
+        stages[row["method"]] = stages.get(row["method"], 0) + 1
+    return {
+        "mean_latency": statistics.mean(latencies),
+        "p95_latency": latencies[int(0.95 * (len(latencies) - 1))],
+        "mean_context_recall": statistics.mean(row["context_recall"] for row in rows),
+        "mean_brief_recall": statistics.mean(row["brief_recall"] for row in rows),
+        "errors": sum(1 for row in rows if "(Error)" in (row["method"] or "")),
+        "methods": stages,
+        "questions": rows,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency and golden-set quality of the Auto retriever vs fixed retrievers")
+    parser.add_argument("--fake", action="store_true", help="Offline fakes for the LLM, embeddings and reranker")
+    parser.add_argument("--thresholds", type=str, default="0.5,0.6,0.7", help="Auto confidence thresholds to compare")
+    parser.add_argument("--llm-latency", type=float, default=0.8, help="Seconds per fake LLM call")
+    parser.add_argument("--embedding-latency", type=float, default=0.05, help="Seconds per fake embedding call")
+    parser.add_argument("--rerank-latency", type=float, default=0.25, help="Seconds per fake rerank call")
+    parser.add_argument("--similarity-scale", type=str, default="0.15,0.45,0.08",
+                        help="floor,ceiling,margin of the similarity signal with --fake")
+    parser.add_argument("--limit", type=int, default=None, help="Only run the first N questions")
+    parser.add_argument("--output", type=str, default=None, help="Write results JSON to this path")
+    args = parser.parse_args()
+
+    with open(GOLDEN_SET, "r", encoding="utf-8") as f:
+        questions = json.load(f)[:args.limit]
+
+    if args.fake:
+        from tracebackcore.benchmarks.fakes import install_fake_providers
+        install_fake_providers(llm_latency=args.llm_latency, embedding_latency=args.embedding_latency)
+    # Identical expansion prompts would otherwise be answered from the cache for Auto
+    os.environ["TRACEBACK_LLM_CACHE"] = "false"
+
+    from tracebackcore import core, cascade
+    from tracebackcore.api import main as api_main
+    if not core.traceback_graph:
+        core.initialize_system()
+    api_main.traceback_graph = core.traceback_graph
+    api_main.lineage_retriever = core.lineage_retriever
+    api_main.vectorstore = core.vectorstore
+    api_main.llm = core.llm
+    if args.fake:
+        os.environ["COHERE_API_KEY"] = "benchmark-fake-key"
+        api_main.cohere_rerank = lexical_reranker(args.rerank_latency)
+        floor, ceiling, margin = (float(value) for value in args.similarity_scale.split(","))
+        cascade.SCORE_SCALES["similarity"] = (floor, ceiling, margin)
+
+    runs = []
+    for name in FIXED_METHODS:
+        runs.append(dict(run_method(api_main, name, questions), label=name))
+    for threshold in (float(value) for value in args.thresholds.split(",")):
+        cascade.AUTO_CONFIDENCE = threshold
+        runs.append(dict(run_method(api_main, "Auto", questions), label=f"Auto @ {threshold:.2f}"))
+
+    results = {
+        "benchmark": "auto_retriever",
+        "timestamp": time.time(),
+        "fake": args.fake,
+        "questions": len(questions),
+        "runs": runs,
+    }
+
+    print(f"\n📊 Auto retriever vs fixed retrievers ({len(questions)} golden questions)")
+    print(f"{'Retriever':<24} {'Latency(s)':>11} {'p95(s)':>8} {'Ctx recall':>11} {'Brief recall':>13} {'Errors':>7}")
+    for run in runs:
+        print(f"{run['label']:<24} {run['mean_latency']:>11.2f} {run['p95_latency']:>8.2f} "
+              f"{run['mean_context_recall']:>11.3f} {run['mean_brief_recall']:>13.3f} {run['errors']:>7}")
+        if run["label"].startswith("Auto"):
+            stages = ", ".join(f"{method}: {count}" for method, count in sorted(run["methods"].items()))
+            print(f"{'':<24} {stages}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Entity linking benchmark
+
+Compares the Aho-Corasick EntityLinker against the previous regex-based table
+detection and a naive per-id substring scan on long retrieved contexts.
+Runs offline (no LLM or embedding calls).
+
+Usage:
+    python -m tracebackcore.benchmarks.entity_linking [--ids 1000 10000] [--sizes 10000 1000000] [--output results.json]
+"""
+
+import re
+import sys
+import json
+import time
+import random
+import argparse
+from pathlib import Path
+from typing import Dict, Any, List, Callable
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from tracebackcore.entities import EntityLinker
+
+SCHEMAS = ["raw", "curated", "analytics", "bi", "ops"]
+
+# Detection used by generate_lineage_aware_response before the entity linker
+LEGACY_PATTERNS = [r'(curated\.\w+)', r'(raw\.\w+)', r'(analytics\.\w+)', r'(bi\.\w+)', r'(ops\.\w+)']
+LEGACY_CONTEXT_PATTERN = r'\b(?:raw|curated|analytics|bi|ops)\.[a-z0-9_]+\b'
+
+FILLER = (
+    "The pipeline reads upstream data, applies quality checks and writes the curated output. "
+    "On failure the on-call engineer checks freshness, row counts and schema drift before rerunning. "
+)
+
+
+def make_lineage(num_ids: int, seed: int) -> Dict[str, Any]:
+    """Synthetic lineage with ``num_ids`` table nodes spread across schemas."""
+    rng = random.Random(seed)
+    nodes = [
+        {"id": f"{rng.choice(SCHEMAS)}.table_{i:06d}", "type": "table"}
+        for i in range(num_ids)
+    ]
+    return {"nodes": nodes, "edges": [], "dashboards": [], "pipelines": []}
+
+
+def make_context(lineage: Dict[str, Any], size: int, mentions_per_kb: int, seed: int) -> str:
+    """Context of roughly ``size`` characters with table mentions sprinkled in."""
+    rng = random.Random(seed)
+    ids = [node["id"] for node in lineage["nodes"]]
+    parts = []
+    length = 0
+    while length < size:
+        chunk = FILLER
+        if rng.random() < mentions_per_kb * len(FILLER) / 1000:
+            chunk += f"See {rng.choice(ids)}, "
+        parts.append(chunk)
+        length += len(chunk)
+    return "".join(parts)[:size]
+
+
+def legacy_detect(text: str) -> List[str]:
+    tables = set()
+    for pattern in LEGACY_PATTERNS:
+        tables.update(re.findall(pattern, text.lower()))
+    tables.update(t.lower() for t in re.findall(LEGACY_CONTEXT_PATTERN, text, flags=re.IGNORECASE))
+    return sorted(tables)
+
+
+def naive_detect(ids: List[str]) -> Callable[[str], List[str]]:
+    def detect(text: str) -> List[str]:
+        lowered = text.lower()
+        return [node_id for node_id in ids if node_id in lowered]
+    return detect
+
+
+def time_call(func: Callable[[str], Any], text: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark entity linking on long contexts")
+    parser.add_argument("--ids", type=int, nargs="+", default=[1000, 10000], help="Number of lineage ids")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000], help="Context sizes in characters")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetitions per measurement (best is kept)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--output", type=str, default=None, help="Write results JSON to this path")
+    args = parser.parse_args()
+
+    rows = []
+    for num_ids in args.ids:
+        lineage = make_lineage(num_ids, args.seed)
+        ids = [node["id"] for node in lineage["nodes"]]
+
+        start = time.perf_counter()
+        linker = EntityLinker.from_lineage(lineage)
+        build_time = time.perf_counter() - start
+
+        for size in args.sizes:
+            context = make_context(lineage, size, mentions_per_kb=2, seed=args.seed)
+            row = {
+                "ids": num_ids,
+                "context_chars": size,
+                "linker_build_s": build_time,
+                "linker_s": time_call(linker.find_tables, context, args.repeat),
+                "legacy_regex_s": time_call(legacy_detect, context, args.repeat),
+                "naive_scan_s": time_call(naive_detect(ids), context, 1),
+                "linked_tables": len(linker.find_tables(context)),
+                "legacy_tables": len(legacy_detect(context)),
+            }
+            rows.append(row)
+            print(f"ids={num_ids:>7} chars={size:>9} linker={row['linker_s'] * 1000:>8.2f}ms "
+                  f"legacy={row['legacy_regex_s'] * 1000:>8.2f}ms naive={row['naive_scan_s'] * 1000:>9.2f}ms "
+                  f"tables={row['linked_tables']}/{row['legacy_tables']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"benchmark": "entity_linking", "timestamp": time.time(), "results": rows}, f, indent=2)
+        print(f"✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
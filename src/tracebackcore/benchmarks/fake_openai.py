@@ -0,0 +1,220 @@
+"""
+Local fake OpenAI-compatible server
+
+Serves ``/v1/chat/completions``, ``/v1/embeddings`` and ``/v1/models`` so the
+API can be load-tested without spending tokens. Each response waits for a
+configurable latency plus uniform jitter. A configurable fraction of requests
+fails with an OpenAI-style error body.
+
+Embeddings are the same hashed bag-of-words vectors as ``fakes.FakeEmbeddings``,
+so retrieval still behaves sensibly. Chat completions echo the start of the
+prompt; when ``response_format`` carries a JSON schema they return a placeholder
+object that satisfies it (structured output).
+
+Point Traceback at it with:
+
+    TRACEBACK_OPENAI_BASE_URL=http://127.0.0.1:8100/v1
+
+Usage:
+    python -m tracebackcore.benchmarks.fake_openai [--port 8100] [--chat-latency 0.8]
+        [--embedding-latency 0.05] [--jitter 0.2] [--error-rate 0.01]
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from pathlib import Path
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Any, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from tracebackcore.benchmarks.fakes import FakeEmbeddings
+
+
+def placeholder_from_schema(schema: Dict[str, Any], definitions: Dict[str, Any]) -> Any:
+    """Smallest value satisfying a JSON schema (first enum choice, one-item arrays, ...)."""
+    if "$ref" in schema:
+        return placeholder_from_schema(definitions[schema["$ref"].split("/")[-1]], definitions)
+    for combinator in ("anyOf", "oneOf", "allOf"):
+        if combinator in schema:
+            options = [option for option in schema[combinator] if option.get("type") != "null"] or schema[combinator]
+            return placeholder_from_schema(options[0], definitions)
+    if "enum" in schema:
+        return schema["enum"][0]
+    if "const" in schema:
+        return schema["const"]
+    kind = schema.get("type")
+    if kind == "object":
+        return {name: placeholder_from_schema(value, definitions) for name, value in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [placeholder_from_schema(schema.get("items", {}), definitions)]
+    if kind == "integer":
+        return 1
+    if kind == "number":
+        return 1.0
+    if kind == "boolean":
+        return True
+    if kind == "null":
+        return None
+    return "placeholder"
+
+
+class FakeOpenAIServer:
+    """Threaded HTTP server answering a subset of the OpenAI API with injected latency and errors."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8100, chat_latency: float = 0.0,
+                 embedding_latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 500, seed: Optional[int] = None):
+        self.chat_latency = chat_latency
+        self.embedding_latency = embedding_latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.random = random.Random(seed)
+        self.stats = {"chat": 0, "embeddings": 0, "errors": 0}
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _reply(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path.rstrip("/").endswith("/models"):
+                    self._reply(200, {"object": "list", "data": [
+                        {"id": "gpt-4o-mini", "object": "model"}, {"id": "text-embedding-3-small", "object": "model"}
+                    ]})
+                else:
+                    self._reply(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if self.path.endswith("/embeddings"):
+                    kind, latency = "embeddings", server.embedding_latency
+                elif self.path.endswith("/chat/completions"):
+                    kind, latency = "chat", server.chat_latency
+                else:
+                    self._reply(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+                    return
+
+                with server._lock:
+                    server.stats[kind] += 1
+                    delay = max(0.0, latency + server.random.uniform(-server.jitter, server.jitter)) if latency or server.jitter else 0.0
+                    failed = server.random.random() < server.error_rate
+                    if failed:
+                        server.stats["errors"] += 1
+                if delay:
+                    time.sleep(delay)
+                if failed:
+                    headers = {"Retry-After": "1"} if server.error_status == 429 else None
+                    self._reply(server.error_status, {"error": {
+                        "message": "Injected failure from the fake OpenAI server",
+                        "type": "rate_limit_error" if server.error_status == 429 else "server_error",
+                    }}, headers)
+                    return
+                self._reply(200, server.embeddings(body) if kind == "embeddings" else server.chat(body))
+
+        return Handler
+
+    def embeddings(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        texts = body.get("input", [])
+        texts = [texts] if isinstance(texts, str) else texts
+        embedder = FakeEmbeddings(dimensions=body.get("dimensions"))
+        return {
+            "object": "list",
+            "model": body.get("model", "text-embedding-3-small"),
+            "data": [
+                {"object": "embedding", "index": i, "embedding": embedder._embed(text if isinstance(text, str) else json.dumps(text))}
+                for i, text in enumerate(texts)
+            ],
+            "usage": {"prompt_tokens": len(texts), "total_tokens": len(texts)},
+        }
+
+    def chat(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        response_format = body.get("response_format") or {}
+        if response_format.get("type") == "json_schema":
+            schema = response_format["json_schema"]["schema"]
+            content = json.dumps(placeholder_from_schema(schema, schema.get("$defs", {})))
+        else:
+            messages = body.get("messages") or [{}]
+            prompt = messages[-1].get("content") or ""
+            if not isinstance(prompt, str):
+                prompt = json.dumps(prompt)
+            content = f"Placeholder answer ({len(prompt)} prompt characters): {prompt[:200]}"
+        return {
+            "id": f"chatcmpl-fake-{time.time_ns()}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o-mini"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20},
+        }
+
+    def start(self) -> "FakeOpenAIServer":
+        """Serve in a background thread."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="fake-openai", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible chat and embedding server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--chat-latency", type=float, default=0.0, help="Seconds per chat completion")
+    parser.add_argument("--embedding-latency", type=float, default=0.0, help="Seconds per embeddings request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Uniform +/- seconds added to each latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=500, help="HTTP status of injected failures (e.g. 429)")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(args.host, args.port, args.chat_latency, args.embedding_latency,
+                              args.jitter, args.error_rate, args.error_status, args.seed)
+    print(f"🤖 Fake OpenAI server on {server.base_url} (chat {args.chat_latency}s, embeddings "
+          f"{args.embedding_latency}s, jitter ±{args.jitter}s, errors {args.error_rate:.1%})")
+    print(f"   export TRACEBACK_OPENAI_BASE_URL={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"📊 Served {server.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Fake LLM and embedding providers for offline benchmarks
+
+``FakeEmbeddings`` hashes tokens into a fixed-size vector (so lexically similar
+texts are close, and results are deterministic) and ``FakeChatModel`` answers
+instantly, or after a configurable latency, with placeholder text or a
+placeholder instance of the requested structured-output schema.
+
+Call ``install_fake_providers()`` before importing ``tracebackcore.core`` so
+``initialize_system`` picks them up instead of the OpenAI clients.
+"""
+
+import os
+import re
+import time
+import typing
+import zlib
+from typing import List, Any, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import AIMessage
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9_]+")
+
+
+class FakeEmbeddings(Embeddings):
+    """Deterministic hashed bag-of-words embeddings."""
+
+    def __init__(self, model: str = "fake-embedding", dimensions: Optional[int] = None, latency: float = 0.0, **kwargs):
+        self.model = model
+        self.dimensions = dimensions or 1536
+        self.latency = latency
+        self.calls = 0
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for token in TOKEN_PATTERN.findall(text.lower()):
+            bucket = zlib.crc32(token.encode("utf-8"))
+            vector[bucket % self.dimensions] += 1.0 if bucket & 0x80000000 else -1.0
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector /= norm
+        else:
+            vector[0] = 1.0
+        return vector.tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+def placeholder_value(annotation) -> Any:
+    """Placeholder for a pydantic field annotation (first Literal choice, one-item lists, ...)."""
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+    if origin is typing.Literal:
+        return args[0]
+    if origin in (list, List):
+        return [placeholder_value(args[0]) if args else "placeholder"]
+    if origin is typing.Union:
+        return placeholder_value(next(arg for arg in args if arg is not type(None)))
+    if annotation is int:
+        return 1
+    if annotation is float:
+        return 1.0
+    if annotation is bool:
+        return True
+    if hasattr(annotation, "model_fields"):
+        return build_placeholder(annotation)
+    return "placeholder"
+
+
+def build_placeholder(schema):
+    return schema(**{name: placeholder_value(field.annotation) for name, field in schema.model_fields.items()})
+
+
+class _StructuredFake:
+    def __init__(self, model: "FakeChatModel", schema, include_raw: bool = False):
+        self.model = model
+        self.schema = schema
+        self.include_raw = include_raw
+
+    def invoke(self, messages, **kwargs):
+        self.model._wait()
+        parsed = build_placeholder(self.schema)
+        if self.include_raw:
+            return {"raw": AIMessage(content=""), "parsed": parsed, "parsing_error": None}
+        return parsed
+
+
+class FakeChatModel:
+    """Chat model stand-in supporting ``invoke`` and ``with_structured_output``."""
+
+    def __init__(self, model: str = "fake-chat", latency: float = 0.0, **kwargs):
+        self.model_name = model
+        self.latency = latency
+        self.calls = 0
+
+    def _wait(self):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def invoke(self, messages, **kwargs) -> AIMessage:
+        self._wait()
+        if isinstance(messages, list) and messages:
+            last = messages[-1]
+            prompt = last.get("content", "") if isinstance(last, dict) else getattr(last, "content", str(last))
+        else:
+            prompt = str(messages)
+        return AIMessage(content=f"Placeholder answer ({len(prompt)} prompt characters).")
+
+    def with_structured_output(self, schema, include_raw: bool = False, **kwargs) -> _StructuredFake:
+        return _StructuredFake(self, schema, include_raw)
+
+
+def install_fake_providers(llm_latency: float = 0.0, embedding_latency: float = 0.0):
+    """Replace the OpenAI chat and embedding classes used by ``tracebackcore.core``."""
+    import langchain_openai
+
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark-fake-key")
+
+    class BenchmarkEmbeddings(FakeEmbeddings):
+        def __init__(self, **kwargs):
+            kwargs.pop("openai_api_key", None)
+            super().__init__(latency=embedding_latency, **kwargs)
+
+    class BenchmarkChatModel(FakeChatModel):
+        def __init__(self, **kwargs):
+            kwargs.pop("openai_api_key", None)
+            super().__init__(latency=llm_latency, **kwargs)
+
+    langchain_openai.OpenAIEmbeddings = BenchmarkEmbeddings
+    langchain_openai.ChatOpenAI = BenchmarkChatModel
@@ -0,0 +1,151 @@
+"""
+Reduced-dimension and quantized embedding benchmark
+
+Embeds the corpus and the golden-set questions once at full size, then for every
+(dimensions, quantization) configuration writes a snapshot, searches it with
+each golden question and reports:
+
+    recall@k       overlap with the top-k of the full-size float32 search
+    latency        median / p95 milliseconds per search
+    memory         bytes of the matrix scanned per search (float32 or int8)
+
+Shortened vectors are produced the way the ``dimensions`` parameter of
+text-embedding-3 does it: truncate, then L2-normalize. ``--pad`` adds random
+distractor documents so latency and memory are measured at corpus scale while
+recall is still judged against the same exact baseline.
+
+With ``--fake`` the hashed fake embeddings are used (offline); they are not
+trained for truncation, so their recall at reduced dimensions understates what
+the real model achieves.
+
+Usage:
+    python -m tracebackcore.benchmarks.quantization [--dimensions 1536 512 256] [--k 5]
+        [--pad 100000] [--oversampling 4] [--fake] [--output results.json]
+"""
+
+import sys
+import json
+import time
+import tempfile
+import argparse
+import statistics
+from pathlib import Path
+from typing import Dict, Any, List
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+project_root = Path(__file__).parent.parent.parent.parent
+GOLDEN_SET = project_root / "data" / "golden_test_data.json"
+
+
+def truncate(vectors: np.ndarray, dimensions: int) -> np.ndarray:
+    """Shorten embeddings to ``dimensions`` and re-normalize."""
+    shortened = np.ascontiguousarray(vectors[:, :dimensions], dtype=np.float32)
+    norms = np.linalg.norm(shortened, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return shortened / norms
+
+
+def run_config(documents, doc_vectors: np.ndarray, query_vectors: np.ndarray, baseline: List[List[int]],
+               dimensions: int, quantization: str, k: int, oversampling: float, repeat: int) -> Dict[str, Any]:
+    from tracebackcore.snapshot import Snapshot, SnapshotVectorStore, write_snapshot
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_snapshot(Path(tmp) / "snapshot", documents, truncate(doc_vectors, dimensions), {},
+                              embedding_model="benchmark", quantization=quantization)
+        store = SnapshotVectorStore(Snapshot(path), embeddings=None, oversampling=oversampling)
+        queries = truncate(query_vectors, dimensions)
+
+        samples, recalls = [], []
+        for query, exact in zip(queries, baseline):
+            for _ in range(repeat):
+                start = time.perf_counter()
+                results = store.search_by_vector(query, k=k)
+                samples.append((time.perf_counter() - start) * 1000)
+            recalls.append(len({index for index, _ in results} & set(exact)) / len(exact))
+
+        snapshot = store.snapshot
+        scanned = snapshot.codes if snapshot.codes is not None else snapshot.vectors
+        samples.sort()
+        return {
+            "dimensions": dimensions,
+            "quantization": quantization,
+            f"recall_at_{k}": statistics.mean(recalls),
+            "median_ms": statistics.median(samples),
+            "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+            "scanned_bytes": int(scanned.nbytes),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall, latency and memory of reduced-dimension and int8 embeddings")
+    parser.add_argument("--dimensions", type=int, nargs="+", default=[1536, 1024, 512, 256])
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--pad", type=int, default=0, help="Random distractor documents added to the corpus")
+    parser.add_argument("--oversampling", type=float, default=4.0, help="int8 candidates re-scored per result")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed searches per question")
+    parser.add_argument("--fake", action="store_true", help="Use offline fake embeddings")
+    parser.add_argument("--output", type=str, default=None, help="Write results JSON to this path")
+    args = parser.parse_args()
+
+    if args.fake:
+        from tracebackcore.benchmarks.fakes import install_fake_providers
+        install_fake_providers()
+
+    from langchain.schema import Document
+    from tracebackcore import core
+
+    with open(GOLDEN_SET, "r", encoding="utf-8") as f:
+        questions = [item["question"] for item in json.load(f)]
+
+    documents = core.load_documents(project_root, core.lineage_retriever.lineage_data)
+    full_size = max(args.dimensions)
+    doc_vectors = np.asarray(core.embeddings.embed_documents([doc.page_content for doc in documents]), dtype=np.float32)
+    query_vectors = np.asarray([core.embeddings.embed_query(question) for question in questions], dtype=np.float32)
+    if doc_vectors.shape[1] < full_size:
+        raise SystemExit(f"Embeddings have {doc_vectors.shape[1]} dimensions; unset TRACEBACK_EMBEDDING_DIMENSIONS")
+
+    if args.pad:
+        rng = np.random.default_rng(0)
+        noise = rng.standard_normal((args.pad, doc_vectors.shape[1]), dtype=np.float32)
+        doc_vectors = np.vstack([doc_vectors, noise / np.linalg.norm(noise, axis=1, keepdims=True)])
+        documents = documents + [Document(page_content="", metadata={"type": "padding"})] * args.pad
+
+    # Exact neighbours at full size are the reference for recall
+    exact_scores = query_vectors[:, :full_size] @ truncate(doc_vectors, full_size).T
+    baseline = [list(np.argsort(-row)[:args.k]) for row in exact_scores]
+
+    configs = [
+        run_config(documents, doc_vectors, query_vectors, baseline, dimensions, quantization,
+                   args.k, args.oversampling, args.repeat)
+        for dimensions in sorted(args.dimensions, reverse=True)
+        for quantization in ("none", "int8")
+    ]
+
+    results = {
+        "benchmark": "quantization",
+        "timestamp": time.time(),
+        "questions": len(questions),
+        "documents": len(documents),
+        "k": args.k,
+        "oversampling": args.oversampling,
+        "fake_embeddings": args.fake,
+        "configs": configs,
+    }
+
+    print(f"\n📊 Embedding size vs recall ({len(questions)} golden questions, {len(documents)} documents)")
+    print(f"{'Dims':>5} {'Quant':<6} {f'Recall@{args.k}':>9} {'Median(ms)':>11} {'p95(ms)':>8} {'Memory(MB)':>11}")
+    for config in configs:
+        print(f"{config['dimensions']:>5} {config['quantization']:<6} {config[f'recall_at_{args.k}']:>9.3f} "
+              f"{config['median_ms']:>11.3f} {config['p95_ms']:>8.3f} {config['scanned_bytes'] / 1e6:>11.2f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""
+Scale benchmark suite
+
+Generates seeded synthetic lineage graphs and corpora (see ``synthetic.py``)
+and times the hot paths at production-like sizes, with fake LLM and embedding
+providers (see ``fakes.py``) so runs are offline and repeatable:
+
+    traversal   LineageAwareRetriever closures, paged traversal, impact lookup, entity linking
+    ingestion   load_documents, embedding, Qdrant indexing and snapshot writing
+    search      vector search (Qdrant and snapshot) and search_with_lineage
+    api         /lineage, /incident/search and /incident/triage through the ASGI app
+
+Results are written as JSON; pass ``--compare`` with an earlier results file
+to print the change for every metric.
+
+Usage:
+    python -m tracebackcore.benchmarks.scale [--edges 1000 100000 1000000] [--docs 100 1000]
+        [--suites traversal ingestion search api] [--output results.json] [--compare baseline.json]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+import argparse
+import platform
+import statistics
+import subprocess
+from pathlib import Path
+from typing import Dict, Any, List, Callable
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from tracebackcore.benchmarks.fakes import install_fake_providers
+from tracebackcore.benchmarks.synthetic import make_lineage, make_corpus, write_dataset
+
+SUITES = ["traversal", "ingestion", "search", "api"]
+
+QUESTION = "Job {table} failed — who's impacted?"
+
+
+def measure(func: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """Time ``func`` ``repeat`` times; milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "min_ms": samples[0],
+        "median_ms": statistics.median(samples),
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+    }
+
+
+def hub_tables(lineage: Dict[str, Any], count: int) -> List[str]:
+    """Tables with the largest direct fan-out."""
+    fan_out: Dict[str, int] = {}
+    for edge in lineage["edges"]:
+        fan_out[edge["from"]] = fan_out.get(edge["from"], 0) + 1
+    return sorted(fan_out, key=lambda table: -fan_out[table])[:count]
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=Path(__file__).parent, check=True
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def bench_traversal(core, lineage: Dict[str, Any], repeat: int) -> Dict[str, Any]:
+    start = time.perf_counter()
+    retriever = core.LineageAwareRetriever(None, lineage)
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    hub = hub_tables(lineage, 1)[0]
+    chain_head = "staging.chain0_step_0000"
+    question = QUESTION.format(table=hub) + " Also check " + chain_head + " and the dashboards fed by it."
+    return {
+        "compile_ms": compile_ms,
+        "hub": hub,
+        "hub_closure_size": len(retriever.find_downstream_impact(hub)),
+        "closure_cold_hub": measure(lambda: retriever._find_downstream_impact(hub), repeat),
+        "closure_cold_chain_upstream": measure(
+            lambda: retriever._find_upstream_dependencies(f"staging.chain0_step_{49:04d}"), repeat
+        ),
+        "closure_cached_hub": measure(lambda: retriever.find_downstream_impact(hub), repeat),
+        "traverse_page_distance": measure(lambda: retriever.traverse(hub, limit=100), repeat),
+        "traverse_page_criticality_depth2": measure(
+            lambda: retriever.traverse(hub, max_depth=2, limit=100, order="criticality"), repeat
+        ),
+        "affected_assets_hub": measure(lambda: retriever.find_affected_assets([hub]), repeat),
+        "find_tables_question": measure(lambda: retriever.find_tables(question), repeat),
+    }
+
+
+def build_system(core, dataset_root: Path, lineage: Dict[str, Any]):
+    """Ingest a synthetic dataset into a fresh in-memory Qdrant collection; returns (vectorstore, retriever, timings)."""
+    timings = {}
+    start = time.perf_counter()
+    documents = core.load_documents(dataset_root, lineage)
+    timings["load_documents_ms"] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    vectors = core.embeddings.embed_documents([doc.page_content for doc in documents])
+    timings["embed_ms"] = (time.perf_counter() - start) * 1000
+
+    client = core.QdrantClient(":memory:")
+    collection_name = "benchmark_documents"
+    client.create_collection(
+        collection_name=collection_name,
+        vectors_config=core.VectorParams(size=len(vectors[0]), distance=core.Distance.COSINE)
+    )
+    vectorstore = core.Qdrant(client=client, collection_name=collection_name, embeddings=core.embeddings)
+    start = time.perf_counter()
+    vectorstore.add_documents(documents)
+    timings["qdrant_index_ms"] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    retriever = core.LineageAwareRetriever(vectorstore, lineage)
+    timings["retriever_build_ms"] = (time.perf_counter() - start) * 1000
+
+    snapshot_dir = dataset_root / "snapshot"
+    start = time.perf_counter()
+    core.write_snapshot(snapshot_dir, documents, vectors, retriever.build_index(), embedding_model="fake")
+    timings["snapshot_write_ms"] = (time.perf_counter() - start) * 1000
+    timings["documents"] = len(documents)
+    return vectorstore, retriever, snapshot_dir, timings
+
+
+def bench_search(core, vectorstore, retriever, snapshot_dir: Path, lineage: Dict[str, Any], repeat: int) -> Dict[str, Any]:
+    hub = hub_tables(lineage, 1)[0]
+    query = QUESTION.format(table=hub)
+    snapshot_store = core.SnapshotVectorStore(core.Snapshot(snapshot_dir), core.embeddings)
+    schema_filter = core.build_search_filter({"schema": hub.split(".", 1)[0]})
+    return {
+        "qdrant_similarity_k5": measure(lambda: vectorstore.similarity_search(query, k=5), repeat),
+        "qdrant_similarity_k5_schema_filter": measure(
+            lambda: vectorstore.similarity_search(query, k=5, filter=schema_filter), repeat
+        ),
+        "snapshot_similarity_k5": measure(lambda: snapshot_store.similarity_search(query, k=5), repeat),
+        "snapshot_similarity_k5_schema_filter": measure(
+            lambda: snapshot_store.similarity_search(query, k=5, filter=schema_filter), repeat
+        ),
+        "search_with_lineage_uncached": measure(lambda: retriever._search_with_lineage(query, 5, {}), repeat),
+        "search_with_lineage_cached": measure(lambda: retriever.search_with_lineage(query, k=5), repeat),
+    }
+
+
+def bench_api(core, vectorstore, retriever, lineage: Dict[str, Any], repeat: int) -> Dict[str, Any]:
+    from fastapi.testclient import TestClient
+    from tracebackcore.api import main as api_main
+
+    # Point the already-initialized system at the synthetic data set
+    core.vectorstore = vectorstore
+    core.lineage_retriever = retriever
+    api_main.traceback_graph = core.traceback_graph
+    api_main.lineage_retriever = retriever
+    api_main.vectorstore = vectorstore
+    api_main.llm = core.llm
+
+    hub = hub_tables(lineage, 1)[0]
+    rng = random.Random(0)
+    tables = [node["id"] for node in lineage["nodes"]]
+
+    def triage(body: Dict[str, Any]):
+        response = client.post("/incident/triage", json=body)
+        assert response.status_code == 200, response.text
+
+    with TestClient(api_main.app) as client:
+        return {
+            "lineage_hub_page": measure(lambda: client.get(f"/lineage/{hub}?limit=100"), repeat),
+            "lineage_random_table": measure(lambda: client.get(f"/lineage/{rng.choice(tables)}?limit=100"), repeat),
+            "incident_search": measure(lambda: client.get("/incident/search", params={"query": QUESTION.format(table=rng.choice(tables))}), repeat),
+            "triage_two_pass": measure(lambda: triage({"question": QUESTION.format(table=rng.choice(tables)), "single_pass": False}), repeat),
+            "triage_single_pass": measure(lambda: triage({"question": QUESTION.format(table=rng.choice(tables)), "single_pass": True}), repeat),
+            "triage_lineage_aware": measure(lambda: triage({"question": QUESTION.format(table=rng.choice(tables)), "retriever": "Lineage-Aware Retrieval"}), repeat),
+        }
+
+
+def flatten(results: Any, prefix: str = "") -> Dict[str, float]:
+    """Flatten nested results into ``path -> number`` for comparisons."""
+    flat = {}
+    if isinstance(results, dict):
+        for key, value in results.items():
+            flat.update(flatten(value, f"{prefix}.{key}" if prefix else str(key)))
+    elif isinstance(results, list):
+        for item in results:
+            label = item.get("label", "") if isinstance(item, dict) else ""
+            flat.update(flatten(item, f"{prefix}[{label}]"))
+    elif isinstance(results, (int, float)) and not isinstance(results, bool):
+        flat[prefix] = float(results)
+    return flat
+
+
+def compare(current: Dict[str, Any], baseline_file: str):
+    with open(baseline_file, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    before, after = flatten(baseline["results"]), flatten(current["results"])
+    print(f"\n📊 Compared with {baseline.get('git_commit', 'unknown')} ({baseline_file})")
+    for key in sorted(set(before) & set(after)):
+        # Medians (and single timings); min/p95 stay in the JSON for closer inspection
+        if not key.endswith("_ms") or key.endswith(("min_ms", "p95_ms")) or not before[key]:
+            continue
+        change = (after[key] - before[key]) / before[key] * 100
+        marker = "🔺" if change > 10 else ("🔻" if change < -10 else "  ")
+        print(f"{marker} {key:<90} {before[key]:>10.3f} → {after[key]:>10.3f} ms ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Traceback on synthetic data at scale")
+    parser.add_argument("--edges", type=int, nargs="+", default=[1000, 100_000], help="Lineage sizes in edges")
+    parser.add_argument("--docs", type=int, nargs="+", default=[100, 1000], help="Corpus sizes in pipelines (one spec + one SQL file each)")
+    parser.add_argument("--suites", nargs="+", choices=SUITES, default=SUITES, help="Benchmarks to run")
+    parser.add_argument("--repeat", type=int, default=20, help="Repetitions per measurement")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Simulated seconds per fake LLM call")
+    parser.add_argument("--output", type=str, default=None, help="Write results JSON to this path")
+    parser.add_argument("--compare", type=str, default=None, help="Earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    install_fake_providers(llm_latency=args.llm_latency)
+    work_dir = Path(tempfile.mkdtemp(prefix="traceback-bench-"))
+    os.environ.setdefault("TRACEBACK_FEEDBACK_DB", str(work_dir / "feedback.db"))
+    os.environ.setdefault("TRACEBACK_CHECKPOINT_DB", str(work_dir / "checkpoints.db"))
+    from tracebackcore import core
+
+    results: Dict[str, Any] = {"traversal": [], "ingestion": [], "search": [], "api": []}
+    for num_edges in args.edges:
+        lineage = make_lineage(num_edges, seed=args.seed)
+        label = f"{len(lineage['edges'])} edges"
+        print(f"🧬 {label}, {len(lineage['nodes'])} nodes, {len(lineage['dashboards'])} dashboards")
+
+        if "traversal" in args.suites:
+            row = {"label": label, "edges": len(lineage["edges"]), "nodes": len(lineage["nodes"])}
+            row.update(bench_traversal(core, lineage, args.repeat))
+            results["traversal"].append(row)
+            print(f"   traversal: compile {row['compile_ms']:.1f}ms, hub closure {row['closure_cold_hub']['median_ms']:.2f}ms "
+                  f"({row['hub_closure_size']} nodes), page {row['traverse_page_distance']['median_ms']:.3f}ms")
+
+        for num_docs in args.docs:
+            if not {"ingestion", "search", "api"} & set(args.suites):
+                break
+            dataset_root = write_dataset(work_dir / f"e{num_edges}_d{num_docs}", lineage, make_corpus(lineage, num_docs, seed=args.seed))
+            vectorstore, retriever, snapshot_dir, timings = build_system(core, dataset_root, lineage)
+            label = f"{len(lineage['edges'])} edges, {timings['documents']} docs"
+            if "ingestion" in args.suites:
+                results["ingestion"].append({"label": label, **timings})
+                print(f"   ingestion ({timings['documents']} docs): load {timings['load_documents_ms']:.0f}ms, "
+                      f"embed {timings['embed_ms']:.0f}ms, index {timings['qdrant_index_ms']:.0f}ms, snapshot {timings['snapshot_write_ms']:.0f}ms")
+            if "search" in args.suites:
+                row = {"label": label, **bench_search(core, vectorstore, retriever, snapshot_dir, lineage, args.repeat)}
+                results["search"].append(row)
+                print(f"   search: qdrant {row['qdrant_similarity_k5']['median_ms']:.2f}ms, "
+                      f"snapshot {row['snapshot_similarity_k5']['median_ms']:.2f}ms, "
+                      f"with lineage {row['search_with_lineage_uncached']['median_ms']:.2f}ms")
+            if "api" in args.suites:
+                row = {"label": label, **bench_api(core, vectorstore, retriever, lineage, args.repeat)}
+                results["api"].append(row)
+                print(f"   api: /lineage {row['lineage_hub_page']['median_ms']:.2f}ms, "
+                      f"triage {row['triage_two_pass']['median_ms']:.2f}ms")
+
+    output = {
+        "benchmark": "scale",
+        "timestamp": time.time(),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": vars(args),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(output, f, indent=2)
+        print(f"✅ Results written to {args.output}")
+    if args.compare:
+        compare(output, args.compare)
+
+
+if __name__ == "__main__":
+    main()
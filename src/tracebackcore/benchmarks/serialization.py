@@ -0,0 +1,176 @@
+"""
+Response serialization benchmark
+
+Builds the large API payloads offline from the corpus in ``data/`` (no LLM or
+vector store needed) and reports, per payload and projection:
+
+    bytes          raw JSON, gzip and (when brotli is installed) br sizes
+    render         median milliseconds to encode, standard encoder vs orjson
+
+Payloads:
+
+    triage         IncidentResponse whose impact_assessment.context_sources carries
+                   every spec and SQL file, as a worst-case triage
+    search         /incident/search results for the whole corpus
+    lineage        /lineage for the most connected table
+
+Projections: ``full`` (today's response), ``include_context=false`` and a
+typical ``fields=`` selection.
+
+Usage:
+    python -m tracebackcore.benchmarks.serialization [--repeat 50] [--output results.json]
+"""
+
+import sys
+import json
+import gzip
+import time
+import argparse
+import statistics
+from pathlib import Path
+from typing import Dict, Any, List, Callable
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+project_root = Path(__file__).parent.parent.parent.parent
+
+
+def load_corpus() -> List[Dict[str, Any]]:
+    files = sorted((project_root / "data" / "docs").glob("*.md")) + sorted((project_root / "data" / "repo").glob("*.sql"))
+    return [{"content": path.read_text(encoding="utf-8"), "source": path.name} for path in files]
+
+
+def build_payloads(corpus: List[Dict[str, Any]], lineage_data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    sources = [doc["source"] for doc in corpus]
+    triage = {
+        "incident_brief": "Incident brief\n" + "Impact summary line.\n" * 40,
+        "blast_radius": sorted({edge["to"] for edge in lineage_data.get("edges", [])}),
+        "impact_assessment": {
+            "retrieval_method": "Original RAG",
+            "context_sources": corpus,
+        },
+        "processing_time": 1.0,
+        "sources_used": sources,
+        "priority": "high",
+    }
+    search = {
+        "query": "revenue dashboard is stale",
+        "filters": {},
+        "results": [
+            {"content": doc["content"], "metadata": {"file_name": doc["source"], "doc_id": i}}
+            for i, doc in enumerate(corpus)
+        ],
+        "total": len(corpus),
+    }
+    degree: Dict[str, int] = {}
+    for edge in lineage_data.get("edges", []):
+        for table in (edge["from"], edge["to"]):
+            degree[table] = degree.get(table, 0) + 1
+    table = max(degree, key=degree.get) if degree else "unknown"
+    lineage = {
+        "table": table,
+        "upstream_dependencies": [edge["from"] for edge in lineage_data.get("edges", []) if edge["to"] == table],
+        "downstream_impacts": [
+            {"table": edge["to"], "distance": 1, "pipeline": edge.get("pipeline")}
+            for edge in lineage_data.get("edges", []) if edge["from"] == table
+        ],
+        "producing_code": [{"file_name": doc["source"], "content": doc["content"]} for doc in corpus[:2]],
+    }
+    return {"triage": triage, "search": search, "lineage": lineage}
+
+
+PROJECTIONS = {
+    "triage": [("full", None, True), ("include_context=false", None, False),
+               ("fields=incident_brief,blast_radius", "incident_brief,blast_radius", True)],
+    "search": [("full", None, True), ("include_context=false", None, False),
+               ("fields=results.metadata", "results.metadata", True)],
+    "lineage": [("full", None, True), ("fields=table,downstream_impacts", "table,downstream_impacts", True)],
+}
+
+
+def median_ms(render: Callable[[], bytes], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def measure(name: str, payload: Dict[str, Any], repeat: int) -> List[Dict[str, Any]]:
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from tracebackcore.api import responses
+    from tracebackcore.api.main import IncidentResponse
+
+    rows = []
+    for label, fields, include_context in PROJECTIONS[name]:
+        data = payload
+        if fields:
+            data = responses._select(data, [field.split(".") for field in responses.parse_fields(fields)])
+        if not include_context:
+            data = responses.strip_context(data)
+
+        if name == "triage" and label == "full":
+            # response_model path: validate and jsonable_encoder before the response class renders
+            prepare = lambda data=data: jsonable_encoder(IncidentResponse(**data))
+        else:
+            prepare = lambda data=data: data
+        standard = lambda: JSONResponse(prepare()).body
+        body = standard()
+
+        row = {
+            "payload": name,
+            "projection": label,
+            "raw_bytes": len(body),
+            "gzip_bytes": len(gzip.compress(body, compresslevel=6)),
+            "br_bytes": len(responses.compress(body, "br")) if responses.brotli else None,
+            "standard_ms": median_ms(standard, repeat),
+            "orjson_ms": None,
+        }
+        if responses.orjson is not None:
+            row["orjson_ms"] = median_ms(lambda: responses.FastJSONResponse(prepare()).body, repeat)
+        rows.append(row)
+    return rows
+
+
+def cell(value, width: int, scale: float = 1.0) -> str:
+    """Right-aligned number, or ``-`` when the optional dependency was missing."""
+    if value is None:
+        return f"{'-':>{width}}"
+    return f"{value / scale:>{width}.{1 if scale != 1.0 else 3}f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Payload size and render time of API responses")
+    parser.add_argument("--repeat", type=int, default=50, help="Timed renders per payload")
+    parser.add_argument("--output", type=str, default=None, help="Write results JSON to this path")
+    args = parser.parse_args()
+
+    with open(project_root / "data" / "lineage.json", "r", encoding="utf-8") as f:
+        lineage_data = json.load(f)
+    payloads = build_payloads(load_corpus(), lineage_data)
+    rows = [row for name, payload in payloads.items() for row in measure(name, payload, args.repeat)]
+
+    results = {
+        "benchmark": "serialization",
+        "timestamp": time.time(),
+        "repeat": args.repeat,
+        "rows": rows,
+    }
+
+    print("\n📊 Response size and render time")
+    print(f"{'Payload':<8} {'Projection':<38} {'Raw(KB)':>8} {'gzip(KB)':>9} {'br(KB)':>7} {'std(ms)':>8} {'orjson(ms)':>11}")
+    for row in rows:
+        print(f"{row['payload']:<8} {row['projection']:<38} {row['raw_bytes'] / 1024:>8.1f} "
+              f"{row['gzip_bytes'] / 1024:>9.1f} {cell(row['br_bytes'], 7, 1024)} "
+              f"{row['standard_ms']:>8.3f} {cell(row['orjson_ms'], 11)}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Single-pass vs two-pass triage benchmark
+
+Runs every golden-set question through the Original RAG graph in both modes and
+compares LLM latency, LLM calls and token usage.
+
+Usage:
+    python -m tracebackcore.benchmarks.single_pass [--limit N] [--output results.json]
+"""
+
+import re
+import sys
+import json
+import time
+import argparse
+import statistics
+from pathlib import Path
+from typing import Dict, Any, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+project_root = Path(__file__).parent.parent.parent.parent
+GOLDEN_SET = project_root / "data" / "golden_test_data.json"
+
+
+def ground_truth_recall(brief: str, ground_truth: str) -> float:
+    """Fraction of ground-truth terms that appear in the brief (cheap quality proxy)."""
+    truth_terms = set(re.findall(r"\b[a-z][a-z0-9_.]{3,}\b", ground_truth.lower()))
+    if not truth_terms:
+        return 0.0
+    brief_terms = set(re.findall(r"\b[a-z][a-z0-9_.]{3,}\b", brief.lower()))
+    return len(truth_terms & brief_terms) / len(truth_terms)
+
+
+def run_mode(graph, questions: List[Dict[str, Any]], single_pass: bool) -> Dict[str, Any]:
+    """Run all questions in one mode and collect per-question measurements."""
+    from langchain_community.callbacks import get_openai_callback
+    from tracebackcore.core import create_initial_state, llm_cache
+
+    if llm_cache:
+        llm_cache.reset_stats()
+    rows = []
+    for item in questions:
+        with get_openai_callback() as cb:
+            start = time.perf_counter()
+            result = graph.invoke(create_initial_state(item["question"], single_pass=single_pass))
+            elapsed = time.perf_counter() - start
+
+        rows.append({
+            "question": item["question"],
+            "latency": elapsed,
+            "llm_calls": cb.successful_requests,
+            "prompt_tokens": cb.prompt_tokens,
+            "completion_tokens": cb.completion_tokens,
+            "recall": ground_truth_recall(result.get("incident_brief") or "", item["ground_truth"]),
+            "error": result.get("error"),
+        })
+
+    return {
+        "mode": "single_pass" if single_pass else "two_pass",
+        "mean_latency": statistics.mean(r["latency"] for r in rows),
+        "p95_latency": sorted(r["latency"] for r in rows)[int(0.95 * (len(rows) - 1))],
+        "mean_llm_calls": statistics.mean(r["llm_calls"] for r in rows),
+        "mean_prompt_tokens": statistics.mean(r["prompt_tokens"] for r in rows),
+        "mean_completion_tokens": statistics.mean(r["completion_tokens"] for r in rows),
+        "mean_recall": statistics.mean(r["recall"] for r in rows),
+        "errors": sum(1 for r in rows if r["error"]),
+        "llm_cache": llm_cache.reset_stats() if llm_cache else None,
+        "questions": rows,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare single-pass and two-pass triage on the golden set")
+    parser.add_argument("--limit", type=int, default=None, help="Only run the first N questions")
+    parser.add_argument("--output", type=str, default=None, help="Write results JSON to this path")
+    args = parser.parse_args()
+
+    with open(GOLDEN_SET, "r", encoding="utf-8") as f:
+        questions = json.load(f)[:args.limit]
+
+    from tracebackcore import core
+    if not core.traceback_graph:
+        core.initialize_system()
+
+    results = {
+        "benchmark": "single_pass",
+        "timestamp": time.time(),
+        "questions": len(questions),
+        "modes": [run_mode(core.traceback_graph, questions, single_pass) for single_pass in (False, True)],
+    }
+
+    print(f"\n📊 Single-pass vs two-pass ({len(questions)} golden questions)")
+    print(f"{'Mode':<12} {'Latency(s)':>11} {'p95(s)':>8} {'Calls':>6} {'Prompt tok':>11} {'Compl tok':>10} {'Recall':>7}")
+    for mode in results["modes"]:
+        print(f"{mode['mode']:<12} {mode['mean_latency']:>11.2f} {mode['p95_latency']:>8.2f} "
+              f"{mode['mean_llm_calls']:>6.1f} {mode['mean_prompt_tokens']:>11.0f} "
+              f"{mode['mean_completion_tokens']:>10.0f} {mode['mean_recall']:>7.3f}")
+        if mode["llm_cache"]:
+            print(f"{'':<12} LLM cache: {mode['llm_cache']['hits']} hits, {mode['llm_cache']['misses']} misses")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Autocomplete latency benchmark
+
+Builds the suggestion index over a synthetic warehouse (see synthetic.py) and
+times ``SuggestIndex.suggest`` for prefixes typed one keystroke at a time. The
+prefixes are taken from random table, dashboard and pipeline names, from 1
+character up to the full id, so short, very unselective prefixes are included.
+
+Usage:
+    python -m tracebackcore.benchmarks.suggest [--edges 250000] [--queries 2000] [--limit 10]
+"""
+
+import sys
+import time
+import random
+import argparse
+import statistics
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency of /suggest prefix lookups on a synthetic lineage graph")
+    parser.add_argument("--edges", type=int, default=250000, help="Synthetic lineage edges")
+    parser.add_argument("--queries", type=int, default=2000, help="Names typed keystroke by keystroke")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    from tracebackcore.benchmarks.fakes import install_fake_providers
+    from tracebackcore.benchmarks.synthetic import make_lineage
+    install_fake_providers()
+    from tracebackcore.core import LineageAwareRetriever
+    from tracebackcore.suggest import SuggestIndex
+
+    lineage = make_lineage(args.edges, seed=args.seed)
+    start = time.perf_counter()
+    index = SuggestIndex.from_lineage(lineage, LineageAwareRetriever.compute_criticality(lineage))
+    build_seconds = time.perf_counter() - start
+    table_bytes = sum(level.nbytes for level in index._levels) + index.ranks.nbytes + index.key_entities.nbytes
+
+    rng = random.Random(args.seed)
+    samples, by_length = [], {}
+    for _ in range(args.queries):
+        entity = rng.choice(index.entities)
+        for length in range(1, len(entity["id"]) + 1):
+            prefix = entity["id"][:length]
+            t0 = time.perf_counter()
+            results = index.suggest(prefix, args.limit)
+            elapsed = (time.perf_counter() - t0) * 1000
+            samples.append(elapsed)
+            by_length.setdefault(min(length, 6), []).append(elapsed)
+            assert results, prefix
+
+    samples.sort()
+    print(f"\n📊 /suggest over {len(index)} entities ({len(index.keys)} keys), built in {build_seconds:.1f}s, "
+          f"{table_bytes / 1e6:.1f} MB of arrays")
+    print(f"   {len(samples)} lookups: median {statistics.median(samples):.4f} ms, "
+          f"p99 {samples[int(len(samples) * 0.99)]:.4f} ms, max {samples[-1]:.4f} ms")
+    print(f"{'Prefix len':>10} {'Lookups':>8} {'Median(ms)':>11} {'p99(ms)':>8}")
+    for length, values in sorted(by_length.items()):
+        values.sort()
+        label = f"{length}+" if length == 6 else str(length)
+        print(f"{label:>10} {len(values):>8} {statistics.median(values):>11.4f} {values[int(len(values) * 0.99)]:>8.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Synthetic lineage and corpus generators
+
+Seeded generators for lineage graphs shaped like a warehouse (layered schemas,
+heavy-tailed fan-in/fan-out from hub tables, a few deep chains) and for the
+markdown specs and SQL pipelines that document them. ``write_dataset`` lays the
+result out like the project's ``data/`` directory so ``load_lineage_data`` and
+``load_documents`` can ingest it unchanged.
+"""
+
+import json
+import random
+from pathlib import Path
+from typing import List, Dict, Any, Tuple
+
+LAYERS = ["raw", "staging", "curated", "analytics", "mart"]
+DASHBOARD_SCHEMAS = ["bi", "ops"]
+TEAMS = ["Finance", "Sales", "Marketing", "Product", "Executive", "Operations", "Support", "Data Engineering"]
+OWNERS = ["data-platform", "data-sales", "data-analytics", "data-finance", "data-marketing"]
+REFRESH_FREQUENCIES = ["real-time", "hourly", "hourly", "daily", "daily", "daily", "weekly"]
+SUBJECTS = ["orders", "customers", "products", "refunds", "payments", "sessions", "inventory", "shipments", "invoices", "events"]
+OPERATIONS = ["join", "aggregate", "filter", "clean+enrich", "dedupe", "union"]
+
+
+def table_name(layer: str, index: int) -> str:
+    return f"{layer}.{SUBJECTS[index % len(SUBJECTS)]}_{index:07d}"
+
+
+def make_lineage(
+    num_edges: int,
+    seed: int = 42,
+    avg_fan_in: float = 2.0,
+    hub_fraction: float = 0.01,
+    chain_depth: int = 50,
+    num_chains: int = 3
+) -> Dict[str, Any]:
+    """Synthetic lineage with about ``num_edges`` edges.
+
+    Tables are spread over ``LAYERS``; every non-raw table reads ``avg_fan_in``
+    tables (on average) from earlier layers. Sources are drawn preferentially
+    from a small set of hub tables, giving the heavy-tailed fan-out of real
+    warehouses. ``num_chains`` chains of ``chain_depth`` single-parent hops are
+    added to exercise deep traversals.
+    """
+    rng = random.Random(seed)
+    chain_edges = num_chains * chain_depth
+    num_tables = max(len(LAYERS) * 2, int((num_edges - chain_edges) / avg_fan_in * len(LAYERS) / (len(LAYERS) - 1)))
+
+    nodes, tables_by_layer = [], []
+    index = 0
+    per_layer = max(2, num_tables // len(LAYERS))
+    for layer in LAYERS:
+        layer_tables = []
+        for _ in range(per_layer):
+            node_id = table_name(layer, index)
+            nodes.append({
+                "id": node_id,
+                "type": "table",
+                "schema": layer,
+                "owners": [rng.choice(OWNERS)],
+                "description": f"{layer.title()} {node_id.split('.', 1)[1].rsplit('_', 1)[0]} data"
+            })
+            layer_tables.append(node_id)
+            index += 1
+        tables_by_layer.append(layer_tables)
+
+    edges: List[Dict[str, Any]] = []
+    seen = set()
+
+    def add_edge(source: str, target: str):
+        if (source, target) in seen or source == target:
+            return
+        seen.add((source, target))
+        edges.append({
+            "from": source,
+            "to": target,
+            "operation": rng.choice(OPERATIONS),
+            "pipeline": f"{target.split('.', 1)[1]}_pipeline.sql"
+        })
+
+    budget = num_edges - chain_edges
+    for layer_index in range(1, len(LAYERS)):
+        upstream = [table for layer in tables_by_layer[:layer_index] for table in layer]
+        hubs = upstream[:max(1, int(len(upstream) * hub_fraction))]
+        for target in tables_by_layer[layer_index]:
+            fan_in = max(1, round(rng.expovariate(1 / avg_fan_in)))
+            for _ in range(fan_in):
+                if len(edges) >= budget:
+                    break
+                pool = hubs if rng.random() < 0.3 else upstream
+                add_edge(rng.choice(pool), target)
+
+    # Deep single-parent chains hanging off a hub
+    for chain in range(num_chains):
+        previous = tables_by_layer[0][chain % len(tables_by_layer[0])]
+        for depth in range(chain_depth):
+            node_id = f"staging.chain{chain}_step_{depth:04d}"
+            nodes.append({"id": node_id, "type": "table", "schema": "staging", "owners": ["data-platform"], "description": "Chained transformation"})
+            add_edge(previous, node_id)
+            previous = node_id
+
+    pipelines: Dict[str, Dict[str, Any]] = {}
+    for edge in edges:
+        pipeline_id = edge["pipeline"][:-len(".sql")]
+        pipeline = pipelines.setdefault(pipeline_id, {
+            "id": pipeline_id,
+            "name": pipeline_id.replace("_", " ").title(),
+            "file": edge["pipeline"],
+            "schedule": rng.choice(["hourly", "daily"]),
+            "owner": rng.choice(OWNERS),
+            "dependencies": [],
+            "outputs": [edge["to"]]
+        })
+        pipeline["dependencies"].append(edge["from"])
+
+    marts = tables_by_layer[-1] + tables_by_layer[-2]
+    dashboards = []
+    for dashboard_index in range(max(1, len(nodes) // 20)):
+        schema = DASHBOARD_SCHEMAS[dashboard_index % len(DASHBOARD_SCHEMAS)]
+        dashboards.append({
+            "id": f"{schema}.dashboard_{dashboard_index:06d}",
+            "name": f"Dashboard {dashboard_index}",
+            "tables": rng.sample(marts, min(len(marts), rng.randint(1, 4))),
+            "teams": rng.sample(TEAMS, rng.randint(1, 3)),
+            "description": "Synthetic dashboard",
+            "refresh_frequency": rng.choice(REFRESH_FREQUENCIES)
+        })
+
+    return {"nodes": nodes, "edges": edges, "dashboards": dashboards, "pipelines": list(pipelines.values())}
+
+
+def render_sql(pipeline: Dict[str, Any], rng: random.Random) -> str:
+    sources = pipeline["dependencies"]
+    target = pipeline["outputs"][0]
+    joins = "\n".join(
+        f"LEFT JOIN {source} t{position} ON t0.id = t{position}.id"
+        for position, source in enumerate(sources[1:], 1)
+    )
+    filter_days = rng.choice([1, 7, 30, 90])
+    return (
+        f"-- {pipeline['name']}\n"
+        f"-- Owner: {pipeline['owner']}, schedule: {pipeline['schedule']}\n\n"
+        f"INSERT INTO {target}\n"
+        f"SELECT\n    t0.id,\n    t0.updated_at,\n    COUNT(*) AS row_count,\n    CURRENT_TIMESTAMP AS processed_at\n"
+        f"FROM {sources[0]} t0\n{joins}\n"
+        f"WHERE t0.updated_at >= CURRENT_DATE - INTERVAL '{filter_days} days'\n"
+        f"GROUP BY t0.id, t0.updated_at;\n"
+    )
+
+
+def render_spec(pipeline: Dict[str, Any], dashboards: List[Dict[str, Any]], rng: random.Random) -> str:
+    target = pipeline["outputs"][0]
+    consumers = "\n".join(f"- {dashboard['name']} ({dashboard['id']}), teams: {', '.join(dashboard['teams'])}" for dashboard in dashboards) or "- None"
+    sources = "\n".join(f"- {source}" for source in pipeline["dependencies"])
+    return (
+        f"# {pipeline['name']}\n\n"
+        f"## Overview\nBuilds `{target}` on a {pipeline['schedule']} schedule. Owned by {pipeline['owner']}.\n\n"
+        f"## Sources\n{sources}\n\n"
+        f"## Consumers\n{consumers}\n\n"
+        f"## SLA\nData must land within {rng.choice([1, 2, 4, 6])} hours of the schedule.\n\n"
+        f"## Failure Handling\nOn failure, check upstream freshness, row counts and schema drift, then rerun the job. "
+        f"Notify downstream owners if {target} is late.\n"
+    )
+
+
+def make_corpus(lineage: Dict[str, Any], num_pipelines: int, seed: int = 42) -> List[Tuple[str, str, str]]:
+    """Markdown spec and SQL file for ``num_pipelines`` pipelines, as (file_name, doc_type, content)."""
+    rng = random.Random(seed)
+    pipelines = lineage.get("pipelines", [])
+    chosen = rng.sample(pipelines, min(num_pipelines, len(pipelines)))
+
+    dashboards_by_table: Dict[str, List[Dict[str, Any]]] = {}
+    for dashboard in lineage.get("dashboards", []):
+        for table in dashboard["tables"]:
+            dashboards_by_table.setdefault(table, []).append(dashboard)
+
+    corpus = []
+    for pipeline in chosen:
+        stem = pipeline["id"][:-len("_pipeline")] if pipeline["id"].endswith("_pipeline") else pipeline["id"]
+        corpus.append((f"{stem}_spec.md", "markdown", render_spec(pipeline, dashboards_by_table.get(pipeline["outputs"][0], []), rng)))
+        corpus.append((pipeline["file"], "sql", render_sql(pipeline, rng)))
+    return corpus
+
+
+def write_dataset(root, lineage: Dict[str, Any], corpus: List[Tuple[str, str, str]]) -> Path:
+    """Write ``data/lineage.json``, ``data/docs/*.md`` and ``data/repo/*.sql`` under ``root``."""
+    root = Path(root)
+    docs_dir = root / "data" / "docs"
+    repo_dir = root / "data" / "repo"
+    docs_dir.mkdir(parents=True, exist_ok=True)
+    repo_dir.mkdir(parents=True, exist_ok=True)
+    with open(root / "data" / "lineage.json", "w", encoding="utf-8") as f:
+        json.dump(lineage, f)
+    for file_name, doc_type, content in corpus:
+        (docs_dir if doc_type == "markdown" else repo_dir).joinpath(file_name).write_text(content, encoding="utf-8")
+    return root
@@ -0,0 +1,224 @@
+"""
+Traceback Retriever Cascade
+
+Backs the ``Auto`` retriever. Retrieval stages run cheapest first, and the
+cascade stops at the first stage whose context looks good enough. Only the
+questions that need it pay for a Cohere rerank or an extra LLM call.
+
+Stages, in cost order:
+
+    vector      one similarity search with scores (one embedding)
+    lineage     producing code and lineage summaries of the linked tables (no network)
+    rerank      Cohere rerank of the vector candidates (one network call)
+    expansion   LLM rewrites of the question, one search each (one LLM call)
+
+Confidence in [0, 1] is the weighted mean of three signals:
+
+    similarity  top score, scaled between a floor and a ceiling
+    margin      how far the top hit stands out from the other candidates
+    coverage    fraction of tables linked in the question that the context mentions
+
+Coverage is left out for questions that link no tables. When no stage reaches
+the threshold, the most confident context seen is used. A stage whose provider
+fails, times out or has an open circuit is skipped. Every stage is recorded in a
+decision trail returned with the result.
+"""
+
+import os
+import time
+import statistics
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Callable, Tuple
+
+from langchain_core.documents import Document
+
+from tracebackcore import deadlines
+
+AUTO_CONFIDENCE = float(os.getenv("TRACEBACK_AUTO_CONFIDENCE", "0.6"))
+
+# Cosine similarity range over which the similarity signal goes from 0 to 1
+AUTO_SIMILARITY_FLOOR = float(os.getenv("TRACEBACK_AUTO_SIMILARITY_FLOOR", "0.25"))
+AUTO_SIMILARITY_CEILING = float(os.getenv("TRACEBACK_AUTO_SIMILARITY_CEILING", "0.55"))
+# Lead of the top hit over the mean of the other candidates that counts as a clear winner
+AUTO_MARGIN = float(os.getenv("TRACEBACK_AUTO_MARGIN", "0.08"))
+
+# (floor, ceiling, full margin) per kind of score; Cohere relevance is already in [0, 1]
+SCORE_SCALES = {
+    "similarity": (AUTO_SIMILARITY_FLOOR, AUTO_SIMILARITY_CEILING, AUTO_MARGIN),
+    "relevance": (0.1, 0.9, 0.3),
+}
+SIGNAL_WEIGHTS = {"similarity": 0.4, "margin": 0.2, "coverage": 0.4}
+
+# Vector candidates fetched per search (the context keeps the top ``k``)
+CANDIDATE_FACTOR = 2
+
+
+def _scaled(value: float, low: float, high: float) -> float:
+    return min(1.0, max(0.0, (value - low) / (high - low))) if high > low else float(value >= high)
+
+
+def coverage(documents: List[Document], table_names: List[str]) -> Optional[float]:
+    """Fraction of ``table_names`` mentioned by the documents (text or ``table`` metadata)."""
+    if not table_names:
+        return None
+    text = "\n".join(doc.page_content for doc in documents).lower()
+    tagged = {doc.metadata.get("table") for doc in documents}
+    covered = [table for table in table_names if table in tagged or table.lower() in text]
+    return len(covered) / len(table_names)
+
+
+def confidence_signals(scores: List[float], documents: List[Document], table_names: List[str],
+                       scale: str = "similarity") -> Dict[str, Optional[float]]:
+    """Similarity, margin and coverage signals, each in [0, 1] (coverage None without linked tables)."""
+    floor, ceiling, full_margin = SCORE_SCALES[scale]
+    ranked = sorted(scores, reverse=True)
+    top = ranked[0] if ranked else 0.0
+    rest = ranked[1:]
+    return {
+        "similarity": _scaled(top, floor, ceiling) if ranked else 0.0,
+        "margin": _scaled(top - statistics.mean(rest), 0.0, full_margin) if rest else float(bool(ranked)),
+        "coverage": coverage(documents, table_names),
+    }
+
+
+def combine(signals: Dict[str, Optional[float]]) -> float:
+    """Weighted mean of the available signals."""
+    available = {name: value for name, value in signals.items() if value is not None}
+    total = sum(SIGNAL_WEIGHTS[name] for name in available)
+    return sum(SIGNAL_WEIGHTS[name] * value for name, value in available.items()) / total if total else 0.0
+
+
+@dataclass
+class CascadeResult:
+    documents: List[Document]
+    table_names: List[str]
+    stage: str
+    confidence: float
+    trail: List[Dict[str, Any]] = field(default_factory=list)
+
+
+class RetrieverCascade:
+    """Cheapest-first retrieval that escalates while confidence is below ``threshold``.
+
+    ``rerank(question, texts, top_n)`` returns ``(index, relevance)`` pairs and
+    ``expand(question)`` returns alternative phrasings; a stage whose callable
+    is missing is skipped.
+    """
+
+    def __init__(
+        self,
+        vectorstore,
+        lineage_retriever=None,
+        rerank: Optional[Callable[[str, List[str], int], List[Tuple[int, float]]]] = None,
+        expand: Optional[Callable[[str], List[str]]] = None,
+        threshold: Optional[float] = None,
+        k: int = 5
+    ):
+        self.vectorstore = vectorstore
+        self.lineage_retriever = lineage_retriever
+        self.rerank = rerank
+        self.expand = expand
+        self.threshold = AUTO_CONFIDENCE if threshold is None else threshold
+        self.k = k
+
+    def _search(self, query: str, k: int, filters: Dict[str, Any]) -> List[Tuple[Document, float]]:
+        from tracebackcore.core import build_search_filter
+        with deadlines.stage("retrieval"):
+            return self.vectorstore.similarity_search_with_score(query, k=k, filter=build_search_filter(filters))
+
+    def run(self, question: str, filters: Optional[Dict[str, Any]] = None) -> CascadeResult:
+        filters = {key: value for key, value in (filters or {}).items() if value}
+        table_names = self.lineage_retriever.find_tables(question) if self.lineage_retriever else []
+        doc_types = filters.get("type")
+        doc_types = [doc_types] if isinstance(doc_types, str) else list(doc_types or [])
+        # Lineage summaries are not stored in the vector store
+        vector_filters = dict(filters)
+        if doc_types:
+            vector_filters["type"] = [doc_type for doc_type in doc_types if doc_type != "lineage"]
+        candidates = self.k * CANDIDATE_FACTOR
+
+        stages = ["vector"]
+        if table_names and "file_name" not in filters and "pipeline" not in filters:
+            stages.append("lineage")
+        if self.rerank:
+            stages.append("rerank")
+        if self.expand:
+            stages.append("expansion")
+
+        # scored: (document, score) ranked candidates; pinned: documents kept ahead of them
+        vector_scored: List[Tuple[Document, float]] = []
+        scored: List[Tuple[Document, float]] = []
+        pinned: List[Document] = []
+        pinned_text = set()
+        scale = "similarity"
+        trail: List[Dict[str, Any]] = []
+        best: Optional[CascadeResult] = None
+
+        for stage in stages:
+            started = time.perf_counter()
+            try:
+                if stage == "vector":
+                    if not doc_types or vector_filters["type"]:
+                        vector_scored = scored = self._search(question, candidates, vector_filters)
+                elif stage == "lineage":
+                    from tracebackcore.core import tables_in_schema
+                    linked = tables_in_schema(table_names, filters)
+                    pinned = self.lineage_retriever.code_documents(linked, vector_filters) if not doc_types or vector_filters["type"] else []
+                    if not doc_types or "lineage" in doc_types:
+                        pinned += self.lineage_retriever.lineage_summaries(linked)
+                    pinned_text = {doc.page_content for doc in pinned}
+                    scored = [(doc, score) for doc, score in scored if doc.page_content not in pinned_text]
+                elif stage == "rerank":
+                    ranked = self.rerank(question, [doc.page_content for doc, _ in vector_scored], self.k)
+                    scored = [
+                        (vector_scored[index][0], relevance) for index, relevance in ranked
+                        if vector_scored[index][0].page_content not in pinned_text
+                    ]
+                    scale = "relevance"
+                elif stage == "expansion":
+                    # Rewrites are searched with the question's own results; the best score per document wins
+                    merged = {doc.page_content: (doc, score) for doc, score in vector_scored}
+                    queries = self.expand(question) if not doc_types or vector_filters["type"] else []
+                    for query in queries:
+                        for doc, score in self._search(query, self.k, vector_filters):
+                            if doc.page_content not in merged or merged[doc.page_content][1] < score:
+                                merged[doc.page_content] = (doc, score)
+                    scored = sorted((item for item in merged.values() if item[0].page_content not in pinned_text),
+                                    key=lambda item: item[1], reverse=True)
+                    scale = "similarity"
+            except Exception as e:
+                # A failed, timed-out or circuit-broken provider skips the stage
+                trail.append({
+                    "stage": stage,
+                    "decision": "failed",
+                    "error": str(e),
+                    "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+                })
+                continue
+
+            # Pinned documents take context slots first; at least one ranked candidate stays
+            documents = pinned + [doc for doc, _ in scored[:max(1, self.k - len(pinned))]]
+            signals = confidence_signals([score for _, score in scored[:self.k]], documents, table_names, scale)
+            confidence = combine(signals)
+            accepted = confidence >= self.threshold
+            trail.append({
+                "stage": stage,
+                "confidence": round(confidence, 3),
+                "signals": {name: None if value is None else round(value, 3) for name, value in signals.items()},
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+                "decision": "accept" if accepted else ("escalate" if stage != stages[-1] else "exhausted"),
+            })
+            if best is None or confidence >= best.confidence:
+                best = CascadeResult(documents, table_names, stage, confidence)
+            if accepted:
+                break
+
+        if best is None:
+            best = CascadeResult([], table_names, "none", 0.0)
+        best.trail = trail
+        steps = " → ".join(
+            f"{step['stage']} {step['confidence']:.2f}" if "confidence" in step else f"{step['stage']} failed"
+            for step in trail
+        )
+        print(f"🧭 Auto retriever: {steps}; using {best.stage} context")
+        return best
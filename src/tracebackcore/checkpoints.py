@@ -0,0 +1,238 @@
+"""
+Traceback Triage Checkpoints
+
+Per-node checkpoints of ``AgentState`` in SQLite (WAL mode), keyed by triage id.
+Every graph node is wrapped by ``CheckpointStore.wrap_node``: a node that already
+completed for this triage returns its saved output instead of running again, so
+a retry or re-request of a failed triage resumes from the last completed node
+and never repeats a successful LLM call. A triage id is bound to the question
+and options it started with; reusing it for a different request raises
+``TriageConflict``.
+
+Checkpointing is opt-in (``TRACEBACK_CHECKPOINTS=true``): it writes the full
+graph state to SQLite after every node of every triage, typically a few
+hundred KB per triage with retrieved context.
+"""
+
+import os
+import json
+import time
+import hashlib
+import uuid
+import sqlite3
+import threading
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Callable
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS triages (
+    triage_id TEXT PRIMARY KEY,
+    question TEXT NOT NULL,
+    options TEXT,
+    fingerprint TEXT,
+    status TEXT NOT NULL,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    triage_id TEXT NOT NULL,
+    node TEXT NOT NULL,
+    status TEXT NOT NULL,
+    state TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 1,
+    duration REAL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (triage_id, node)
+);
+CREATE INDEX IF NOT EXISTS idx_triages_updated ON triages (updated_at);
+"""
+
+
+def default_checkpoint_path() -> Path:
+    project_root = Path(__file__).parent.parent.parent
+    return Path(os.getenv("TRACEBACK_CHECKPOINT_DB", project_root / "data" / "checkpoints.db"))
+
+
+def new_triage_id() -> str:
+    return uuid.uuid4().hex
+
+
+def triage_fingerprint(question: str, options: Optional[Dict[str, Any]] = None) -> str:
+    """Hash of the question and options a triage id is bound to."""
+    canonical = json.dumps({"question": question, "options": options or {}}, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class TriageConflict(ValueError):
+    """Raised when a triage id is reused for a different question or options."""
+
+
+class CheckpointStore:
+    """SQLite store of triage runs and their per-node AgentState checkpoints."""
+
+    def __init__(self, path=None, retention_seconds: Optional[float] = None):
+        self.path = Path(path) if path else default_checkpoint_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.retention_seconds = retention_seconds
+        self._local = threading.local()
+        self.stats = {"reused": 0, "completed": 0, "failed": 0}
+        self._conn().executescript(SCHEMA)
+        columns = {row["name"] for row in self._conn().execute("PRAGMA table_info(triages)")}
+        if "fingerprint" not in columns:
+            self._conn().execute("ALTER TABLE triages ADD COLUMN fingerprint TEXT")
+
+    @classmethod
+    def from_env(cls) -> Optional["CheckpointStore"]:
+        """Store configured by TRACEBACK_CHECKPOINTS / TRACEBACK_CHECKPOINT_DB, or None when disabled (the default)."""
+        if os.getenv("TRACEBACK_CHECKPOINTS", "false").lower() not in ("1", "true", "yes"):
+            return None
+        retention_hours = float(os.getenv("TRACEBACK_CHECKPOINT_RETENTION_HOURS", "168"))
+        return cls(retention_seconds=retention_hours * 3600 if retention_hours > 0 else None)
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread; FastAPI runs triages on a thread pool
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def start(self, triage_id: str, question: str, options: Optional[Dict[str, Any]] = None):
+        """Register a triage run; an existing run keeps its checkpoints so it resumes.
+
+        Raises TriageConflict if ``triage_id`` already belongs to a different question or options.
+        """
+        now = time.time()
+        fingerprint = triage_fingerprint(question, options)
+        existing = self._conn().execute(
+            "SELECT question, options, fingerprint FROM triages WHERE triage_id = ?", (triage_id,)
+        ).fetchone()
+        if existing is not None:
+            # Runs recorded before fingerprints were stored are checked against their question and options
+            stored = existing["fingerprint"] or triage_fingerprint(
+                existing["question"], json.loads(existing["options"] or "{}")
+            )
+            if stored != fingerprint:
+                raise TriageConflict(
+                    f"Triage {triage_id} belongs to a different question or options; use a new triage_id"
+                )
+        self._conn().execute(
+            "INSERT OR IGNORE INTO triages (triage_id, question, options, fingerprint, status, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, 'running', ?, ?)",
+            (triage_id, question, json.dumps(options or {}), fingerprint, now, now)
+        )
+        self._conn().execute(
+            "UPDATE triages SET status = 'running', updated_at = ? WHERE triage_id = ?", (now, triage_id)
+        )
+        # Nodes that ran after the first failure saw its missing output, so only
+        # checkpoints from before it are kept for the resumed run
+        self._conn().execute(
+            "DELETE FROM checkpoints WHERE triage_id = ? AND status = 'completed' AND updated_at > "
+            "(SELECT MIN(updated_at) FROM checkpoints WHERE triage_id = ? AND status = 'failed')",
+            (triage_id, triage_id)
+        )
+
+    def finish(self, triage_id: str, error: Optional[str] = None):
+        self._conn().execute(
+            "UPDATE triages SET status = ?, error = ?, updated_at = ? WHERE triage_id = ?",
+            ("failed" if error else "complete", error, time.time(), triage_id)
+        )
+
+    def get_triage(self, triage_id: str) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute("SELECT * FROM triages WHERE triage_id = ?", (triage_id,)).fetchone()
+        if row is None:
+            return None
+        triage = dict(row)
+        triage["options"] = json.loads(triage["options"] or "{}")
+        triage["checkpoints"] = [
+            dict(checkpoint) for checkpoint in self._conn().execute(
+                "SELECT node, status, error, attempts, duration, updated_at FROM checkpoints "
+                "WHERE triage_id = ? ORDER BY updated_at", (triage_id,)
+            )
+        ]
+        return triage
+
+    def completed_state(self, triage_id: str, node: str) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute(
+            "SELECT state FROM checkpoints WHERE triage_id = ? AND node = ? AND status = 'completed'",
+            (triage_id, node)
+        ).fetchone()
+        return json.loads(row["state"]) if row else None
+
+    def record(self, triage_id: str, node: str, status: str, state: Optional[Dict[str, Any]] = None,
+               error: Optional[str] = None, duration: Optional[float] = None):
+        self._conn().execute(
+            "INSERT INTO checkpoints (triage_id, node, status, state, error, duration, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (triage_id, node) DO UPDATE SET status = excluded.status, state = excluded.state, "
+            "error = excluded.error, duration = excluded.duration, updated_at = excluded.updated_at, "
+            "attempts = attempts + 1",
+            (triage_id, node, status, json.dumps(state, default=str) if state is not None else None,
+             error, duration, time.time())
+        )
+        self.stats[status] += 1
+
+    def wrap_node(self, node: str, func: Callable[[Dict[str, Any]], Dict[str, Any]], live_keys=("degraded",)):
+        """Wrap a graph node so completed outputs are reused and failures are recorded.
+
+        ``live_keys`` are per-request settings taken from the current run rather
+        than from the saved checkpoint.
+        """
+        def checkpointed(state: Dict[str, Any]) -> Dict[str, Any]:
+            triage_id = state.get("triage_id")
+            if not triage_id:
+                return func(state)
+
+            saved = self.completed_state(triage_id, node)
+            if saved is not None:
+                self.stats["reused"] += 1
+                saved.update({key: state[key] for key in live_keys if key in state})
+                return saved
+
+            previous_error = state.get("error")
+            start = time.perf_counter()
+            try:
+                result = func(state)
+            except Exception as e:
+                self.record(triage_id, node, "failed", error=str(e), duration=time.perf_counter() - start)
+                raise
+            duration = time.perf_counter() - start
+
+            # Nodes report failures in state["error"] rather than raising
+            error = result.get("error")
+            if error and error != previous_error:
+                self.record(triage_id, node, "failed", error=error, duration=duration)
+            else:
+                self.record(triage_id, node, "completed", state=dict(result), duration=duration)
+            return result
+
+        checkpointed.__name__ = getattr(func, "__name__", node)
+        return checkpointed
+
+    def failed_nodes(self, triage_id: str) -> List[str]:
+        return [
+            row["node"] for row in self._conn().execute(
+                "SELECT node FROM checkpoints WHERE triage_id = ? AND status = 'failed'", (triage_id,)
+            )
+        ]
+
+    def compact(self) -> int:
+        """Delete triages (and their checkpoints) older than the retention window."""
+        if not self.retention_seconds:
+            return 0
+        cutoff = time.time() - self.retention_seconds
+        conn = self._conn()
+        conn.execute(
+            "DELETE FROM checkpoints WHERE triage_id IN (SELECT triage_id FROM triages WHERE updated_at < ?)",
+            (cutoff,)
+        )
+        return conn.execute("DELETE FROM triages WHERE updated_at < ?", (cutoff,)).rowcount
+
+    def get_stats(self) -> Dict[str, Any]:
+        by_status = dict(self._conn().execute("SELECT status, COUNT(*) FROM triages GROUP BY status").fetchall())
+        return {"path": str(self.path), "triages": by_status, **self.stats}
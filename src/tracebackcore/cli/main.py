@@ -8,6 +8,7 @@ import os
 import json
 import time
 import sys
+import contextlib
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 
@@ -22,25 +23,52 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-# Import our core system components
-from tracebackcore.core import traceback_graph, lineage_retriever, vectorstore, AgentState, initialize_system
+from tracebackcore.scheduler import AdmissionScheduler, normalize_priority
 
 console = Console()
 
+# Same priority admission as the API: concurrent triages (e.g. from watch) queue by
+# priority, and lower priorities degrade under load
+admission_scheduler = AdmissionScheduler.from_env()
+
+def load_core():
+    """Import tracebackcore.core, which initializes the system, only in commands that need it.
+
+    Its startup log goes to stderr so JSON and JSONL output on stdout stays parseable.
+    """
+    with contextlib.redirect_stdout(sys.stderr):
+        from tracebackcore import core
+    return core
+
+def run_admitted_triage(question: str, priority: Optional[str], **kwargs) -> Dict[str, Any]:
+    """Admit a triage by priority, then run the graph (degraded if the scheduler says so)."""
+    from tracebackcore.core import run_triage_graph
+    with admission_scheduler.admit(priority) as ticket:
+        return run_triage_graph(question, degraded=ticket.degraded, priority=priority, **kwargs)
+
 @click.group()
 @click.version_option(version="1.0.0")
-def cli():
+@click.option("--profile", is_flag=True, help="Profile the command (cProfile, sampled stacks, tracemalloc) into TRACEBACK_PROFILE_DIR")
+@click.pass_context
+def cli(ctx, profile: bool):
     """Traceback CLI - Data Pipeline Incident Triage System."""
-    pass
+    if profile:
+        from tracebackcore.profiling import profile_session
+        ctx.with_resource(profile_session(ctx.invoked_subcommand or "cli", all_threads=True))
 
 @cli.command()
 @click.argument("question")
-@click.option("--priority", "-p", default="medium", help="Incident priority")
+@click.option("--priority", "-p", default="medium", help="Incident priority (critical, high, medium, low)")
 @click.option("--output", "-o", type=click.Choice(["text", "json"]), default="text", help="Output format")
 @click.option("--verbose", "-v", is_flag=True, help="Verbose output")
-def triage(question: str, priority: str, output: str, verbose: bool):
+@click.option("--single-pass/--two-pass", default=None, help="Merge impact assessment and brief into one structured LLM call")
+@click.option("--triage-id", default=None, help="Checkpoint under this id (a known id resumes it)")
+@click.option("--timeout", type=float, default=None, help="Seconds to spend before degrading to a lineage-only brief (default: TRACEBACK_TRIAGE_DEADLINE)")
+def triage(question: str, priority: str, output: str, verbose: bool, single_pass: Optional[bool], triage_id: Optional[str], timeout: Optional[float]):
     """Triage a data pipeline incident."""
     
+    priority = normalize_priority(priority)
+    
     console.print(f"🚨 [bold red]Traceback Incident Triage[/bold red]")
     console.print(f"📋 Question: {question}")
     console.print(f"⚡ Priority: {priority}")
@@ -48,7 +76,9 @@ def triage(question: str, priority: str, output: str, verbose: bool):
     
     try:
         # Import core system
-        from tracebackcore.core import traceback_graph, AgentState, initialize_system
+        load_core()
+        from tracebackcore.core import traceback_graph, initialize_system
+        from tracebackcore import deadlines
         
         # Initialize system if not already done
         if not traceback_graph:
@@ -66,66 +96,107 @@ def triage(question: str, priority: str, output: str, verbose: bool):
         ) as progress:
             task = progress.add_task("Analyzing incident...", total=None)
             
-            initial_state = AgentState(
-                question=question,
-                context=[],
-                impact_assessment=None,
-                blast_radius=None,
-                recommended_actions=None,
-                incident_brief=None,
-                current_step="supervisor",
-                error=None
-            )
-            
-            result = traceback_graph.invoke(initial_state)
-        
-        # Display results
-        if output == "json":
-            console.print(json.dumps({
-                "question": question,
-                "incident_brief": result.get("incident_brief", ""),
-                "blast_radius": result.get("blast_radius", []),
-                "impact_assessment": result.get("impact_assessment", {}),
-                "error": result.get("error")
-            }, indent=2))
-        else:
-            # Text output
-            if result.get("incident_brief"):
-                console.print(Panel(
-                    result["incident_brief"],
-                    title="📋 Incident Brief",
-                    border_style="blue"
-                ))
-            
-            if result.get("blast_radius"):
-                console.print("\n💥 [bold]Blast Radius:[/bold]")
-                for item in result["blast_radius"][:10]:  # Show top 10
-                    console.print(f"  • {item}")
-            
-            if verbose and result.get("impact_assessment"):
-                console.print("\n📊 [bold]Impact Assessment:[/bold]")
-                assessment = result["impact_assessment"]
-                if isinstance(assessment, dict):
-                    console.print(json.dumps(assessment, indent=2))
-        
-        if result.get("error"):
-            console.print(f"\n⚠️ [yellow]Warning: {result['error']}[/yellow]")
+            with deadlines.request_deadline(deadlines.budget(timeout)):
+                result = run_admitted_triage(question, priority, triage_id=triage_id, single_pass=single_pass)
+        
+        print_triage_result(result, question, priority, output, verbose)
             
     except Exception as e:
         console.print(f"❌ [red]Error: {str(e)}[/red]")
         sys.exit(1)
 
+@cli.command()
+@click.argument("triage_id")
+@click.option("--output", "-o", type=click.Choice(["text", "json"]), default="text", help="Output format")
+@click.option("--verbose", "-v", is_flag=True, help="Verbose output")
+def resume(triage_id: str, output: str, verbose: bool):
+    """Resume a failed triage from its last completed node."""
+    
+    try:
+        load_core()
+        from tracebackcore.core import checkpoint_store, resume_triage
+        
+        triage = checkpoint_store.get_triage(triage_id) if checkpoint_store else None
+        if triage is None:
+            console.print(f"❌ [red]Triage {triage_id} not found (or checkpoints are disabled)[/red]")
+            sys.exit(1)
+        
+        console.print(f"🔁 [bold]Resuming triage[/bold] {triage_id} ({triage['status']})")
+        for checkpoint in triage["checkpoints"]:
+            marker = "✅" if checkpoint["status"] == "completed" else "❌"
+            console.print(f"  {marker} {checkpoint['node']}" + (f" [dim]({checkpoint['error']})[/dim]" if checkpoint["error"] else ""))
+        console.print()
+        
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            console=console,
+        ) as progress:
+            task = progress.add_task("Resuming incident triage...", total=None)
+            result = resume_triage(triage_id)
+        
+        print_triage_result(result, triage["question"], None, output, verbose)
+        
+    except Exception as e:
+        console.print(f"❌ [red]Error: {str(e)}[/red]")
+        sys.exit(1)
+
+def print_triage_result(result: Dict[str, Any], question: str, priority: Optional[str], output: str, verbose: bool):
+    """Print a triage result as JSON or rich text."""
+    if output == "json":
+        console.print(json.dumps({
+            "question": question,
+            "priority": priority,
+            "triage_id": result.get("triage_id"),
+            "incident_brief": result.get("incident_brief", ""),
+            "blast_radius": result.get("blast_radius", []),
+            "impact_assessment": result.get("impact_assessment", {}),
+            "error": result.get("error"),
+            "fallback_reason": result.get("fallback_reason")
+        }, indent=2))
+    else:
+        # Text output
+        if result.get("incident_brief"):
+            console.print(Panel(
+                result["incident_brief"],
+                title="📋 Incident Brief",
+                border_style="blue"
+            ))
+        
+        if result.get("blast_radius"):
+            console.print("\n💥 [bold]Blast Radius:[/bold]")
+            for item in result["blast_radius"][:10]:  # Show top 10
+                console.print(f"  • {item}")
+        
+        if verbose and result.get("impact_assessment"):
+            console.print("\n📊 [bold]Impact Assessment:[/bold]")
+            assessment = result["impact_assessment"]
+            if isinstance(assessment, dict):
+                console.print(json.dumps(assessment, indent=2))
+        
+        if result.get("triage_id"):
+            console.print(f"\n🔖 [bold]Triage ID:[/bold] {result['triage_id']}")
+    
+    if result.get("error"):
+        console.print(f"\n⚠️ [yellow]Warning: {result['error']}[/yellow]")
+        if result.get("triage_id"):
+            console.print(f"🔁 Retry from the failed step with: python -m tracebackcore.cli.main resume {result['triage_id']}")
+
 @cli.command()
 @click.argument("query")
 @click.option("--limit", "-l", default=5, help="Number of results")
-@click.option("--type", "-t", help="Filter by document type")
-def search(query: str, limit: int, type: Optional[str]):
+@click.option("--type", "-t", multiple=True, help="Filter by document type (markdown, sql, lineage)")
+@click.option("--file", "-f", "file_name", multiple=True, help="Filter by source file name")
+@click.option("--schema", "-s", multiple=True, help="Filter by referenced schema")
+@click.option("--pipeline", multiple=True, help="Filter by pipeline id")
+def search(query: str, limit: int, type: tuple, file_name: tuple, schema: tuple, pipeline: tuple):
     """Search documents and code."""
     
     console.print(f"🔍 [bold]Searching for:[/bold] {query}")
     console.print()
     
     try:
+        load_core()
         from tracebackcore.core import lineage_retriever, initialize_system
         
         # Initialize system if not already done
@@ -136,7 +207,8 @@ def search(query: str, limit: int, type: Optional[str]):
             console.print("❌ [red]RAG system not initialized[/red]")
             sys.exit(1)
         
-        results = lineage_retriever.search_with_lineage(query, k=limit)
+        filters = {"type": list(type), "file_name": list(file_name), "schema": list(schema), "pipeline": list(pipeline)}
+        results = lineage_retriever.search_with_lineage(query, k=limit, filters=filters)
         
         if not results:
             console.print("🔍 [yellow]No results found[/yellow]")
@@ -150,9 +222,6 @@ def search(query: str, limit: int, type: Optional[str]):
         
         for doc in results:
             doc_type = doc.metadata.get("type", "unknown")
-            if type and doc_type != type:
-                continue
-                
             table.add_row(
                 doc.metadata.get("file_name", "unknown"),
                 doc_type,
@@ -167,13 +236,17 @@ def search(query: str, limit: int, type: Optional[str]):
 
 @cli.command()
 @click.argument("table_name")
-def lineage(table_name: str):
+@click.option("--max-depth", "-d", type=int, default=None, help="Maximum hops from the table")
+@click.option("--limit", "-l", type=int, default=100, help="Nodes shown per direction")
+@click.option("--order", type=click.Choice(["distance", "criticality"]), default="distance", help="Rank by hop distance or dashboard criticality")
+def lineage(table_name: str, max_depth: Optional[int], limit: int, order: str):
     """Get lineage information for a table."""
     
     console.print(f"🧬 [bold]Lineage Analysis for:[/bold] {table_name}")
     console.print()
     
     try:
+        load_core()
         from tracebackcore.core import lineage_retriever, initialize_system
         
         # Initialize system if not already done
@@ -184,28 +257,371 @@ def lineage(table_name: str):
             console.print("❌ [red]Lineage system not initialized[/red]")
             sys.exit(1)
         
-        downstream = lineage_retriever.find_downstream_impact(table_name)
-        upstream = lineage_retriever.find_upstream_dependencies(table_name)
+        upstream = lineage_retriever.traverse(table_name, "upstream", max_depth=max_depth, limit=limit, order=order)
+        downstream = lineage_retriever.traverse(table_name, "downstream", max_depth=max_depth, limit=limit, order=order)
         
         # Upstream dependencies
-        if upstream:
+        if upstream["nodes"]:
             console.print("📉 [bold]Upstream Dependencies:[/bold]")
-            for dep in upstream:
-                console.print(f"  • {dep}")
+            for node in upstream["nodes"]:
+                console.print(f"  • {node['id']} [dim]({node['distance']} hop{'s' if node['distance'] > 1 else ''}: {' ← '.join(node['path'])})[/dim]")
+            if upstream["next_cursor"]:
+                console.print("  [dim]… more (raise --limit)[/dim]")
         else:
             console.print("📉 [yellow]No upstream dependencies found[/yellow]")
         
         console.print()
         
         # Downstream impact
-        if downstream:
+        if downstream["nodes"]:
             console.print("📈 [bold]Downstream Impact:[/bold]")
-            for impact in downstream:
-                console.print(f"  • {impact}")
+            for node in downstream["nodes"]:
+                console.print(f"  • {node['id']} [dim]({node['distance']} hop{'s' if node['distance'] > 1 else ''}: {' → '.join(node['path'])})[/dim]")
+            if downstream["next_cursor"]:
+                console.print("  [dim]… more (raise --limit)[/dim]")
         else:
             console.print("📈 [yellow]No downstream impact found[/yellow]")
         
-        console.print(f"\n📊 [bold]Total Dependencies:[/bold] {len(upstream) + len(downstream)}")
+        affected_assets = lineage_retriever.find_affected_assets([table_name])
+        if affected_assets["dashboards"]:
+            console.print()
+            console.print("📊 [bold]Affected Dashboards:[/bold]")
+            for dashboard in affected_assets["dashboards"]:
+                console.print(f"  • {dashboard['name']} [dim]({dashboard.get('refresh_frequency') or 'unknown refresh'}; teams: {', '.join(dashboard['teams']) or 'none'})[/dim]")
+            console.print(f"👥 [bold]Teams:[/bold] {', '.join(affected_assets['teams']) or 'None'}")
+        console.print(f"🧑‍💻 [bold]Owners:[/bold] {', '.join(affected_assets['owners']) or 'None'}")
+        
+        producing_code = lineage_retriever.code_index.documents_for_table(table_name)
+        if producing_code:
+            console.print(f"📄 [bold]Produced by:[/bold] {', '.join(doc.metadata['file_name'] for doc in producing_code)}")
+        
+        console.print(f"\n📊 [bold]Total Dependencies:[/bold] {len(upstream['nodes']) + len(downstream['nodes'])}")
+        
+    except Exception as e:
+        console.print(f"❌ [red]Error: {str(e)}[/red]")
+        sys.exit(1)
+
+@cli.command("lineage-graph")
+@click.argument("table_name")
+@click.option("--depth", "-d", type=int, default=2, help="Hops from the table")
+@click.option("--direction", type=click.Choice(["both", "upstream", "downstream"]), default="both")
+@click.option("--budget", "-b", type=int, default=100, help="Maximum nodes before collapsing into clusters")
+@click.option("--group-by", type=click.Choice(["schema", "pipeline"]), default="schema", help="Cluster granularity")
+@click.option("--format", "-f", "output_format", type=click.Choice(["dot", "json"]), default="dot")
+@click.option("--output", "-o", type=click.Path(dir_okay=False), default=None, help="Write to a file instead of stdout")
+def lineage_graph(table_name: str, depth: int, direction: str, budget: int, group_by: str, output_format: str, output: Optional[str]):
+    """Export the lineage neighborhood of a table as Graphviz DOT or JSON."""
+    
+    try:
+        load_core()
+        from tracebackcore.core import lineage_retriever, initialize_system
+        from tracebackcore.subgraph import to_dot
+        
+        # Initialize system if not already done
+        if not lineage_retriever:
+            initialize_system()
+        
+        if not lineage_retriever:
+            console.print("❌ [red]Lineage system not initialized[/red]")
+            sys.exit(1)
+        
+        if not lineage_retriever.subgraphs.knows(table_name):
+            console.print(f"❌ [red]Unknown table: {table_name}[/red]")
+            sys.exit(1)
+        
+        graph = lineage_retriever.subgraphs.subgraph(table_name, depth, direction, budget, group_by)
+        rendered = to_dot(graph) if output_format == "dot" else json.dumps(graph, indent=2)
+        if output:
+            with open(output, "w", encoding="utf-8") as f:
+                f.write(rendered)
+            clusters = len([node for node in graph["nodes"] if node["kind"] == "cluster"])
+            console.print(f"✅ {graph['tables']} tables as {len(graph['nodes'])} nodes ({clusters} clusters), "
+                          f"{len(graph['edges'])} edges -> {output}")
+        else:
+            click.echo(rendered, nl=False)
+        
+    except Exception as e:
+        console.print(f"❌ [red]Error: {str(e)}[/red]")
+        sys.exit(1)
+
+@cli.command()
+@click.argument("query")
+@click.option("--table", "-t", multiple=True, help="Table id (default: tables linked from the query)")
+@click.option("--limit", "-l", default=3, help="Number of incidents")
+@click.option("--compact", is_flag=True, help="Apply retention and size limits first")
+def history(query: str, table: tuple, limit: int, compact: bool):
+    """Find similar past incidents."""
+    
+    try:
+        load_core()
+        from tracebackcore.core import incident_history, lineage_retriever
+        
+        if not incident_history:
+            console.print("❌ [red]Incident history is disabled (set TRACEBACK_INCIDENT_HISTORY=true)[/red]")
+            sys.exit(1)
+        if compact:
+            console.print(f"🧹 Compacted {incident_history.compact()} incidents")
+        
+        tables = list(table) or lineage_retriever.find_tables(query)
+        start = time.perf_counter()
+        incidents = incident_history.similar(query, tables, k=limit)
+        elapsed = (time.perf_counter() - start) * 1000
+        
+        console.print(f"🗂️ [bold]Similar past incidents[/bold] ({len(incidents)} of {incident_history.count()}, {elapsed:.1f}ms)")
+        for incident in incidents:
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(incident["created_at"]))
+            similarity = f", similarity {incident['similarity']:.2f}" if incident["similarity"] is not None else ""
+            console.print(Panel(
+                incident["brief"][:600],
+                title=f"{when} | {incident['question'][:80]}",
+                subtitle=f"tables: {', '.join(incident['tables']) or 'none'}{similarity}",
+                border_style="blue"
+            ))
+        
+    except Exception as e:
+        console.print(f"❌ [red]Error: {str(e)}[/red]")
+        sys.exit(1)
+
+@cli.group()
+def feedback():
+    """Record and look up triage feedback."""
+    pass
+
+@feedback.command("add")
+@click.argument("question")
+@click.option("--rating", "-r", type=int, help="Rating (e.g. 1-5)")
+@click.option("--comment", "-c", help="Free-text comment")
+@click.option("--retriever", help="Retriever method that produced the answer")
+@click.option("--interaction", "interaction_id", help="Interaction id returned by /incident/triage")
+def feedback_add(question: str, rating: Optional[int], comment: Optional[str], retriever: Optional[str], interaction_id: Optional[str]):
+    """Record feedback for a question."""
+    from tracebackcore.feedback import FeedbackStore
+    
+    store = FeedbackStore()
+    try:
+        feedback_id = store.submit(
+            question=question,
+            kind="feedback",
+            retriever=retriever,
+            interaction_id=interaction_id,
+            rating=rating,
+            comment=comment
+        )
+    finally:
+        store.close()
+    console.print(f"✅ [green]Recorded feedback {feedback_id}[/green]")
+
+@feedback.command("list")
+@click.option("--question", "-q", help="Exact question (matched by hash)")
+@click.option("--table", "-t", help="Table id")
+@click.option("--retriever", help="Retriever method")
+@click.option("--limit", "-l", default=20, help="Number of entries")
+@click.option("--output", "-o", type=click.Choice(["text", "json"]), default="text", help="Output format")
+def feedback_list(question: Optional[str], table: Optional[str], retriever: Optional[str], limit: int, output: str):
+    """Look up recent feedback."""
+    from tracebackcore.feedback import FeedbackStore
+    
+    store = FeedbackStore()
+    try:
+        entries = store.lookup(question=question, table=table, retriever=retriever, limit=limit)
+    finally:
+        store.close()
+    
+    if output == "json":
+        console.print(json.dumps(entries, indent=2))
+        return
+    
+    table_view = Table(title=f"Feedback ({len(entries)} entries)")
+    table_view.add_column("When", style="cyan")
+    table_view.add_column("Kind", style="green")
+    table_view.add_column("Retriever", style="magenta")
+    table_view.add_column("Rating", style="yellow")
+    table_view.add_column("Question", style="white")
+    for entry in entries:
+        table_view.add_row(
+            time.strftime("%Y-%m-%d %H:%M", time.localtime(entry["timestamp"])),
+            entry["kind"],
+            entry.get("retriever") or "",
+            str(entry["rating"]) if entry.get("rating") is not None else "",
+            entry["question"][:80]
+        )
+    console.print(table_view)
+
+@feedback.command("import")
+@click.argument("legacy_file", type=click.Path(exists=True, dir_okay=False))
+def feedback_import(legacy_file: str):
+    """Import a notebook-era feedback_log.json."""
+    from tracebackcore.feedback import FeedbackStore
+    
+    store = FeedbackStore()
+    try:
+        count = store.import_legacy_json(legacy_file)
+    finally:
+        store.close()
+    console.print(f"✅ [green]Imported {count} new entries into {store.path}[/green]")
+
+@cli.command()
+@click.option("--source", "-s", default="-", help="JSONL alert file, - for stdin, or module:Class queue adapter")
+@click.option("--follow", "-f", is_flag=True, help="Keep reading lines appended to the JSONL file")
+@click.option("--sink", "-o", default="-", help="Output: - (stdout), a .jsonl file, or a directory for markdown briefs")
+@click.option("--workers", "-w", default=2, help="Concurrent triages")
+@click.option("--queue-size", default=8, help="Triages waiting for a worker before the source is paused")
+@click.option("--dedup-window", default=300.0, help="Seconds within which repeated alerts are dropped")
+@click.option("--group-window", default=5.0, help="Seconds to collect alerts for the same table into one triage")
+@click.option("--report-interval", default=30.0, help="Seconds between throughput/lag reports")
+@click.option("--single-pass/--two-pass", default=None, help="Merge impact assessment and brief into one structured LLM call")
+@click.option("--timeout", type=float, default=None, help="Seconds per triage before degrading to a lineage-only brief (default: TRACEBACK_TRIAGE_DEADLINE)")
+def watch(source: str, follow: bool, sink: str, workers: int, queue_size: int, dedup_window: float,
+          group_window: float, report_interval: float, single_pass: Optional[bool], timeout: Optional[float]):
+    """Triage alerts continuously from a JSONL file, stdin or a queue adapter."""
+    
+    # stdout may carry the briefs, so progress goes to stderr
+    err_console = Console(stderr=True)
+    
+    try:
+        load_core()
+        from tracebackcore.core import lineage_retriever, traceback_graph, initialize_system
+        from tracebackcore.watch import AlertWatcher, BriefSink, load_source
+        
+        if not traceback_graph:
+            initialize_system()
+            from tracebackcore.core import lineage_retriever
+        
+        def report(stats: Dict[str, Any]):
+            lag = f"{stats['mean_lag_seconds']:.1f}s mean / {stats['max_lag_seconds']:.1f}s max" if stats["mean_lag_seconds"] is not None else "n/a"
+            err_console.print(
+                f"📈 {stats['received']} alerts, {stats['duplicates']} duplicates, {stats['triaged']} briefs, "
+                f"{stats['failed']} failed, {stats['in_flight']} in flight | "
+                f"{stats['triages_per_minute']:.1f} triages/min | lag {lag}"
+            )
+        
+        watcher = AlertWatcher(
+            load_source(source, follow=follow),
+            BriefSink(sink),
+            triage=lambda question, priority: run_admitted_triage(question, priority, single_pass=single_pass),
+            find_tables=lineage_retriever.find_tables,
+            workers=workers,
+            queue_size=queue_size,
+            dedup_window=dedup_window,
+            group_window=group_window,
+            report_interval=report_interval,
+            report=report,
+            timeout=timeout
+        )
+        err_console.print(f"👀 [bold]Watching alerts[/bold] from {source} → {sink} ({workers} workers)")
+        # Briefs on stdout stay valid JSONL: the pipeline's own log lines go to stderr
+        log_redirect = contextlib.redirect_stdout(sys.stderr) if sink == "-" else contextlib.nullcontext()
+        try:
+            with log_redirect:
+                stats = watcher.run()
+        except KeyboardInterrupt:
+            watcher.stop()
+            stats = watcher.get_stats()
+        report(stats)
+        
+    except Exception as e:
+        err_console.print(f"❌ [red]Error: {str(e)}[/red]")
+        sys.exit(1)
+
+@cli.command()
+@click.option("--url", default="http://127.0.0.1:8000", help="Base URL of a running Traceback API")
+@click.option("--questions", "-q", "questions_file", type=click.Path(exists=True, dir_okay=False), default=None,
+              help="JSON list or text file of questions (default: data/golden_test_data.json)")
+@click.option("--concurrency", "-c", default=4, help="Maximum requests in flight")
+@click.option("--rate", "-r", default=0.0, help="Poisson arrivals per second (0: closed loop at --concurrency)")
+@click.option("--requests", "-n", "total", type=int, default=None, help="Requests to send (default 100 without --duration)")
+@click.option("--duration", "-d", type=float, default=None, help="Stop sending after this many seconds")
+@click.option("--mix", default="Original RAG", help='Retriever weights, e.g. "Original RAG=3,Hybrid Search=1"')
+@click.option("--priority", "-p", default="medium", help="Priority sent with every request")
+@click.option("--seed", type=int, default=None, help="Random seed for question/retriever choice and arrivals")
+@click.option("--output", "-o", type=click.Path(dir_okay=False), default=None, help="Write the report as JSON")
+def loadtest(url: str, questions_file: Optional[str], concurrency: int, rate: float, total: Optional[int],
+             duration: Optional[float], mix: str, priority: str, seed: Optional[int], output: Optional[str]):
+    """Replay a question mix against the API and report throughput and latency."""
+    from tracebackcore.loadtest import LoadGenerator, LoadTestConfig, load_questions, parse_mix
+    
+    try:
+        project_root = Path(__file__).parent.parent.parent.parent
+        questions = load_questions(Path(questions_file) if questions_file else project_root / "data" / "golden_test_data.json")
+        config = LoadTestConfig(
+            url=url, questions=questions, retrievers=parse_mix(mix), concurrency=concurrency, rate=rate,
+            requests=total if total is not None or duration is not None else 100, duration=duration,
+            priority=normalize_priority(priority), seed=seed
+        )
+        limit = f"{config.requests} requests" if config.requests is not None else f"{duration:.0f}s"
+        console.print(f"🏋️ [bold]Load test[/bold] {url}: {limit}, {len(questions)} questions, "
+                      f"{'Poisson ' + str(rate) + '/s' if rate > 0 else 'closed loop'}, concurrency {concurrency}")
+        
+        report = LoadGenerator(config).run()
+        
+        table = Table(title=f"{report['succeeded']}/{report['requests']} ok in {report['elapsed_seconds']:.1f}s "
+                            f"({report['throughput_rps']:.2f} req/s, {report['error_rate']:.1%} errors)")
+        table.add_column("Retriever", style="cyan")
+        table.add_column("Requests", justify="right")
+        table.add_column("Errors", justify="right")
+        for column in ("p50", "p90", "p95", "p99", "max"):
+            table.add_column(f"{column} (s)", justify="right")
+        rows = [("All", report["requests"], report["requests"] - report["succeeded"], report["latency"])]
+        rows += [(name, row["requests"], row["errors"], row["latency"]) for name, row in report["by_retriever"].items()]
+        for name, requests, errors, latency in rows:
+            table.add_row(name, str(requests), str(errors), *(f"{latency[key]:.3f}" for key in ("p50", "p90", "p95", "p99", "max")))
+        console.print(table)
+        if report["server_processing_mean"] is not None:
+            console.print(f"🖥️ Server processing {report['server_processing_mean']:.3f}s mean, "
+                          f"admission wait {report['server_queue_wait_mean'] or 0:.3f}s mean")
+        if report["statuses"].keys() - {"200"}:
+            console.print(f"⚠️ Statuses: {report['statuses']}; e.g. {report['sample_errors'][:1]}")
+        
+        if output:
+            with open(output, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            console.print(f"✅ Report written to {output}")
+        
+    except Exception as e:
+        console.print(f"❌ [red]Error: {str(e)}[/red]")
+        sys.exit(1)
+
+@cli.command()
+@click.option("--top-n", "-n", default=10, help="Number of critical tables to warm")
+@click.option("--budget", "-b", default=60.0, help="Time budget in seconds")
+@click.option("--briefs", is_flag=True, help="Also precompute incident briefs (LLM calls)")
+def warmup(top_n: int, budget: float, briefs: bool):
+    """Rank critical tables and warm lineage/retrieval caches for them."""
+    
+    console.print("🔥 [bold]Cache Warm-up[/bold]")
+    console.print()
+    
+    try:
+        load_core()
+        from tracebackcore.core import traceback_graph, lineage_retriever, create_initial_state, initialize_system
+        from tracebackcore.warmup import CacheWarmer
+        
+        # Initialize system if not already done
+        if not lineage_retriever:
+            initialize_system()
+            from tracebackcore.core import traceback_graph, lineage_retriever
+        
+        warmer = CacheWarmer(
+            lineage_retriever,
+            traceback_graph=traceback_graph,
+            create_initial_state=create_initial_state,
+            top_n=top_n,
+            budget_seconds=budget,
+            include_briefs=briefs
+        )
+        result = warmer.run()
+        
+        table = Table(title="Critical Tables")
+        table.add_column("Table", style="cyan")
+        table.add_column("Score", style="green")
+        table.add_column("Warmed", style="white")
+        for entry in result["ranking"]:
+            table.add_row(entry["table"], f"{entry['score']:.1f}", "✅" if entry["table"] in result["warmed_tables"] else "⏭️")
+        console.print(table)
+        console.print(f"\n⏱️  {result['state']} in {result['elapsed']:.2f}s, {result['briefs']} briefs precomputed")
+        
+        for error in result["errors"]:
+            console.print(f"⚠️ [yellow]{error}[/yellow]")
         
     except Exception as e:
         console.print(f"❌ [red]Error: {str(e)}[/red]")
@@ -219,6 +635,7 @@ def status():
     console.print()
     
     try:
+        load_core()
         from tracebackcore.core import traceback_graph, lineage_retriever, vectorstore, initialize_system
         
         # Initialize system if not already done
@@ -255,26 +672,77 @@ def status():
         console.print(f"❌ [red]Error checking status: {str(e)}[/red]")
         sys.exit(1)
 
+@cli.command()
+@click.argument("output_dir", type=click.Path(file_okay=False))
+@click.option("--quantize", type=click.Choice(["none", "int8"]), default=None,
+              help="Also store int8-quantized vectors (default: TRACEBACK_VECTOR_QUANTIZATION)")
+def snapshot(output_dir: str, quantize: Optional[str]):
+    """Write an initialized-system snapshot for API workers to memory-map."""
+    
+    console.print(f"📦 [bold]Building snapshot:[/bold] {output_dir}")
+    
+    try:
+        load_core()
+        from tracebackcore.core import lineage_retriever, initialize_system, write_system_snapshot
+        
+        # Initialize system if not already done
+        if not lineage_retriever:
+            initialize_system()
+        
+        path = write_system_snapshot(output_dir, quantization=quantize)
+        console.print(f"✅ [green]Snapshot written to {path}[/green]")
+        console.print(f"   Start workers with: TRACEBACK_SNAPSHOT={path} uvicorn tracebackcore.api.main:app --workers N")
+        
+    except Exception as e:
+        console.print(f"❌ [red]Error building snapshot: {str(e)}[/red]")
+        sys.exit(1)
+
 @cli.command()
 @click.option("--host", default="0.0.0.0", help="Host to bind to")
 @click.option("--port", default=8000, help="Port to bind to")
 @click.option("--reload", is_flag=True, help="Enable auto-reload")
-def serve(host: str, port: int, reload: bool):
+@click.option("--workers", "-w", default=1, help="Number of worker processes")
+@click.option("--snapshot", "snapshot_dir", type=click.Path(file_okay=False), default=None,
+              help="Snapshot directory shared by workers (built here if missing)")
+def serve(host: str, port: int, reload: bool, workers: int, snapshot_dir: Optional[str]):
     """Start the Traceback API server."""
     
     console.print(f"🚀 [bold]Starting Traceback API Server[/bold]")
     console.print(f"🌐 Host: {host}")
     console.print(f"🔌 Port: {port}")
     console.print(f"🔄 Reload: {'Enabled' if reload else 'Disabled'}")
+    console.print(f"👷 Workers: {workers}")
     console.print()
     
     try:
+        if workers > 1 or snapshot_dir:
+            if reload:
+                console.print("❌ [red]--reload cannot be combined with --workers/--snapshot[/red]")
+                sys.exit(1)
+            
+            from tracebackcore.snapshot import is_snapshot, read_manifest, source_fingerprint
+            snapshot_dir = snapshot_dir or os.getenv("TRACEBACK_SNAPSHOT") or str(Path(".traceback_snapshot").resolve())
+            stale = is_snapshot(snapshot_dir) and read_manifest(snapshot_dir).get("source_fingerprint") != source_fingerprint()
+            if stale:
+                console.print("⚠️ [yellow]Snapshot was built from different lineage or documents, rebuilding[/yellow]")
+            if stale or not is_snapshot(snapshot_dir):
+                # Build once here so workers only memory-map it
+                load_core()
+                from tracebackcore.core import lineage_retriever, initialize_system, write_system_snapshot
+                if not lineage_retriever:
+                    initialize_system()
+                write_system_snapshot(snapshot_dir)
+            
+            os.environ["TRACEBACK_SNAPSHOT"] = str(Path(snapshot_dir).resolve())
+            console.print(f"📦 Snapshot: {os.environ['TRACEBACK_SNAPSHOT']}")
+        
         import uvicorn
         uvicorn.run(
             "tracebackcore.api.main:app",
             host=host,
             port=port,
             reload=reload,
+            workers=workers,
             log_level="info"
         )
     except Exception as e:
@@ -0,0 +1,111 @@
+"""
+Traceback Lineage-to-Code Index
+
+Maps table and pipeline ids to the documents that create or describe them,
+built at ingestion time. A table's producing pipelines come from the
+``pipeline`` file on its incoming lineage edges and from the ``outputs`` of
+``pipelines`` entries; a pipeline's documents are its SQL file and spec. A
+failed table's producing SQL and spec (and those of its first-hop neighbors) are then a
+dictionary lookup instead of extra vector queries.
+
+Documents are not split before indexing, so a document's ``doc_id`` is also its
+chunk id.
+"""
+
+from pathlib import Path
+from typing import List, Dict, Any, Iterable, Optional
+
+from langchain.schema import Document
+
+# SQL before specs, so the code that writes a table leads its context
+DOC_TYPE_ORDER = {"sql": 0, "markdown": 1}
+
+
+def pipeline_for_file(file_name: str) -> Optional[str]:
+    """Pipeline id for a pipeline or spec file name (``x_pipeline.sql`` / ``x_spec.md`` -> ``x_pipeline``).
+
+    Shared by document metadata and the index so both map files to pipelines alike;
+    None for files that follow neither naming convention.
+    """
+    stem = Path(file_name).stem
+    for suffix in ("_pipeline", "_spec"):
+        if stem.endswith(suffix):
+            return f"{stem[:-len(suffix)]}_pipeline"
+    return None
+
+
+class CodeIndex:
+    """Table id -> producing pipelines -> document ids, plus the documents themselves."""
+
+    def __init__(
+        self,
+        documents: Dict[int, Document],
+        docs_by_pipeline: Dict[str, List[int]],
+        pipelines_by_table: Dict[str, List[str]]
+    ):
+        self.documents = documents
+        self.docs_by_pipeline = docs_by_pipeline
+        self.pipelines_by_table = pipelines_by_table
+
+    @classmethod
+    def build(cls, documents: Iterable[Document], lineage_data: Dict[str, Any]) -> "CodeIndex":
+        pipeline_by_file = {
+            pipeline["file"]: pipeline["id"]
+            for pipeline in lineage_data.get("pipelines", [])
+            if pipeline.get("file") and pipeline.get("id")
+        }
+
+        indexed: Dict[int, Document] = {}
+        docs_by_pipeline: Dict[str, List[int]] = {}
+        for doc in documents:
+            doc_id = doc.metadata.get("doc_id")
+            pipeline = doc.metadata.get("pipeline")
+            file_name = doc.metadata.get("file_name")
+            if doc_id is None or doc.metadata.get("type") not in DOC_TYPE_ORDER:
+                continue
+            if file_name in pipeline_by_file:
+                pipeline = pipeline_by_file[file_name]
+            if not pipeline:
+                continue
+            indexed[doc_id] = doc
+            docs_by_pipeline.setdefault(pipeline, []).append(doc_id)
+        for doc_ids in docs_by_pipeline.values():
+            doc_ids.sort(key=lambda doc_id: (DOC_TYPE_ORDER[indexed[doc_id].metadata["type"]], doc_id))
+
+        pipelines_by_table: Dict[str, List[str]] = {}
+        for pipeline in lineage_data.get("pipelines", []):
+            for table in pipeline.get("outputs", []):
+                pipelines_by_table.setdefault(table, []).append(pipeline["id"])
+        for edge in lineage_data.get("edges", []):
+            if edge.get("pipeline"):
+                pipeline = (
+                    pipeline_by_file.get(edge["pipeline"])
+                    or pipeline_for_file(edge["pipeline"])
+                    or Path(edge["pipeline"]).stem
+                )
+                producers = pipelines_by_table.setdefault(edge["to"], [])
+                if pipeline not in producers:
+                    producers.append(pipeline)
+
+        return cls(indexed, docs_by_pipeline, pipelines_by_table)
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def documents_for_pipeline(self, pipeline_id: str) -> List[Document]:
+        return [self.documents[doc_id] for doc_id in self.docs_by_pipeline.get(pipeline_id, ())]
+
+    def documents_for_table(self, table: str) -> List[Document]:
+        """SQL and spec documents of the pipelines that produce ``table``."""
+        return [doc for pipeline in self.pipelines_by_table.get(table, ()) for doc in self.documents_for_pipeline(pipeline)]
+
+    def lookup(self, tables: Iterable[str]) -> List[Document]:
+        """Producing documents for ``tables`` in order, without duplicates."""
+        seen = set()
+        results = []
+        for table in tables:
+            for doc in self.documents_for_table(table):
+                if doc.metadata["doc_id"] not in seen:
+                    seen.add(doc.metadata["doc_id"])
+                    results.append(doc)
+        return results
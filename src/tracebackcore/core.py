@@ -5,23 +5,37 @@ Extracted core components from the Jupyter notebook for API/CLI usage.
 """
 
 import os
+import re
 import sys
 import json
 import time
+import heapq
+import threading
+from collections import OrderedDict, deque
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# OpenAI-compatible endpoint for chat and embeddings (e.g. the fake server in
+# benchmarks/fake_openai.py, or a self-hosted gateway); unset means api.openai.com
+OPENAI_BASE_URL = os.getenv("TRACEBACK_OPENAI_BASE_URL") or None
+
 # Verify API keys
 if not os.getenv("OPENAI_API_KEY"):
-    raise RuntimeError("OPENAI_API_KEY is not set. Create a .env file or export it in your shell.")
+    if not OPENAI_BASE_URL:
+        raise RuntimeError("OPENAI_API_KEY is not set. Create a .env file or export it in your shell.")
+    # Local OpenAI-compatible servers usually ignore the key, but the client requires one
+    os.environ["OPENAI_API_KEY"] = "local"
 
 # Import required libraries
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams
+from qdrant_client.models import (
+    Distance, VectorParams, PayloadSchemaType, Filter, FieldCondition, MatchValue, MatchAny,
+    ScalarQuantization, ScalarQuantizationConfig, ScalarType
+)
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
 from langchain_qdrant import Qdrant
 from langchain_text_splitters import RecursiveCharacterTextSplitter
@@ -31,7 +45,23 @@ from langchain.prompts import PromptTemplate
 from langgraph.graph import StateGraph, END
 from langchain.tools import Tool
 from langchain_community.tools import TavilySearchResults
-from typing import TypedDict
+from typing import TypedDict, Literal
+from pydantic import BaseModel, Field
+
+import numpy as np
+
+from tracebackcore.entities import EntityLinker
+from tracebackcore.impact import ImpactIndex, summarize_impact, REFRESH_WEIGHTS
+from tracebackcore.code_index import CodeIndex, pipeline_for_file
+from tracebackcore.suggest import SuggestIndex
+from tracebackcore.subgraph import SubgraphExporter, lineage_version
+from tracebackcore.history import IncidentHistory
+from tracebackcore.checkpoints import CheckpointStore, new_triage_id
+from tracebackcore.llm_cache import LLMCache, CachedChatModel
+from tracebackcore.deadlines import GuardedChatModel, GuardedEmbeddings, DeadlineExceeded, ProviderUnavailable, PROVIDER_TIMEOUT
+from tracebackcore import deadlines
+from tracebackcore.sharding import DomainRouter, ShardedVectorStore
+from tracebackcore.snapshot import Snapshot, SnapshotVectorStore, is_snapshot, write_snapshot, source_fingerprint
 
 # Define the agent state
 class AgentState(TypedDict):
@@ -43,6 +73,68 @@ class AgentState(TypedDict):
     incident_brief: Optional[str]
     current_step: str
     error: Optional[str]
+    fallback_reason: Optional[str]
+    degraded: Optional[bool]
+    single_pass: Optional[bool]
+    filters: Optional[Dict[str, Any]]
+    affected_assets: Optional[Dict[str, Any]]
+    triage_id: Optional[str]
+
+class StructuredTriage(BaseModel):
+    """Schema for single-pass triage: impact assessment and brief in one response."""
+    impact_level: Literal["Critical", "High", "Medium", "Low"] = Field(description="Business impact level")
+    affected_systems: List[str] = Field(description="Affected systems and tables")
+    sla_impact: str = Field(description="Impact on SLAs and data freshness")
+    estimated_recovery_time: str = Field(description="Estimated time to recovery")
+    incident_summary: str = Field(description="Brief description of the incident")
+    business_impact: str = Field(description="Business impact details")
+    root_cause_analysis: str = Field(description="Likely root causes")
+    recommended_actions: List[str] = Field(description="Immediate steps to take")
+    recovery_plan: List[str] = Field(description="Step-by-step recovery plan")
+    prevention: str = Field(description="Future mitigation")
+
+# Use the single-pass structured mode unless a request says otherwise
+SINGLE_PASS_DEFAULT = os.getenv("TRACEBACK_SINGLE_PASS", "false").lower() in ("1", "true", "yes")
+
+# Public search filter names mapped to document metadata fields
+SEARCH_FILTER_FIELDS = {
+    "type": "type",
+    "file_name": "file_name",
+    "schema": "schemas",
+    "pipeline": "pipeline"
+}
+
+# Allow near-miss table names (e.g. "curated.sales_order") when linking questions
+FUZZY_ENTITY_MATCH = os.getenv("TRACEBACK_FUZZY_ENTITY_MATCH", "false").lower() in ("1", "true", "yes")
+
+# Number of recent search_with_lineage results kept per retriever
+SEARCH_CACHE_SIZE = int(os.getenv("TRACEBACK_SEARCH_CACHE_SIZE", "512"))
+
+# Upper bound on nodes visited by one ranked (criticality-ordered) lineage traversal
+LINEAGE_MAX_SCAN = int(os.getenv("TRACEBACK_LINEAGE_MAX_SCAN", "10000"))
+
+# Hops and names per direction summarized in lineage context documents
+LINEAGE_CONTEXT_DEPTH = int(os.getenv("TRACEBACK_LINEAGE_CONTEXT_DEPTH", "3"))
+LINEAGE_CONTEXT_LIMIT = 3
+
+# text-embedding-3 vectors can be shortened natively; 1536 is the model's full size
+EMBEDDING_DIMENSIONS = int(os.getenv("TRACEBACK_EMBEDDING_DIMENSIONS", "1536"))
+
+# "int8" scalar-quantizes stored vectors; searches re-score the coarse top-K at full precision
+VECTOR_QUANTIZATION = os.getenv("TRACEBACK_VECTOR_QUANTIZATION", "none").lower()
+QUANTIZATION_OVERSAMPLING = float(os.getenv("TRACEBACK_QUANTIZATION_OVERSAMPLING", "4.0"))
+
+# Similar past incidents added to the agents' context (and the cosine floor for ones sharing no table)
+HISTORY_CONTEXT_LIMIT = int(os.getenv("TRACEBACK_HISTORY_CONTEXT_LIMIT", "2"))
+HISTORY_MIN_SIMILARITY = float(os.getenv("TRACEBACK_HISTORY_MIN_SIMILARITY", "0.75"))
+# Recent query embeddings kept for reuse within a triage (0 disables)
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("TRACEBACK_QUERY_EMBEDDING_CACHE_SIZE", "256"))
+
+# Producing SQL/spec documents added to lineage-aware results by direct lookup
+CODE_CONTEXT_LIMIT = int(os.getenv("TRACEBACK_CODE_CONTEXT_LIMIT", "3"))
+
+# "domain" splits documents into per-domain collections with query routing; "none" keeps one collection
+VECTOR_SHARDING = os.getenv("TRACEBACK_SHARDING", "none").lower()
 
 # Global variables for the system
 qdrant_client = None
@@ -51,6 +143,36 @@ llm = None
 vectorstore = None
 lineage_retriever = None
 traceback_graph = None
+checkpoint_store = None
+incident_history = None
+llm_cache = None
+
+def create_initial_state(
+    question: str,
+    degraded: bool = False,
+    single_pass: Optional[bool] = None,
+    filters: Optional[Dict[str, Any]] = None,
+    triage_id: Optional[str] = None
+) -> AgentState:
+    """Build the initial AgentState for a triage run."""
+    if single_pass is None:
+        single_pass = SINGLE_PASS_DEFAULT
+    return AgentState(
+        question=question,
+        context=[],
+        impact_assessment=None,
+        blast_radius=None,
+        recommended_actions=None,
+        incident_brief=None,
+        current_step="supervisor",
+        error=None,
+        fallback_reason=None,
+        degraded=degraded,
+        single_pass=single_pass,
+        filters=filters,
+        affected_assets=None,
+        triage_id=triage_id
+    )
 
 def create_fallback_lineage_data():
     """Create fallback lineage data if comprehensive data is not available."""
@@ -74,83 +196,118 @@ def create_fallback_lineage_data():
 
 def initialize_system():
     """Initialize the Traceback system."""
-    global qdrant_client, embeddings, llm, vectorstore, lineage_retriever, traceback_graph
+    global qdrant_client, embeddings, llm, vectorstore, lineage_retriever, traceback_graph, checkpoint_store, llm_cache, incident_history
     
     print("🚀 Initializing Traceback system...")
     
+    # Per-node triage checkpoints (see checkpoints.py)
+    checkpoint_store = CheckpointStore.from_env()
+    if checkpoint_store:
+        checkpoint_store.compact()
+    
     # Initialize Qdrant client (in-memory for demo)
     qdrant_client = QdrantClient(":memory:")
     
-    # Initialize embeddings
-    embeddings = OpenAIEmbeddings(
+    # Initialize embeddings (provider calls go through the openai circuit breaker, see deadlines.py);
+    # recent query embeddings are reused, e.g. by the incident history search after retrieval
+    embeddings = GuardedEmbeddings(OpenAIEmbeddings(
         model="text-embedding-3-small",
-        openai_api_key=os.getenv("OPENAI_API_KEY")
-    )
+        dimensions=EMBEDDING_DIMENSIONS if EMBEDDING_DIMENSIONS != 1536 else None,
+        openai_api_key=os.getenv("OPENAI_API_KEY"),
+        openai_api_base=OPENAI_BASE_URL,
+        request_timeout=PROVIDER_TIMEOUT,
+        # Token-array inputs (and the tiktoken download) are OpenAI-specific; other servers get plain strings
+        check_embedding_ctx_length=OPENAI_BASE_URL is None
+    ), query_cache_size=QUERY_EMBEDDING_CACHE_SIZE)
     
     # Initialize LLM
-    llm = ChatOpenAI(
+    llm = GuardedChatModel(ChatOpenAI(
         model="gpt-4o-mini",
         openai_api_key=os.getenv("OPENAI_API_KEY"),
+        openai_api_base=OPENAI_BASE_URL,
+        request_timeout=PROVIDER_TIMEOUT,
         temperature=0.1
-    )
+    ))
     
-    # Create collection
-    collection_name = "traceback_documents"
-    qdrant_client.create_collection(
-        collection_name=collection_name,
-        vectors_config=VectorParams(
-            size=1536,  # text-embedding-3-small dimension
-            distance=Distance.COSINE
-        )
-    )
+    # Opt-in exact cache of LLM calls (TRACEBACK_LLM_CACHE=true) for replaying evals;
+    # it wraps the breaker, so cached answers are still served while the provider is down
+    llm_cache = LLMCache.from_env()
+    if llm_cache:
+        llm = CachedChatModel(llm, llm_cache)
+        print(f"✅ LLM call cache enabled at {llm_cache.path} ({llm_cache.get_stats()['entries']} entries)")
     
-    # Initialize vector store
-    vectorstore = Qdrant(
-        client=qdrant_client,
-        collection_name=collection_name,
-        embeddings=embeddings
-    )
+    # Completed triages, searchable as "similar past incidents" (see history.py)
+    if incident_history:
+        incident_history.close()
+    incident_history = IncidentHistory.from_env(embed=embeddings.embed_query)
+    if incident_history:
+        removed = incident_history.compact()
+        print(f"✅ Incident history: {incident_history.count()} incidents" + (f" ({removed} compacted)" if removed else ""))
     
-    # Load all documents from data directories
-    print("📚 Loading all specifications and SQL pipelines...")
+    # Workers started with a prebuilt snapshot memory-map it instead of re-embedding
+    snapshot_path = os.getenv("TRACEBACK_SNAPSHOT")
+    if is_snapshot(snapshot_path):
+        snapshot = Snapshot(snapshot_path)
+        if snapshot.manifest["dimensions"] and snapshot.manifest["dimensions"] != EMBEDDING_DIMENSIONS:
+            raise ValueError(
+                f"Snapshot {snapshot_path} has {snapshot.manifest['dimensions']}-dimension vectors but "
+                f"TRACEBACK_EMBEDDING_DIMENSIONS is {EMBEDDING_DIMENSIONS}"
+            )
+        if snapshot.manifest.get("source_fingerprint") != source_fingerprint():
+            print(f"⚠️ Snapshot {snapshot_path} was built from different lineage or documents; rebuild it to pick up changes")
+        vectorstore = SnapshotVectorStore(snapshot, embeddings, oversampling=QUANTIZATION_OVERSAMPLING)
+        lineage_retriever = LineageAwareRetriever.from_index(vectorstore, snapshot.lineage_index)
+        traceback_graph = create_agent_workflow()
+        print(f"✅ Loaded snapshot {snapshot_path}: {len(snapshot)} documents, {snapshot.manifest['dimensions']} dimensions, {snapshot.quantization} quantization")
+        print("✅ Traceback system initialized successfully")
+        return
+    
+    collection_name = "traceback_documents"
+    if VECTOR_SHARDING == "domain":
+        # One collection per domain, searched only where the query routes (see sharding.py)
+        vectorstore = ShardedVectorStore(
+            qdrant_client,
+            embeddings,
+            collection_prefix=collection_name,
+            dimensions=EMBEDDING_DIMENSIONS,
+            quantization_config=qdrant_quantization_config(),
+            index_fields=SEARCH_FILTER_FIELDS.values()
+        )
+    else:
+        # Create collection
+        qdrant_client.create_collection(
+            collection_name=collection_name,
+            vectors_config=VectorParams(
+                size=EMBEDDING_DIMENSIONS,
+                distance=Distance.COSINE
+            ),
+            quantization_config=qdrant_quantization_config()
+        )
+        
+        # Initialize vector store
+        vectorstore = Qdrant(
+            client=qdrant_client,
+            collection_name=collection_name,
+            embeddings=embeddings
+        )
+        
+        # Index the metadata fields used for filtered search
+        for field in SEARCH_FILTER_FIELDS.values():
+            qdrant_client.create_payload_index(
+                collection_name=collection_name,
+                field_name=f"metadata.{field}",
+                field_schema=PayloadSchemaType.KEYWORD
+            )
     
     # Get project root
     project_root = Path(__file__).parent.parent.parent
-    docs_dir = project_root / "data" / "docs"
-    repo_dir = project_root / "data" / "repo"
-    
-    all_docs = []
-    doc_id = 0
     
-    # Load all markdown files from docs directory
-    if docs_dir.exists():
-        for md_file in docs_dir.glob("*.md"):
-            try:
-                with open(md_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                all_docs.append(Document(
-                    page_content=content,
-                    metadata={"type": "markdown", "file_name": md_file.name, "doc_id": doc_id}
-                ))
-                doc_id += 1
-            except Exception as e:
-                print(f"⚠️ Error loading {md_file}: {e}")
-    
-    # Load all SQL files from repo directory
-    if repo_dir.exists():
-        for sql_file in repo_dir.glob("*.sql"):
-            try:
-                with open(sql_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                all_docs.append(Document(
-                    page_content=content,
-                    metadata={"type": "sql", "file_name": sql_file.name, "doc_id": doc_id}
-                ))
-                doc_id += 1
-            except Exception as e:
-                print(f"⚠️ Error loading {sql_file}: {e}")
+    # Load lineage first so documents can be tagged with schema/pipeline metadata
+    lineage_data = load_lineage_data(project_root)
     
-    print(f"✅ Loaded {len(all_docs)} documents ({len([d for d in all_docs if d.metadata['type'] == 'markdown'])} specs, {len([d for d in all_docs if d.metadata['type'] == 'sql'])} SQL files)")
+    # Load all documents from data directories
+    print("📚 Loading all specifications and SQL pipelines...")
+    all_docs = load_documents(project_root, lineage_data)
     
     # Add documents to vector store
     if all_docs:
@@ -158,123 +315,657 @@ def initialize_system():
     else:
         print("⚠️ No documents found, using fallback sample data")
         # Fallback to sample data if no files found
+        known_schemas = get_known_schemas(lineage_data)
+        samples = [
+            ("Sales orders pipeline processes raw order data into curated datasets for analytics and reporting.", "sales_orders_spec.md", "markdown"),
+            ("SELECT * FROM curated.sales_orders WHERE order_date >= CURRENT_DATE - 1", "sales_orders_pipeline.sql", "sql"),
+            ("Data pipeline incident response procedures: 1. Acknowledge incident 2. Assess impact 3. Determine blast radius 4. Notify stakeholders", "incident_playbook.md", "markdown")
+        ]
         sample_docs = [
             Document(
-                page_content="Sales orders pipeline processes raw order data into curated datasets for analytics and reporting.",
-                metadata={"type": "markdown", "file_name": "sales_orders_spec.md", "doc_id": 0}
-            ),
-            Document(
-                page_content="SELECT * FROM curated.sales_orders WHERE order_date >= CURRENT_DATE - 1",
-                metadata={"type": "sql", "file_name": "sales_orders_pipeline.sql", "doc_id": 1}
-            ),
-            Document(
-                page_content="Data pipeline incident response procedures: 1. Acknowledge incident 2. Assess impact 3. Determine blast radius 4. Notify stakeholders",
-                metadata={"type": "markdown", "file_name": "incident_playbook.md", "doc_id": 2}
+                page_content=content,
+                metadata=build_document_metadata(file_name, doc_type, doc_id, content, known_schemas)
             )
+            for doc_id, (content, file_name, doc_type) in enumerate(samples)
         ]
         vectorstore.add_documents(sample_docs)
+        all_docs = sample_docs
+    
+    # Initialize lineage retriever; documents feed the lineage-to-code index
+    lineage_retriever = LineageAwareRetriever(vectorstore, lineage_data, documents=all_docs)
+    print(f"✅ Lineage-to-code index: {len(lineage_retriever.code_index)} documents, {len(lineage_retriever.code_index.pipelines_by_table)} tables")
     
-    # Load comprehensive lineage data
+    if isinstance(vectorstore, ShardedVectorStore):
+        vectorstore.router = DomainRouter(lineage_data, lineage_retriever.find_tables)
+        for domain in vectorstore.shards:
+            vectorstore.router.add_domain(domain)
+        print(f"✅ Sharded vector store: {len(vectorstore.shards)} domain collections")
+    
+    # Create agent system
+    traceback_graph = create_agent_workflow()
+    
+    print("✅ Traceback system initialized successfully")
+
+def qdrant_quantization_config() -> Optional[ScalarQuantization]:
+    """int8 scalar quantization for Qdrant collections; Qdrant re-scores with the original vectors."""
+    if VECTOR_QUANTIZATION != "int8":
+        return None
+    return ScalarQuantization(scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True))
+
+def write_system_snapshot(output_dir, quantization: Optional[str] = None) -> Path:
+    """Write the initialized system (vectors, documents, lineage indexes) as a snapshot."""
+    if vectorstore is None or lineage_retriever is None:
+        raise RuntimeError("Traceback system not initialized")
+    
+    fingerprint = source_fingerprint(Path(__file__).parent.parent.parent / "data")
+    if isinstance(vectorstore, SnapshotVectorStore):
+        snapshot = vectorstore.snapshot
+        documents = [snapshot.document(index) for index in range(len(snapshot))]
+        vectors = np.asarray(snapshot.vectors)
+        # A copy of a loaded snapshot keeps the fingerprint of the sources it was built from
+        fingerprint = snapshot.manifest.get("source_fingerprint")
+    else:
+        # Read the embedded points back out of Qdrant instead of re-embedding
+        documents, vectors = [], []
+        shards = getattr(vectorstore, "shards", None)
+        collections = [shard.collection_name for shard in shards.values()] if shards is not None else [vectorstore.collection_name]
+        for collection in collections:
+            offset = None
+            while True:
+                points, offset = vectorstore.client.scroll(
+                    collection_name=collection,
+                    with_payload=True,
+                    with_vectors=True,
+                    limit=256,
+                    offset=offset
+                )
+                for point in points:
+                    documents.append(Document(
+                        page_content=point.payload.get("page_content", ""),
+                        metadata=point.payload.get("metadata", {})
+                    ))
+                    vectors.append(point.vector)
+                if offset is None:
+                    break
+    
+    path = write_snapshot(
+        output_dir,
+        documents,
+        vectors,
+        lineage_retriever.build_index(),
+        embedding_model=getattr(embeddings, "model", "unknown"),
+        quantization=quantization or VECTOR_QUANTIZATION,
+        fingerprint=fingerprint
+    )
+    print(f"✅ Wrote snapshot with {len(documents)} documents to {path}")
+    return path
+
+def load_lineage_data(project_root: Path) -> Dict[str, Any]:
+    """Load lineage.json, falling back to sample lineage data."""
     lineage_file = project_root / "data" / "lineage.json"
     if lineage_file.exists():
         try:
             with open(lineage_file, 'r', encoding='utf-8') as f:
                 lineage_data = json.load(f)
             print(f"✅ Loaded comprehensive lineage data: {len(lineage_data.get('nodes', []))} nodes, {len(lineage_data.get('edges', []))} edges")
+            return lineage_data
         except Exception as e:
             print(f"⚠️ Error loading lineage.json: {e}")
-            lineage_data = create_fallback_lineage_data()
-    else:
-        print("⚠️ lineage.json not found, using fallback data")
-        lineage_data = create_fallback_lineage_data()
+            return create_fallback_lineage_data()
+    print("⚠️ lineage.json not found, using fallback data")
+    return create_fallback_lineage_data()
+
+def get_known_schemas(lineage_data: Dict[str, Any]) -> List[str]:
+    """Collect every schema name used by lineage nodes and dashboards."""
+    schemas = set()
+    for node in lineage_data.get("nodes", []):
+        if node.get("schema"):
+            schemas.add(node["schema"])
+        elif "." in node.get("id", ""):
+            schemas.add(node["id"].split(".", 1)[0])
+    for dashboard in lineage_data.get("dashboards", []):
+        if "." in dashboard.get("id", ""):
+            schemas.add(dashboard["id"].split(".", 1)[0])
+    return sorted(schemas)
+
+def build_document_metadata(file_name: str, doc_type: str, doc_id: int, content: str, known_schemas: List[str]) -> Dict[str, Any]:
+    """Build the filterable metadata payload for a source document."""
+    pipeline = pipeline_for_file(file_name)
     
-    # Initialize lineage retriever
-    lineage_retriever = LineageAwareRetriever(vectorstore, lineage_data)
+    schemas = []
+    if known_schemas:
+        schema_pattern = r'\b(' + '|'.join(re.escape(schema) for schema in known_schemas) + r')\.[a-z0-9_]+'
+        schemas = sorted(set(match.lower() for match in re.findall(schema_pattern, content, flags=re.IGNORECASE)))
     
-    # Create agent system
-    traceback_graph = create_agent_workflow()
+    return {
+        "type": doc_type,
+        "file_name": file_name,
+        "doc_id": doc_id,
+        "pipeline": pipeline,
+        "schemas": schemas
+    }
+
+def load_documents(project_root: Path, lineage_data: Dict[str, Any]) -> List[Document]:
+    """Load all markdown specs and SQL pipelines with filterable metadata."""
+    docs_dir = project_root / "data" / "docs"
+    repo_dir = project_root / "data" / "repo"
+    known_schemas = get_known_schemas(lineage_data)
     
-    print("✅ Traceback system initialized successfully")
+    all_docs = []
+    doc_id = 0
+    
+    for source_dir, pattern, doc_type in ((docs_dir, "*.md", "markdown"), (repo_dir, "*.sql", "sql")):
+        if not source_dir.exists():
+            continue
+        for source_file in sorted(source_dir.glob(pattern)):
+            try:
+                with open(source_file, 'r', encoding='utf-8') as f:
+                    content = f.read()
+                all_docs.append(Document(
+                    page_content=content,
+                    metadata=build_document_metadata(source_file.name, doc_type, doc_id, content, known_schemas)
+                ))
+                doc_id += 1
+            except Exception as e:
+                print(f"⚠️ Error loading {source_file}: {e}")
+    
+    print(f"✅ Loaded {len(all_docs)} documents ({len([d for d in all_docs if d.metadata['type'] == 'markdown'])} specs, {len([d for d in all_docs if d.metadata['type'] == 'sql'])} SQL files)")
+    return all_docs
+
+def build_search_filter(filters: Optional[Dict[str, Any]] = None) -> Optional[Filter]:
+    """Translate {"type": ..., "file_name": ..., "schema": ..., "pipeline": ...} into a Qdrant filter.
+
+    Values may be a single string or a list (matches any). Unknown keys raise ValueError.
+    """
+    if not filters:
+        return None
+    
+    conditions = []
+    for key, value in filters.items():
+        if value is None or value == [] or value == "":
+            continue
+        if key not in SEARCH_FILTER_FIELDS:
+            raise ValueError(f"Unsupported search filter '{key}' (expected one of {', '.join(SEARCH_FILTER_FIELDS)})")
+        field = f"metadata.{SEARCH_FILTER_FIELDS[key]}"
+        if isinstance(value, (list, tuple, set)):
+            match = MatchAny(any=list(value))
+        else:
+            match = MatchValue(value=value)
+        conditions.append(FieldCondition(key=field, match=match))
+    
+    return Filter(must=conditions) if conditions else None
+
+def matches_search_filter(metadata: Dict[str, Any], filters: Optional[Dict[str, Any]] = None) -> bool:
+    """True if ``metadata`` passes ``filters`` with the same semantics as ``build_search_filter``.
+
+    Used for documents found by direct lookup rather than by the vector query.
+    """
+    for key, value in (filters or {}).items():
+        if value is None or value == [] or value == "":
+            continue
+        if key not in SEARCH_FILTER_FIELDS:
+            raise ValueError(f"Unsupported search filter '{key}' (expected one of {', '.join(SEARCH_FILTER_FIELDS)})")
+        wanted = set(value) if isinstance(value, (list, tuple, set)) else {value}
+        actual = metadata.get(SEARCH_FILTER_FIELDS[key])
+        actual = set(actual) if isinstance(actual, list) else {actual}
+        if not wanted & actual:
+            return False
+    return True
+
+def tables_in_schema(table_names: List[str], filters: Optional[Dict[str, Any]] = None) -> List[str]:
+    """The linked tables allowed by the ``schema`` filter, if any."""
+    schema_filter = (filters or {}).get("schema")
+    if not schema_filter:
+        return table_names
+    schema_filter = [schema_filter] if isinstance(schema_filter, str) else list(schema_filter)
+    return [table_name for table_name in table_names if table_name.split(".", 1)[0] in schema_filter]
 
 class LineageAwareRetriever:
     """Enhanced retriever that combines vector search with lineage queries."""
     
-    def __init__(self, vectorstore, lineage_data):
+    def __init__(self, vectorstore, lineage_data, index: Optional[Dict[str, Any]] = None,
+                 documents: Optional[List[Document]] = None):
         self.vectorstore = vectorstore
         self.lineage_data = lineage_data
+        
+        # Compiled indexes (adjacency lists and entity linker), reused from a snapshot when given
+        if index is None:
+            index = self.compile_index(lineage_data, documents)
+        self.downstream_index: Dict[str, List[str]] = index["downstream"]
+        self.upstream_index: Dict[str, List[str]] = index["upstream"]
+        self.entity_linker: EntityLinker = index["entity_linker"]
+        self.impact_index: ImpactIndex = index.get("impact") or ImpactIndex.from_lineage(lineage_data)
+        self.code_index: CodeIndex = index.get("code") or CodeIndex.build(documents or [], lineage_data)
+        self.criticality: Dict[str, float] = self.compute_criticality(lineage_data)
+        self.suggest_index: SuggestIndex = index.get("suggest") or SuggestIndex.from_lineage(lineage_data, self.criticality)
+        self.lineage_version = lineage_version(lineage_data)
+        self.subgraphs = SubgraphExporter(
+            self.downstream_index, self.upstream_index, self.criticality, self.code_index.pipelines_by_table,
+            self.lineage_version, tables=(node["id"] for node in lineage_data.get("nodes", []))
+        )
+        
+        # Memoized lineage closures, an LRU of recent search results and an LRU of the
+        # code/lineage context per linked table set (shared by every question about them)
+        self._closure_cache: Dict[Tuple[str, str], List[str]] = {}
+        self._search_cache: "OrderedDict[Tuple, List[Document]]" = OrderedDict()
+        self._search_lock = threading.Lock()
+        self._context_cache: "OrderedDict[Tuple, List[Document]]" = OrderedDict()
+        self._context_lock = threading.Lock()
+        self.cache_stats = {
+            "closure_hits": 0, "closure_misses": 0, "search_hits": 0, "search_misses": 0,
+            "context_hits": 0, "context_misses": 0
+        }
+    
+    @staticmethod
+    def compile_index(lineage_data: Dict[str, Any], documents: Optional[List[Document]] = None) -> Dict[str, Any]:
+        """Compile adjacency lists (in edge order), the entity linker and the impact, code and suggestion indexes."""
+        downstream, upstream = {}, {}
+        for edge in lineage_data.get("edges", []):
+            downstream.setdefault(edge["from"], []).append(edge["to"])
+            upstream.setdefault(edge["to"], []).append(edge["from"])
+        return {
+            "downstream": downstream,
+            "upstream": upstream,
+            "entity_linker": EntityLinker.from_lineage(lineage_data),
+            "impact": ImpactIndex.from_lineage(lineage_data),
+            "code": CodeIndex.build(documents or [], lineage_data),
+            "suggest": SuggestIndex.from_lineage(lineage_data, LineageAwareRetriever.compute_criticality(lineage_data))
+        }
+    
+    @staticmethod
+    def compute_criticality(lineage_data: Dict[str, Any]) -> Dict[str, float]:
+        """Refresh-weighted count of dashboards reading each table directly."""
+        criticality: Dict[str, float] = {}
+        for dashboard in lineage_data.get("dashboards", []):
+            weight = REFRESH_WEIGHTS.get(str(dashboard.get("refresh_frequency", "")).lower(), 1.0)
+            for table in dashboard.get("tables", []):
+                criticality[table] = criticality.get(table, 0.0) + weight
+        return criticality
+    
+    def build_index(self) -> Dict[str, Any]:
+        """Serializable lineage data plus compiled indexes (see snapshot.py)."""
+        return {
+            "lineage_data": self.lineage_data,
+            "downstream": self.downstream_index,
+            "upstream": self.upstream_index,
+            "entity_linker": self.entity_linker,
+            "impact": self.impact_index,
+            "code": self.code_index,
+            "suggest": self.suggest_index
+        }
+    
+    @classmethod
+    def from_index(cls, vectorstore, index: Dict[str, Any]) -> "LineageAwareRetriever":
+        """Rebuild a retriever from a compiled index without recompiling."""
+        return cls(vectorstore, index["lineage_data"], index=index)
+    
+    def find_tables(self, text: str, fuzzy: bool = FUZZY_ENTITY_MATCH) -> List[str]:
+        """Link table mentions in text to lineage table ids."""
+        return self.entity_linker.find_tables(text, fuzzy=fuzzy)
+    
+    def _cached_closure(self, direction: str, node_id: str, compute) -> List[str]:
+        """Lineage is static for the life of the process, so closures are memoized."""
+        key = (direction, node_id)
+        cached = self._closure_cache.get(key)
+        if cached is None:
+            self.cache_stats["closure_misses"] += 1
+            cached = compute(node_id)
+            self._closure_cache[key] = cached
+        else:
+            self.cache_stats["closure_hits"] += 1
+        return list(cached)
     
     def find_downstream_impact(self, node_id: str) -> List[str]:
         """Find all downstream dependencies of a node."""
-        downstream = []
-        visited = set()
-        
-        def dfs(current_node):
-            if current_node in visited:
-                return
-            visited.add(current_node)
-            
-            for edge in self.lineage_data.get("edges", []):
-                if edge["from"] == current_node:
-                    downstream.append(edge["to"])
-                    dfs(edge["to"])
-        
-        dfs(node_id)
-        return downstream
+        return self._cached_closure("down", node_id, self._find_downstream_impact)
     
     def find_upstream_dependencies(self, node_id: str) -> List[str]:
         """Find all upstream dependencies of a node."""
-        upstream = []
-        visited = set()
+        return self._cached_closure("up", node_id, self._find_upstream_dependencies)
+    
+    def find_affected_assets(self, table_names: List[str]) -> Dict[str, Any]:
+        """Dashboards, teams and owners affected by failures of ``table_names`` and everything downstream."""
+        affected_tables = set(table_names)
+        for table_name in table_names:
+            affected_tables.update(self.find_downstream_impact(table_name))
+        return self.impact_index.lookup(affected_tables)
+    
+    def _find_downstream_impact(self, node_id: str) -> List[str]:
+        return self._depth_first_closure(node_id, self.downstream_index)
+    
+    def _find_upstream_dependencies(self, node_id: str) -> List[str]:
+        return self._depth_first_closure(node_id, self.upstream_index)
+    
+    @staticmethod
+    def _depth_first_closure(node_id: str, adjacency: Dict[str, List[str]]) -> List[str]:
+        """Pre-order DFS closure (iterative, so deep chains don't hit the recursion limit)."""
+        closure = []
+        visited = {node_id}
+        stack = [iter(adjacency.get(node_id, []))]
+        while stack:
+            child = next(stack[-1], None)
+            if child is None:
+                stack.pop()
+                continue
+            closure.append(child)
+            if child not in visited:
+                visited.add(child)
+                stack.append(iter(adjacency.get(child, [])))
+        return closure
+    
+    def _breadth_first(self, node_id: str, adjacency: Dict[str, List[str]], max_depth: Optional[int]):
+        """Yield (node, distance, parent) in hop order; each node once, at its shortest distance."""
+        parents = {node_id: None}
+        queue = deque([(node_id, 0)])
+        while queue:
+            current, distance = queue.popleft()
+            if max_depth is not None and distance >= max_depth:
+                continue
+            for child in adjacency.get(current, []):
+                if child in parents:
+                    continue
+                parents[child] = current
+                yield child, distance + 1, parents
+                queue.append((child, distance + 1))
+    
+    @staticmethod
+    def _path(node: str, parents: Dict[str, Optional[str]]) -> List[str]:
+        path = [node]
+        while parents[path[-1]] is not None:
+            path.append(parents[path[-1]])
+        return path[::-1]
+    
+    def traverse(
+        self,
+        node_id: str,
+        direction: str = "downstream",
+        max_depth: Optional[int] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        order: str = "distance"
+    ) -> Dict[str, Any]:
+        """Bounded, ranked, paginated lineage traversal.
+
+        Each returned node carries its hop ``distance`` and the shortest ``path``
+        from ``node_id``. With ``order="distance"`` the BFS stops as soon as the
+        requested page (plus one look-ahead node) has been found; ``order="criticality"``
+        ranks every node within ``max_depth`` (capped at ``LINEAGE_MAX_SCAN``
+        visits) by refresh-weighted dashboard fan-out. ``cursor`` is the opaque
+        ``next_cursor`` of the previous page.
+        """
+        if direction not in ("downstream", "upstream"):
+            raise ValueError(f"Unknown lineage direction: {direction}")
+        if order not in ("distance", "criticality"):
+            raise ValueError(f"Unknown lineage order: {order}")
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        try:
+            offset = int(cursor) if cursor else 0
+        except ValueError:
+            raise ValueError(f"Invalid cursor: {cursor}")
         
-        def dfs(current_node):
-            if current_node in visited:
-                return
-            visited.add(current_node)
-            
-            for edge in self.lineage_data.get("edges", []):
-                if edge["to"] == current_node:
-                    upstream.append(edge["from"])
-                    dfs(edge["from"])
-        
-        dfs(node_id)
-        return upstream
-    
-    def search_with_lineage(self, query: str, k: int = 5) -> List[Document]:
-        """Search with both vector similarity and lineage context."""
-        # Regular vector search
-        vector_results = self.vectorstore.similarity_search(query, k=k)
-        
-        # Extract table names from query
-        table_names = []
-        for word in query.split():
-            if '.' in word and any(schema in word for schema in ['raw.', 'curated.', 'analytics.']):
-                table_names.append(word)
-        
-        # Add lineage context if tables found
+        adjacency = self.downstream_index if direction == "downstream" else self.upstream_index
+        walk = self._breadth_first(node_id, adjacency, max_depth)
+        parents: Dict[str, Optional[str]] = {node_id: None}
+        exhaustive = True
+        
+        if order == "distance":
+            wanted = offset + limit + 1
+            found = []
+            for node, distance, parents in walk:
+                found.append((node, distance))
+                if len(found) >= wanted:
+                    break
+            page = found[offset:offset + limit]
+            has_more = len(found) > offset + limit
+        else:
+            scanned = []
+            for node, distance, parents in walk:
+                scanned.append((node, distance))
+                if len(scanned) >= LINEAGE_MAX_SCAN:
+                    exhaustive = False
+                    break
+            wanted = offset + limit + 1
+            ranked = heapq.nsmallest(
+                wanted, scanned,
+                key=lambda item: (-self.criticality.get(item[0], 0.0), item[1], item[0])
+            )
+            page = ranked[offset:offset + limit]
+            has_more = len(ranked) > offset + limit
+        
+        return {
+            "table": node_id,
+            "direction": direction,
+            "order": order,
+            "max_depth": max_depth,
+            "nodes": [
+                {
+                    "id": node,
+                    "distance": distance,
+                    "path": self._path(node, parents),
+                    "criticality": self.criticality.get(node, 0.0)
+                }
+                for node, distance in page
+            ],
+            "next_cursor": str(offset + limit) if has_more else None,
+            "exhaustive": exhaustive
+        }
+    
+    def search_with_lineage(self, query: str, k: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[Document]:
+        """Search with both vector similarity and lineage context.
+
+        ``filters`` (type, file_name, schema, pipeline) are pushed down into the
+        vector query so filtered searches still return the top ``k`` matches.
+        """
+        filters = {key: value for key, value in (filters or {}).items() if value}
+        
+        cache_key = (query, k, json.dumps(filters, sort_keys=True, default=list))
+        with self._search_lock:
+            cached = self._search_cache.get(cache_key)
+            if cached is not None:
+                self._search_cache.move_to_end(cache_key)
+                self.cache_stats["search_hits"] += 1
+                return list(cached)
+        self.cache_stats["search_misses"] += 1
+        
+        results = self._search_with_lineage(query, k, filters)
+        with self._search_lock:
+            self._search_cache[cache_key] = results
+            if len(self._search_cache) > SEARCH_CACHE_SIZE:
+                self._search_cache.popitem(last=False)
+        return list(results)
+    
+    def _search_with_lineage(self, query: str, k: int, filters: Dict[str, Any]) -> List[Document]:
+        doc_types = filters.get("type")
+        doc_types = [doc_types] if isinstance(doc_types, str) else list(doc_types or [])
+        include_lineage = not doc_types or "lineage" in doc_types
+        
+        # Regular vector search (lineage summaries are not stored in the vector store)
+        vector_filters = dict(filters)
+        if doc_types:
+            vector_filters["type"] = [doc_type for doc_type in doc_types if doc_type != "lineage"]
+        vector_results = []
+        if not doc_types or vector_filters["type"]:
+            vector_results = self.vectorstore.similarity_search(query, k=k, filter=build_search_filter(vector_filters))
+        
+        if "file_name" in filters or "pipeline" in filters:
+            return vector_results[:k]
+        
+        # Link table mentions in the query to lineage ids
+        table_names = tables_in_schema(self.find_tables(query), filters)
+        
+        # Producing code leads, but takes at most half of the k slots so the
+        # vector matches (and lineage summaries) are not cut away
+        code_docs = []
+        if not doc_types or vector_filters["type"]:
+            code_docs = self.code_documents(table_names, vector_filters)[:k // 2]
+        if code_docs:
+            direct_ids = {doc.metadata["doc_id"] for doc in code_docs}
+            vector_results = code_docs + [doc for doc in vector_results if doc.metadata.get("doc_id") not in direct_ids]
+        
+        if not include_lineage:
+            return vector_results[:k]
+        
+        # Combine results
+        all_results = vector_results + self.lineage_summaries(table_names)
+        return all_results[:k]
+    
+    def _cached_context(self, key: Tuple, compute) -> List[Document]:
+        """Context documents depend only on the table set (and filters), not on the question wording."""
+        with self._context_lock:
+            cached = self._context_cache.get(key)
+            if cached is not None:
+                self._context_cache.move_to_end(key)
+                self.cache_stats["context_hits"] += 1
+                return list(cached)
+        self.cache_stats["context_misses"] += 1
+        cached = compute()
+        with self._context_lock:
+            self._context_cache[key] = cached
+            if len(self._context_cache) > SEARCH_CACHE_SIZE:
+                self._context_cache.popitem(last=False)
+        return list(cached)
+    
+    def code_documents(self, table_names: List[str], filters: Optional[Dict[str, Any]] = None) -> List[Document]:
+        """Producing SQL/spec of the linked tables, then of their first-hop neighbors, by direct lookup.
+
+        ``filters`` are applied as in the vector query (see ``matches_search_filter``).
+        """
+        if not CODE_CONTEXT_LIMIT or not table_names:
+            return []
+        key = ("code", tuple(table_names), json.dumps(filters or {}, sort_keys=True, default=list))
+        return self._cached_context(key, lambda: self._code_documents(table_names, filters))
+    
+    def _code_documents(self, table_names: List[str], filters: Optional[Dict[str, Any]]) -> List[Document]:
+        neighbors = [
+            neighbor for table_name in table_names
+            for neighbor in self.upstream_index.get(table_name, []) + self.downstream_index.get(table_name, [])
+        ]
+        return [
+            doc for doc in self.code_index.lookup(table_names + neighbors)
+            if matches_search_filter(doc.metadata, filters)
+        ][:CODE_CONTEXT_LIMIT]
+    
+    def lineage_summaries(self, table_names: List[str]) -> List[Document]:
+        """One short lineage document per table: nearest parents and most critical children."""
+        return self._cached_context(("lineage", tuple(table_names)), lambda: self._lineage_summaries(table_names))
+    
+    def _lineage_summaries(self, table_names: List[str]) -> List[Document]:
         lineage_context = []
         for table_name in table_names:
-            downstream = self.find_downstream_impact(table_name)
-            upstream = self.find_upstream_dependencies(table_name)
+            # Nearest parents, and the most critical children within a few hops
+            upstream = self.traverse(
+                table_name, "upstream", max_depth=LINEAGE_CONTEXT_DEPTH, limit=LINEAGE_CONTEXT_LIMIT
+            )
+            downstream = self.traverse(
+                table_name, "downstream", max_depth=LINEAGE_CONTEXT_DEPTH,
+                limit=LINEAGE_CONTEXT_LIMIT, order="criticality"
+            )
             
-            if downstream or upstream:
+            if downstream["nodes"] or upstream["nodes"]:
                 context_text = f"Table {table_name}: "
-                if upstream:
-                    context_text += f"Depends on {', '.join(upstream[:3])}. "
-                if downstream:
-                    context_text += f"Impacts {', '.join(downstream[:3])}."
+                if upstream["nodes"]:
+                    context_text += f"Depends on {self._describe_nodes(upstream)}. "
+                if downstream["nodes"]:
+                    context_text += f"Impacts {self._describe_nodes(downstream)}."
                 
                 lineage_context.append(Document(
                     page_content=context_text,
                     metadata={"type": "lineage", "table": table_name}
                 ))
-        
-        # Combine results
-        all_results = vector_results + lineage_context
-        return all_results[:k]
+        return lineage_context
+    
+    @staticmethod
+    def _describe_nodes(page: Dict[str, Any]) -> str:
+        names = [
+            node["id"] if node["distance"] == 1 else f"{node['id']} ({node['distance']} hops)"
+            for node in page["nodes"]
+        ]
+        described = ", ".join(names)
+        return f"{described} and others" if page["next_cursor"] else described
+
+def past_incident_documents(question: str, table_names: List[str]) -> List[Document]:
+    """Similar past incidents from the history store as context documents."""
+    documents = []
+    for incident in incident_history.similar(question, table_names, k=HISTORY_CONTEXT_LIMIT, min_similarity=HISTORY_MIN_SIMILARITY):
+        when = time.strftime("%Y-%m-%d", time.localtime(incident["created_at"]))
+        documents.append(Document(
+            page_content=f"Past incident ({when}): {incident['question']}\n{incident['brief'][:800]}",
+            metadata={"type": "incident_history", "incident_id": incident["incident_id"], "triage_id": incident["triage_id"]}
+        ))
+    return documents
+
+def render_structured_brief(
+    triage: StructuredTriage,
+    blast_radius: List[str],
+    affected_assets: Optional[Dict[str, Any]] = None
+) -> str:
+    """Render a StructuredTriage into the same brief layout the writer agent produces."""
+    actions = "\n".join(f"- {action}" for action in triage.recommended_actions)
+    recovery = "\n".join(f"{i}. {step}" for i, step in enumerate(triage.recovery_plan, 1))
+    affected = sorted(set(triage.affected_systems) | set(blast_radius))
+    return (
+        f"**Incident Summary**: {triage.incident_summary}\n\n"
+        f"**Business Impact**: {triage.impact_level} - {triage.business_impact}\n"
+        f"SLA Impact: {triage.sla_impact}\n"
+        f"Estimated Recovery Time: {triage.estimated_recovery_time}\n\n"
+        f"**Blast Radius**: {', '.join(affected) if affected else 'None identified'}\n"
+        f"Affected {summarize_impact(affected_assets)}\n\n"
+        f"**Root Cause Analysis**: {triage.root_cause_analysis}\n\n"
+        f"**Recommended Actions**:\n{actions}\n\n"
+        f"**Recovery Plan**:\n{recovery}\n\n"
+        f"**Prevention**: {triage.prevention}"
+    )
+
+def render_degraded_brief(
+    question: str,
+    assessment_text: str,
+    blast_radius: List[str],
+    affected_assets: Optional[Dict[str, Any]],
+    reason: str = "full brief skipped under load"
+) -> str:
+    """Brief assembled without an LLM call from the assessment and the lineage findings."""
+    return (
+        f"**Incident Summary**: {question}\n\n"
+        f"**Impact Assessment** (degraded mode, {reason}):\n{assessment_text}\n\n"
+        f"**Blast Radius**: {', '.join(blast_radius) if blast_radius else 'None identified'}\n"
+        f"Affected {summarize_impact(affected_assets)}"
+    )
+
+def lineage_only_assessment(blast_radius: List[str], affected_assets: Optional[Dict[str, Any]]) -> str:
+    """Impact assessment from lineage alone, used when the LLM is unavailable or out of time."""
+    return (
+        f"Downstream tables: {', '.join(sorted(blast_radius)) if blast_radius else 'None identified'}\n"
+        f"Affected {summarize_impact(affected_assets)}"
+    )
 
 def create_agent_workflow():
     """Create the LangGraph agent workflow."""
     
+    def gather_impact_context(question: str, filters: Optional[Dict[str, Any]] = None):
+        """Retrieve context documents and the blast radius for a question."""
+        # Link table mentions for lineage analysis
+        table_names = lineage_retriever.find_tables(question)
+        
+        try:
+            with deadlines.stage("retrieval"):
+                results = lineage_retriever.search_with_lineage(question, k=3, filters=filters)
+                
+                # Briefs from similar past incidents (unfiltered searches only)
+                if incident_history and HISTORY_CONTEXT_LIMIT and not filters:
+                    results = results + past_incident_documents(question, table_names)
+        except (ProviderUnavailable, DeadlineExceeded) as e:
+            # Lineage-only context: the linked tables' code and lineage need no provider call
+            print(f"⚠️ Retrieval degraded to lineage-only context: {e}")
+            linked = tables_in_schema(table_names, filters)
+            results = lineage_retriever.code_documents(linked, filters) + lineage_retriever.lineage_summaries(linked)
+        
+        blast_radius = []
+        for table_name in table_names:
+            blast_radius.extend(lineage_retriever.find_downstream_impact(table_name))
+        
+        return results, list(set(blast_radius)), lineage_retriever.find_affected_assets(table_names)
+    
     def supervisor_agent(state: AgentState) -> AgentState:
         """Supervisor agent that orchestrates the incident triage workflow."""
         question = state["question"]
@@ -292,15 +983,9 @@ def create_agent_workflow():
         question = state["question"]
         
         # Use RAG search to gather context
-        results = lineage_retriever.search_with_lineage(question, k=3)
+        results, blast_radius, affected_assets = gather_impact_context(question, state.get("filters"))
         context = "\n".join([doc.page_content for doc in results])
         
-        # Extract table names for lineage analysis
-        table_names = []
-        for word in question.split():
-            if '.' in word and any(schema in word for schema in ['raw.', 'curated.', 'analytics.']):
-                table_names.append(word)
-        
         # Generate impact assessment
         impact_prompt = f"""
         You are the Impact Assessor Agent for Traceback.
@@ -309,6 +994,8 @@ def create_agent_workflow():
         
         Context: {context}
         
+        Affected {summarize_impact(affected_assets)}
+        
         Provide a structured impact assessment:
         1. Business Impact Level (Critical/High/Medium/Low)
         2. Affected Systems/Tables
@@ -318,19 +1005,28 @@ def create_agent_workflow():
         """
         
         try:
-            response = llm.invoke([{"role": "user", "content": impact_prompt}])
+            with deadlines.stage("impact_assessor"):
+                response = llm.invoke([{"role": "user", "content": impact_prompt}])
             
             state["impact_assessment"] = {
                 "assessment": response.content,
                 "context_sources": [{"content": doc.page_content, "source": doc.metadata.get("file_name", "unknown")} for doc in results]
             }
             
-            # Extract blast radius
-            blast_radius = []
-            for table_name in table_names:
-                blast_radius.extend(lineage_retriever.find_downstream_impact(table_name))
+            state["blast_radius"] = blast_radius
+            state["affected_assets"] = affected_assets
+            state["current_step"] = "writer"
             
-            state["blast_radius"] = list(set(blast_radius))
+        except (ProviderUnavailable, DeadlineExceeded) as e:
+            # Keep the lineage findings and let the writer render a degraded brief
+            state["impact_assessment"] = {
+                "assessment": lineage_only_assessment(blast_radius, affected_assets),
+                "context_sources": [{"content": doc.page_content, "source": doc.metadata.get("file_name", "unknown")} for doc in results]
+            }
+            state["blast_radius"] = blast_radius
+            state["affected_assets"] = affected_assets
+            state["degraded"] = True
+            state["error"] = f"Impact assessor degraded: {str(e)}"
             state["current_step"] = "writer"
             
         except Exception as e:
@@ -339,11 +1035,74 @@ def create_agent_workflow():
         
         return state
     
+    def structured_triage_agent(state: AgentState) -> AgentState:
+        """Single-pass agent that produces the impact assessment and brief in one LLM call."""
+        question = state["question"]
+        
+        results, blast_radius, affected_assets = gather_impact_context(question, state.get("filters"))
+        context = "\n".join([doc.page_content for doc in results])
+        
+        triage_prompt = f"""
+        You are the Traceback incident triage agent.
+        
+        Question: {question}
+        
+        Context: {context}
+        
+        Known downstream impact: {', '.join(blast_radius) if blast_radius else 'None identified'}
+        
+        Affected {summarize_impact(affected_assets)}
+        
+        Assess the business impact (level, affected systems/tables, SLA impact, estimated
+        recovery time) and write the incident brief sections (summary, business impact,
+        root cause analysis, recommended actions, recovery plan, prevention).
+        """
+        
+        try:
+            structured_llm = llm.with_structured_output(StructuredTriage)
+            with deadlines.stage("structured_triage"):
+                triage = structured_llm.invoke([{"role": "user", "content": triage_prompt}])
+            
+            state["impact_assessment"] = {
+                "assessment": (
+                    f"Business Impact Level: {triage.impact_level}\n"
+                    f"Affected Systems/Tables: {', '.join(triage.affected_systems)}\n"
+                    f"SLA Impact: {triage.sla_impact}\n"
+                    f"Estimated Recovery Time: {triage.estimated_recovery_time}"
+                ),
+                "structured": triage.model_dump(),
+                "context_sources": [{"content": doc.page_content, "source": doc.metadata.get("file_name", "unknown")} for doc in results],
+                "method": "single_pass"
+            }
+            state["blast_radius"] = blast_radius
+            state["affected_assets"] = affected_assets
+            state["recommended_actions"] = triage.recommended_actions
+            state["incident_brief"] = render_structured_brief(triage, blast_radius, affected_assets)
+            state["current_step"] = "complete"
+            
+        except Exception as e:
+            # Fall back to the two-call pipeline; only its own failures set state["error"]
+            print(f"⚠️ Single-pass triage fell back to the two-call pipeline: {str(e)}")
+            state["fallback_reason"] = f"Structured triage error: {str(e)}"
+            state["current_step"] = "impact_assessor"
+        
+        return state
+    
     def writer_agent(state: AgentState) -> AgentState:
         """Writer agent that generates the final incident brief."""
         question = state["question"]
         impact_assessment = state.get("impact_assessment", {})
         blast_radius = state.get("blast_radius", [])
+        affected_assets = state.get("affected_assets")
+        
+        assessment_text = (impact_assessment or {}).get("assessment", "No impact assessment available.")
+        
+        # Degraded mode: skip the writer LLM call and return the assessment as-is
+        if state.get("degraded"):
+            reason = "full brief skipped: provider unavailable or out of time" if state.get("error") else "full brief skipped under load"
+            state["incident_brief"] = render_degraded_brief(question, assessment_text, blast_radius, affected_assets, reason)
+            state["current_step"] = "complete"
+            return state
         
         # Generate incident brief
         writer_prompt = f"""
@@ -355,10 +1114,12 @@ def create_agent_workflow():
         
         Blast Radius: {blast_radius}
         
+        Affected {summarize_impact(affected_assets)}
+        
         Generate a comprehensive incident brief with:
         1. **Incident Summary**: Brief description
         2. **Business Impact**: Level and details
-        3. **Blast Radius**: Affected systems/tables
+        3. **Blast Radius**: Affected tables, dashboards, teams and owners
         4. **Root Cause Analysis**: Likely causes
         5. **Recommended Actions**: Immediate steps
         6. **Recovery Plan**: Step-by-step recovery
@@ -368,11 +1129,20 @@ def create_agent_workflow():
         """
         
         try:
-            response = llm.invoke([{"role": "user", "content": writer_prompt}])
+            with deadlines.stage("writer"):
+                response = llm.invoke([{"role": "user", "content": writer_prompt}])
             
             state["incident_brief"] = response.content
             state["current_step"] = "complete"
             
+        except (ProviderUnavailable, DeadlineExceeded) as e:
+            state["error"] = f"Writer degraded: {str(e)}"
+            state["degraded"] = True
+            state["incident_brief"] = render_degraded_brief(
+                question, assessment_text, blast_radius, affected_assets, "full brief skipped: provider unavailable or out of time"
+            )
+            state["current_step"] = "complete"
+            
         except Exception as e:
             state["error"] = f"Writer error: {str(e)}"
             state["incident_brief"] = f"Error generating incident brief: {str(e)}"
@@ -383,13 +1153,26 @@ def create_agent_workflow():
     # Create the LangGraph workflow
     workflow = StateGraph(AgentState)
     
-    # Add nodes for each agent
-    workflow.add_node("supervisor", supervisor_agent)
-    workflow.add_node("impact_assessor", impact_assessor_agent)
-    workflow.add_node("writer", writer_agent)
+    # Add nodes for each agent (checkpointed per triage id when a store is configured)
+    def node(name, agent):
+        return checkpoint_store.wrap_node(name, agent) if checkpoint_store else agent
+    
+    workflow.add_node("supervisor", node("supervisor", supervisor_agent))
+    workflow.add_node("impact_assessor", node("impact_assessor", impact_assessor_agent))
+    workflow.add_node("structured_triage", node("structured_triage", structured_triage_agent))
+    workflow.add_node("writer", node("writer", writer_agent))
     
     # Define the workflow edges
-    workflow.add_edge("supervisor", "impact_assessor")
+    workflow.add_conditional_edges(
+        "supervisor",
+        lambda state: "structured_triage" if state.get("single_pass") else "impact_assessor",
+        {"structured_triage": "structured_triage", "impact_assessor": "impact_assessor"}
+    )
+    workflow.add_conditional_edges(
+        "structured_triage",
+        lambda state: "impact_assessor" if state["current_step"] == "impact_assessor" else END,
+        {"impact_assessor": "impact_assessor", END: END}
+    )
     workflow.add_edge("impact_assessor", "writer")
     workflow.add_edge("writer", END)
     
@@ -399,6 +1182,59 @@ def create_agent_workflow():
     # Compile the graph
     return workflow.compile()
 
+def run_triage_graph(
+    question: str,
+    triage_id: Optional[str] = None,
+    degraded: bool = False,
+    single_pass: Optional[bool] = None,
+    filters: Optional[Dict[str, Any]] = None,
+    priority: Optional[str] = None
+) -> Dict[str, Any]:
+    """Run the triage graph under a triage id; an id seen before resumes from its last completed node."""
+    triage_id = triage_id or new_triage_id()
+    if checkpoint_store:
+        checkpoint_store.start(triage_id, question, {"single_pass": single_pass, "filters": filters, "priority": priority})
+    
+    try:
+        result = traceback_graph.invoke(create_initial_state(
+            question, degraded=degraded, single_pass=single_pass, filters=filters, triage_id=triage_id
+        ))
+    except Exception as e:
+        if checkpoint_store:
+            checkpoint_store.finish(triage_id, error=str(e))
+        raise
+    
+    if checkpoint_store:
+        checkpoint_store.finish(triage_id, error=result.get("error"))
+    result["triage_id"] = triage_id
+    if incident_history and result.get("incident_brief") and not result.get("error"):
+        incident_history.record(
+            question,
+            result["incident_brief"],
+            tables=lineage_retriever.find_tables(question),
+            blast_radius=result.get("blast_radius"),
+            priority=priority,
+            triage_id=triage_id
+        )
+    return result
+
+def resume_triage(triage_id: str, degraded: bool = False) -> Dict[str, Any]:
+    """Re-run a checkpointed triage, reusing every node that already completed."""
+    if not checkpoint_store:
+        raise RuntimeError("Triage checkpoints are disabled (set TRACEBACK_CHECKPOINTS=true)")
+    triage = checkpoint_store.get_triage(triage_id)
+    if triage is None:
+        raise KeyError(triage_id)
+    options = triage["options"]
+    return run_triage_graph(
+        triage["question"],
+        triage_id=triage_id,
+        degraded=degraded,
+        single_pass=options.get("single_pass"),
+        filters=options.get("filters"),
+        priority=options.get("priority")
+    )
+
 # Initialize the system when imported
 if __name__ != "__main__":
     initialize_system()
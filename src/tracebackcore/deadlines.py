@@ -0,0 +1,378 @@
+"""
+Traceback Deadlines and Circuit Breakers
+
+Bounds how long a triage request may take and stops sending work to an
+unhealthy provider.
+
+A request deadline is set once at the API/CLI boundary (``request_deadline``)
+and carried in a context variable. It reaches the pipeline's worker threads
+and LangGraph nodes without being passed explicitly. Each pipeline stage
+(``stage("writer")``) may use a share of the budget that remains when it
+starts, so a slow early stage leaves time for the later ones. Provider calls
+made inside a stage wait at most until the stage or the request runs out.
+
+Each external provider (``openai``, ``cohere``) has a circuit breaker. After
+``TRACEBACK_BREAKER_FAILURES`` consecutive provider failures, its calls fail
+immediately with ``ProviderUnavailable`` for ``TRACEBACK_BREAKER_RESET``
+seconds. After that a single probe call is let through to test recovery.
+Only transport errors, provider-side timeouts (``TRACEBACK_PROVIDER_TIMEOUT``),
+rate limits and 5xx responses count as failures; they are re-raised as
+``ProviderError``, a ``ProviderUnavailable``. A call abandoned because the
+caller's own request or stage deadline ran out says nothing about the provider
+and is not counted, so one client with a tight budget cannot open the circuit
+for everyone.
+Other errors (4xx requests, unparseable structured output) propagate unchanged
+and leave the breaker alone. Callers catch ``ProviderUnavailable`` and ``DeadlineExceeded`` and degrade to
+lineage-only context and briefs instead of failing the request.
+
+A provider call abandoned at its deadline keeps running in the background until
+the client-level timeout (``TRACEBACK_PROVIDER_TIMEOUT``) ends it.
+"""
+
+import os
+import time
+import threading
+import contextvars
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Dict, Any, Optional, Callable, List, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+# Default budget of a triage request in seconds (0 disables the deadline)
+TRIAGE_DEADLINE = float(os.getenv("TRACEBACK_TRIAGE_DEADLINE", "60"))
+# Client-level timeout of a single provider request, deadline or not
+PROVIDER_TIMEOUT = float(os.getenv("TRACEBACK_PROVIDER_TIMEOUT", "30"))
+BREAKER_FAILURES = int(os.getenv("TRACEBACK_BREAKER_FAILURES", "5"))
+BREAKER_RESET = float(os.getenv("TRACEBACK_BREAKER_RESET", "30"))
+
+# Share of the remaining budget each stage may use; stages not listed get all of it
+STAGE_SHARES = {
+    "retrieval": 0.3,
+    "rerank": 0.3,
+    "expansion": 0.4,
+    "impact_assessor": 0.5,
+    "structured_triage": 0.9,
+    "writer": 1.0,
+}
+
+PROVIDERS = ("openai", "cohere")
+
+# Exception classes (matched by name, so neither SDK has to be imported) for
+# requests that never got a response: openai/httpx connection and timeout errors
+TRANSPORT_ERRORS = {"APIConnectionError", "TransportError", "TimeoutException"}
+
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("traceback_deadline", default=None)
+_stage: contextvars.ContextVar[Optional[Tuple[str, float]]] = contextvars.ContextVar("traceback_stage", default=None)
+
+# Provider calls that must be abandoned at a deadline run here
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("TRACEBACK_PROVIDER_THREADS", "32")), thread_name_prefix="provider"
+)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a request or one of its stages runs out of time."""
+
+    def __init__(self, stage: str, message: Optional[str] = None):
+        super().__init__(message or f"deadline exceeded in {stage}")
+        self.stage = stage
+
+
+class ProviderUnavailable(RuntimeError):
+    """Raised instead of calling a provider whose circuit is open."""
+
+    def __init__(self, provider: str, retry_after: float):
+        super().__init__(f"{provider} circuit open, retry in {retry_after:.0f}s")
+        self.provider = provider
+        self.retry_after = retry_after
+
+
+class ProviderError(ProviderUnavailable):
+    """Raised from a provider's own exception so callers can degrade the same way."""
+
+    def __init__(self, provider: str, error: Exception):
+        RuntimeError.__init__(self, f"{provider} call failed: {error}")
+        self.provider = provider
+        self.retry_after = 0.0
+
+
+def is_provider_failure(error: BaseException) -> bool:
+    """True for errors that say the provider is unhealthy: transport, timeout, 429 and 5xx."""
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    return any(cls.__name__ in TRANSPORT_ERRORS for cls in type(error).__mro__)
+
+
+def is_timeout(error: BaseException) -> bool:
+    """True for a provider-side timeout (e.g. openai ``APITimeoutError``, httpx ``TimeoutException``)."""
+    return isinstance(error, TimeoutError) or any("Timeout" in cls.__name__ for cls in type(error).__mro__)
+
+
+def budget(requested: Optional[float] = None) -> Optional[float]:
+    """Seconds allowed for a request: the caller's timeout, capped by TRACEBACK_TRIAGE_DEADLINE."""
+    limits = [value for value in (requested, TRIAGE_DEADLINE) if value and value > 0]
+    return min(limits) if limits else None
+
+
+@contextmanager
+def request_deadline(seconds: Optional[float]):
+    """Run the block under a deadline ``seconds`` from now (an enclosing, earlier deadline wins)."""
+    if seconds is None:
+        yield
+        return
+    deadline = time.monotonic() + seconds
+    outer = _deadline.get()
+    token = _deadline.set(deadline if outer is None else min(outer, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the request deadline, or None without one."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+@contextmanager
+def stage(name: str):
+    """Give a pipeline stage its share of the remaining budget; raises DeadlineExceeded if none is left."""
+    left = remaining()
+    if left is None:
+        yield
+        return
+    if left <= 0:
+        raise DeadlineExceeded(name, f"deadline exceeded before {name}")
+    end = time.monotonic() + left * STAGE_SHARES.get(name, 1.0)
+    outer = _stage.get()
+    token = _stage.set((name, end if outer is None else min(outer[1], end)))
+    try:
+        yield
+    finally:
+        _stage.reset(token)
+
+
+def call_timeout() -> Tuple[str, Optional[float]]:
+    """(stage name, seconds) a provider call may take now; raises DeadlineExceeded if none is left."""
+    current = _stage.get()
+    ends = [end for end in (_deadline.get(), current[1] if current else None) if end is not None]
+    name = current[0] if current else "request"
+    if not ends:
+        return name, None
+    left = min(ends) - time.monotonic()
+    if left <= 0:
+        raise DeadlineExceeded(name)
+    return name, left
+
+
+def run_with_timeout(func: Callable, timeout: Optional[float], stage_name: str = "request"):
+    """Call ``func()``, giving up after ``timeout`` seconds (None runs it inline)."""
+    if timeout is None:
+        return func()
+    future = _executor.submit(contextvars.copy_context().run, func)
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeout:
+        future.cancel()
+        raise DeadlineExceeded(stage_name, f"{stage_name} timed out after {timeout:.1f}s") from None
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker: closed, open for ``reset_timeout`` seconds, then one probe."""
+
+    def __init__(self, name: str, failure_threshold: int = BREAKER_FAILURES, reset_timeout: float = BREAKER_RESET):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "failures": 0, "timeouts": 0, "rejected": 0, "opened": 0, "abandoned": 0}
+
+    def retry_after(self) -> float:
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def available(self) -> bool:
+        """False while the circuit is open and not yet due for a probe."""
+        with self._lock:
+            if self.state == "open":
+                return self.retry_after() <= 0
+            return not (self.state == "half_open" and self._probing)
+
+    def _before_call(self) -> bool:
+        """Admit a call (True if it is the half-open probe) or raise ProviderUnavailable."""
+        with self._lock:
+            if self.state == "open" and self.retry_after() <= 0:
+                self.state = "half_open"
+            if self.state == "open" or (self.state == "half_open" and self._probing):
+                self.stats["rejected"] += 1
+                # While a probe is in flight, callers are asked to come back shortly
+                raise ProviderUnavailable(self.name, self.retry_after() if self.state == "open" else 1.0)
+            self.stats["calls"] += 1
+            if self.state == "half_open":
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != "closed":
+                print(f"🔌 {self.name} circuit closed")
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self, timed_out: bool = False):
+        with self._lock:
+            self.failures += 1
+            self.stats["failures"] += 1
+            if timed_out:
+                self.stats["timeouts"] += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.stats["opened"] += 1
+                    print(f"🔌 {self.name} circuit open for {self.reset_timeout:.0f}s after {self.failures} failures")
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                self._probing = False
+
+    def call(self, func: Callable, *args, **kwargs):
+        """Call ``func`` through the breaker, within the current stage or request deadline."""
+        stage_name, timeout = call_timeout()
+        probe = self._before_call()
+        try:
+            result = run_with_timeout(lambda: func(*args, **kwargs), timeout, stage_name)
+        except DeadlineExceeded:
+            # The caller's budget ran out, not the provider's: leave the breaker alone
+            with self._lock:
+                self.stats["abandoned"] += 1
+            raise
+        except Exception as e:
+            if not is_provider_failure(e):
+                raise
+            self.record_failure(timed_out=is_timeout(e))
+            raise ProviderError(self.name, e) from e
+        finally:
+            # A probe that ended without a verdict (4xx, abandoned, interrupt) lets the next call probe
+            if probe:
+                with self._lock:
+                    self._probing = False
+        self.record_success()
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(
+                self.stats,
+                state=self.state,
+                consecutive_failures=self.failures,
+                retry_after=round(self.retry_after(), 1) if self.state == "open" else None
+            )
+
+
+BREAKERS = {name: CircuitBreaker(name) for name in PROVIDERS}
+
+
+def breaker(provider: str) -> CircuitBreaker:
+    return BREAKERS[provider]
+
+
+def get_breaker_stats() -> Dict[str, Any]:
+    return {name: circuit.snapshot() for name, circuit in BREAKERS.items()}
+
+
+class GuardedChatModel:
+    """Wraps a chat model so every call goes through a provider breaker under the current deadline.
+
+    Exposes ``invoke`` and ``with_structured_output``; every other attribute is
+    delegated to the wrapped model. Structured output is parsed after the guarded
+    call, so a malformed answer never counts against the provider.
+    """
+
+    def __init__(self, llm, provider: str = "openai"):
+        self.llm = llm
+        self.provider = provider
+
+    def __getattr__(self, name):
+        return getattr(self.llm, name)
+
+    def invoke(self, messages, config=None, **kwargs):
+        if config is not None:
+            return breaker(self.provider).call(self.llm.invoke, messages, config, **kwargs)
+        return breaker(self.provider).call(self.llm.invoke, messages, **kwargs)
+
+    def with_structured_output(self, schema, **kwargs) -> "GuardedStructuredModel":
+        return GuardedStructuredModel(self.llm, schema, self.provider, **kwargs)
+
+
+class GuardedStructuredModel:
+    """Structured output whose provider call is guarded and whose parsing is not.
+
+    The model is asked for ``include_raw`` output, which reports parsing errors
+    instead of raising them inside the guarded call; they are raised here.
+    """
+
+    def __init__(self, llm, schema, provider: str = "openai", include_raw: bool = False, **kwargs):
+        self.runnable = llm.with_structured_output(schema, include_raw=True, **kwargs)
+        self.include_raw = include_raw
+        self.provider = provider
+
+    def __getattr__(self, name):
+        return getattr(self.runnable, name)
+
+    def invoke(self, messages, config=None, **kwargs):
+        if config is not None:
+            result = breaker(self.provider).call(self.runnable.invoke, messages, config, **kwargs)
+        else:
+            result = breaker(self.provider).call(self.runnable.invoke, messages, **kwargs)
+        if self.include_raw:
+            return result
+        if result.get("parsing_error") is not None:
+            raise result["parsing_error"]
+        return result["parsed"]
+
+
+class GuardedEmbeddings(Embeddings):
+    """Embeddings whose requests go through a provider breaker under the current deadline.
+
+    The last ``query_cache_size`` query embeddings are kept, so a question embedded
+    for retrieval is not sent to the provider again by the incident history search.
+    """
+
+    def __init__(self, embeddings: Embeddings, provider: str = "openai", query_cache_size: int = 0):
+        self.embeddings = embeddings
+        self.provider = provider
+        self.query_cache_size = query_cache_size
+        self._query_cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._query_lock = threading.Lock()
+
+    def __getattr__(self, name):
+        return getattr(self.embeddings, name)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return breaker(self.provider).call(self.embeddings.embed_documents, texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        if not self.query_cache_size:
+            return breaker(self.provider).call(self.embeddings.embed_query, text)
+        with self._query_lock:
+            cached = self._query_cache.get(text)
+            if cached is not None:
+                self._query_cache.move_to_end(text)
+                return list(cached)
+        vector = breaker(self.provider).call(self.embeddings.embed_query, text)
+        with self._query_lock:
+            self._query_cache[text] = list(vector)
+            if len(self._query_cache) > self.query_cache_size:
+                self._query_cache.popitem(last=False)
+        return vector
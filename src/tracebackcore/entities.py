@@ -0,0 +1,222 @@
+"""
+Traceback Entity Linker
+
+Aho-Corasick automaton over lineage node, dashboard and pipeline ids that finds
+every mention in a single linear pass over questions or retrieved context.
+"""
+
+import re
+import difflib
+from collections import deque
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple
+
+# Characters that may appear inside an identifier (used for boundary checks)
+IDENTIFIER_CHARS = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_")
+
+# Dotted tokens considered for fuzzy matching, e.g. "curated.sales_order"
+DOTTED_TOKEN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z0-9_]+)+")
+
+
+@dataclass
+class EntityMatch:
+    """A single entity mention found in text."""
+    entity_id: str
+    kind: str
+    start: int
+    end: int
+    text: str
+    score: float = 1.0
+
+
+class EntityLinker:
+    """Links table, column, dashboard and pipeline mentions to lineage ids."""
+
+    def __init__(self, entities: Dict[str, Tuple[str, str]]):
+        """Build the automaton.
+
+        Args:
+            entities: surface form -> (entity_id, kind). Surface forms are matched
+                case-insensitively; several forms may map to the same entity.
+        """
+        self.entities = {}
+        # Trie as parallel lists: transitions, failure link, output pattern ids
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        self._patterns: List[Tuple[int, str, str]] = []  # (length, entity_id, kind)
+        self._column_tables: Dict[str, str] = {}
+        self._ids_by_schema: Dict[str, List[str]] = {}
+
+        for surface, (entity_id, kind) in entities.items():
+            surface = surface.lower()
+            if not surface or surface in self.entities:
+                continue
+            self.entities[surface] = (entity_id, kind)
+            self._add_pattern(surface, entity_id, kind)
+            if "." in surface:
+                self._ids_by_schema.setdefault(surface.split(".", 1)[0], []).append(surface)
+
+        self._build_failure_links()
+
+    @classmethod
+    def from_lineage(cls, lineage_data: Dict[str, Any]) -> "EntityLinker":
+        """Compile a linker from lineage nodes, dashboards and pipelines."""
+        entities = {}
+        column_tables = {}
+        for node in lineage_data.get("nodes", []):
+            node_id = node.get("id")
+            if not node_id:
+                continue
+            kind = node.get("type", "table")
+            entities[node_id] = (node_id, kind)
+            if kind == "column" and node.get("table"):
+                column_tables[node_id] = node["table"]
+        # Edge endpoints are tables/columns too, even when they have no node entry
+        for edge in lineage_data.get("edges", []):
+            for endpoint in (edge.get("from"), edge.get("to")):
+                if endpoint and endpoint not in entities:
+                    # schema.table.column endpoints are column-level lineage
+                    kind = "column" if endpoint.count(".") >= 2 else "table"
+                    entities[endpoint] = (endpoint, kind)
+        for dashboard in lineage_data.get("dashboards", []):
+            if dashboard.get("id"):
+                entities[dashboard["id"]] = (dashboard["id"], "dashboard")
+        for pipeline in lineage_data.get("pipelines", []):
+            if pipeline.get("id"):
+                entities[pipeline["id"]] = (pipeline["id"], "pipeline")
+                if pipeline.get("file"):
+                    entities[pipeline["file"]] = (pipeline["id"], "pipeline")
+
+        linker = cls(entities)
+        linker._column_tables = column_tables
+        return linker
+
+    def _add_pattern(self, surface: str, entity_id: str, kind: str):
+        state = 0
+        for ch in surface:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append(len(self._patterns))
+        self._patterns.append((len(surface), entity_id, kind))
+
+    def _build_failure_links(self):
+        queue = deque()
+        for nxt in self._goto[0].values():
+            self._fail[nxt] = 0
+            queue.append(nxt)
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                # Inherit outputs of the suffix state so one lookup sees every match
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def _scan(self, text: str) -> List[EntityMatch]:
+        """Return every boundary-respecting match (may overlap)."""
+        goto, fail, out, patterns = self._goto, self._fail, self._out, self._patterns
+        root = goto[0]
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # Rare case-folding that changes length: lower per character instead
+            lowered = "".join(ch.lower() if len(ch.lower()) == 1 else ch for ch in text)
+        matches = []
+        state = 0
+        length = len(text)
+        for i, ch in enumerate(lowered):
+            if state == 0:
+                # Fast path: most characters cannot start an entity
+                state = root.get(ch, 0)
+                if not state:
+                    continue
+            else:
+                while state and ch not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(ch, 0)
+            if not out[state]:
+                continue
+            end = i + 1
+            # Identifier must not continue past the match ("raw.sales_orders_v2")
+            if end < length and text[end] in IDENTIFIER_CHARS:
+                continue
+            for pattern_index in out[state]:
+                pattern_length, entity_id, kind = patterns[pattern_index]
+                start = end - pattern_length
+                if start > 0 and (text[start - 1] in IDENTIFIER_CHARS or text[start - 1] == "."):
+                    continue
+                matches.append(EntityMatch(entity_id, kind, start, end, text[start:end]))
+        return matches
+
+    def link(self, text: str, fuzzy: bool = False, fuzzy_cutoff: float = 0.85) -> List[EntityMatch]:
+        """Find leftmost-longest, non-overlapping entity mentions in ``text``.
+
+        With ``fuzzy=True`` dotted tokens that did not match exactly are compared
+        against ids in the same schema (e.g. "curated.sales_order").
+        """
+        if not text or not self._patterns:
+            return []
+
+        candidates = self._scan(text)
+        candidates.sort(key=lambda m: (m.start, -(m.end - m.start)))
+        matches = []
+        last_end = -1
+        for match in candidates:
+            if match.start >= last_end:
+                matches.append(match)
+                last_end = match.end
+
+        if fuzzy:
+            matches.extend(self._fuzzy_matches(text, matches, fuzzy_cutoff))
+            matches.sort(key=lambda m: m.start)
+        return matches
+
+    def _fuzzy_matches(self, text: str, exact: List[EntityMatch], cutoff: float) -> List[EntityMatch]:
+        covered = [(m.start, m.end) for m in exact]
+        fuzzy = []
+        for token in DOTTED_TOKEN.finditer(text):
+            start, end = token.span()
+            if any(s < end and start < e for s, e in covered):
+                continue
+            surface = token.group().lower()
+            candidates = self._ids_by_schema.get(surface.split(".", 1)[0])
+            if not candidates:
+                # Misspelled schema: fall back to every dotted id
+                candidates = [sid for ids in self._ids_by_schema.values() for sid in ids]
+            best = difflib.get_close_matches(surface, candidates, n=1, cutoff=cutoff)
+            if best:
+                entity_id, kind = self.entities[best[0]]
+                score = difflib.SequenceMatcher(None, surface, best[0]).ratio()
+                fuzzy.append(EntityMatch(entity_id, kind, start, end, token.group(), score))
+        return fuzzy
+
+    def find_entities(self, text: str, kinds: Optional[Tuple[str, ...]] = None, fuzzy: bool = False) -> List[str]:
+        """Unique entity ids mentioned in ``text``, in order of first mention."""
+        seen = {}
+        for match in self.link(text, fuzzy=fuzzy):
+            if kinds is None or match.kind in kinds:
+                seen.setdefault(match.entity_id, None)
+        return list(seen)
+
+    def find_tables(self, text: str, fuzzy: bool = False) -> List[str]:
+        """Unique table ids mentioned in ``text``; column mentions resolve to their table."""
+        seen = {}
+        for match in self.link(text, fuzzy=fuzzy):
+            if match.kind == "column":
+                seen.setdefault(self._column_tables.get(match.entity_id, match.entity_id.rsplit(".", 1)[0]), None)
+            elif match.kind not in ("dashboard", "pipeline"):
+                seen.setdefault(match.entity_id, None)
+        return list(seen)
@@ -0,0 +1,300 @@
+"""
+Traceback Feedback Store
+
+Append-only feedback log backed by SQLite in WAL mode. Writes are queued and
+committed in batches by a background thread so they never block a triage
+response; lookups by question hash, table and retriever method are indexed.
+
+Entries are unique on (kind, question hash, interaction id, rating, timestamp)
+and inserted with ``INSERT OR IGNORE``, so importing the same log twice adds
+nothing the second time.
+"""
+
+import os
+import re
+import json
+import time
+import uuid
+import queue
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS feedback (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    question TEXT,
+    question_hash TEXT,
+    retriever TEXT,
+    priority TEXT,
+    interaction_id TEXT,
+    rating INTEGER,
+    comment TEXT,
+    response TEXT,
+    payload TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_feedback_question_hash ON feedback (question_hash, timestamp);
+CREATE INDEX IF NOT EXISTS idx_feedback_retriever ON feedback (retriever, timestamp);
+CREATE INDEX IF NOT EXISTS idx_feedback_interaction ON feedback (interaction_id);
+CREATE INDEX IF NOT EXISTS idx_feedback_timestamp ON feedback (timestamp);
+CREATE TABLE IF NOT EXISTS feedback_tables (
+    feedback_id TEXT NOT NULL,
+    table_id TEXT NOT NULL,
+    timestamp REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_feedback_tables_table ON feedback_tables (table_id, timestamp);
+"""
+
+# What makes two entries the same entry (NULLs compare equal here, unlike in a plain UNIQUE column list)
+ENTRY_KEY = "kind, question_hash, COALESCE(interaction_id, ''), COALESCE(rating, ''), timestamp"
+
+UNIQUE_KEYS = f"""
+CREATE UNIQUE INDEX IF NOT EXISTS idx_feedback_entry ON feedback ({ENTRY_KEY});
+CREATE UNIQUE INDEX IF NOT EXISTS idx_feedback_tables_entry ON feedback_tables (feedback_id, table_id);
+"""
+
+# Stores written before the unique keys existed may hold repeated imports
+DEDUPLICATE = f"""
+DELETE FROM feedback WHERE rowid NOT IN (SELECT MIN(rowid) FROM feedback GROUP BY {ENTRY_KEY});
+DELETE FROM feedback_tables WHERE feedback_id NOT IN (SELECT id FROM feedback)
+    OR rowid NOT IN (SELECT MIN(rowid) FROM feedback_tables GROUP BY feedback_id, table_id);
+"""
+
+COLUMNS = ("id", "kind", "timestamp", "question", "question_hash", "retriever", "priority",
+           "interaction_id", "rating", "comment", "response", "payload")
+
+# Sentinel that asks the writer thread to stop
+_STOP = object()
+
+
+def question_hash(question: str) -> str:
+    """Stable hash of a question, insensitive to case and whitespace."""
+    normalized = re.sub(r"\s+", " ", (question or "").strip().lower())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:32]
+
+
+def default_feedback_path() -> Path:
+    project_root = Path(__file__).parent.parent.parent
+    return Path(os.getenv("TRACEBACK_FEEDBACK_DB", project_root / "data" / "feedback.db"))
+
+
+class FeedbackStore:
+    """Append-only feedback log with background batched writes."""
+
+    def __init__(self, path=None, batch_size: int = 256, flush_interval: float = 0.5):
+        self.path = Path(path) if path else default_feedback_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'idx_feedback_entry'").fetchone():
+                conn.executescript(DEDUPLICATE)
+            conn.executescript(UNIQUE_KEYS)
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._local = threading.local()
+        self._written = 0
+        self._dropped = 0
+        self._writer = threading.Thread(target=self._write_loop, name="feedback-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def submit(
+        self,
+        question: str,
+        kind: str = "feedback",
+        retriever: Optional[str] = None,
+        priority: Optional[str] = None,
+        interaction_id: Optional[str] = None,
+        rating: Optional[int] = None,
+        comment: Optional[str] = None,
+        response: Optional[str] = None,
+        tables: Optional[List[str]] = None,
+        payload: Optional[Dict[str, Any]] = None,
+        entry_id: Optional[str] = None,
+        timestamp: Optional[float] = None
+    ) -> str:
+        """Queue an entry for writing and return its id immediately."""
+        entry_id = entry_id or uuid.uuid4().hex
+        self._queue.put({
+            "id": entry_id,
+            "kind": kind,
+            "timestamp": time.time() if timestamp is None else timestamp,
+            "question": question,
+            "question_hash": question_hash(question),
+            "retriever": retriever,
+            "priority": priority,
+            "interaction_id": interaction_id,
+            "rating": rating,
+            "comment": comment,
+            "response": response,
+            "payload": json.dumps(payload) if payload else None,
+            "tables": sorted(set(tables or [])),
+        })
+        return entry_id
+
+    def _write_loop(self):
+        conn = self._connect()
+        running = True
+        while running:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch = [first]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            entries = [entry for entry in batch if entry is not _STOP]
+            running = len(entries) == len(batch)
+            try:
+                if entries:
+                    with conn:
+                        conn.executemany(
+                            f"INSERT OR IGNORE INTO feedback ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                            [tuple(entry[column] for column in COLUMNS) for entry in entries]
+                        )
+                        conn.executemany(
+                            "INSERT OR IGNORE INTO feedback_tables (feedback_id, table_id, timestamp) VALUES (?, ?, ?)",
+                            [(entry["id"], table, entry["timestamp"]) for entry in entries for table in entry["tables"]]
+                        )
+                    self._written += len(entries)
+            except sqlite3.Error as e:
+                self._dropped += len(entries)
+                print(f"⚠️ Feedback write failed for {len(entries)} entries: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+        conn.close()
+
+    def flush(self):
+        """Block until every queued entry has been written."""
+        self._queue.join()
+
+    def close(self):
+        """Flush pending writes and stop the writer thread."""
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+
+    def _rows_to_entries(self, rows) -> List[Dict[str, Any]]:
+        entries = []
+        for row in rows:
+            entry = dict(row)
+            entry["payload"] = json.loads(entry["payload"]) if entry.get("payload") else {}
+            entries.append(entry)
+        return entries
+
+    def lookup(
+        self,
+        question: Optional[str] = None,
+        table: Optional[str] = None,
+        retriever: Optional[str] = None,
+        kind: Optional[str] = None,
+        interaction_id: Optional[str] = None,
+        limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        """Most recent entries matching every given criterion (all indexed)."""
+        clauses, params = [], []
+        source = "feedback f"
+        if table:
+            source = "feedback_tables t JOIN feedback f ON f.id = t.feedback_id"
+            clauses.append("t.table_id = ?")
+            params.append(table)
+        if question:
+            clauses.append("f.question_hash = ?")
+            params.append(question_hash(question))
+        if retriever:
+            clauses.append("f.retriever = ?")
+            params.append(retriever)
+        if kind:
+            clauses.append("f.kind = ?")
+            params.append(kind)
+        if interaction_id:
+            clauses.append("f.interaction_id = ?")
+            params.append(interaction_id)
+
+        order = "t.timestamp" if table else "f.timestamp"
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._reader().execute(
+            f"SELECT f.* FROM {source} {where} ORDER BY {order} DESC LIMIT ?",
+            params + [limit]
+        ).fetchall()
+        return self._rows_to_entries(rows)
+
+    def get(self, entry_id: str) -> Optional[Dict[str, Any]]:
+        rows = self._reader().execute("SELECT * FROM feedback WHERE id = ?", (entry_id,)).fetchall()
+        entries = self._rows_to_entries(rows)
+        if not entries:
+            return None
+        entry = entries[0]
+        entry["tables"] = [row[0] for row in self._reader().execute(
+            "SELECT table_id FROM feedback_tables WHERE feedback_id = ?", (entry_id,)
+        )]
+        return entry
+
+    def get_stats(self) -> Dict[str, Any]:
+        by_kind = dict(self._reader().execute("SELECT kind, COUNT(*) FROM feedback GROUP BY kind").fetchall())
+        return {
+            "path": str(self.path),
+            "entries": sum(by_kind.values()),
+            "by_kind": by_kind,
+            "queued": self._queue.qsize(),
+            "written": self._written,
+            "dropped": self._dropped,
+        }
+
+    def count(self) -> int:
+        return self._reader().execute("SELECT COUNT(*) FROM feedback").fetchone()[0]
+
+    def import_legacy_json(self, legacy_file) -> int:
+        """Import entries from the notebook-era feedback_log.json; returns how many were new.
+
+        Entries already in the store (same entry key) are skipped, so re-imports are no-ops.
+        """
+        with open(legacy_file, "r", encoding="utf-8") as f:
+            legacy = json.load(f)
+        before = self.count()
+        for entry in legacy.get("feedback_entries", []):
+            timestamp = entry.get("timestamp")
+            try:
+                timestamp = time.mktime(time.strptime(timestamp.split(".")[0], "%Y-%m-%dT%H:%M:%S"))
+            except (AttributeError, ValueError):
+                # A fixed time, not the import time, so a re-import matches the same key
+                timestamp = 0.0
+            user_feedback = entry.get("user_feedback") or {}
+            self.submit(
+                question=entry.get("question", ""),
+                kind="interaction",
+                retriever=entry.get("query_type"),
+                rating=user_feedback.get("rating"),
+                comment=user_feedback.get("comment"),
+                response=entry.get("response"),
+                payload={key: value for key, value in entry.items() if key not in ("id", "question", "response")},
+                entry_id=entry.get("id"),
+                timestamp=timestamp
+            )
+        self.flush()
+        return self.count() - before
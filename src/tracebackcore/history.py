@@ -0,0 +1,346 @@
+"""
+Traceback Incident History
+
+Completed triages are kept in SQLite (WAL mode) with three indexes, so past
+incidents resembling a new one can be found in milliseconds:
+
+    vector     normalized embedding of question + brief, scanned in memory (numpy)
+    keyword    FTS5 over question and brief (bm25)
+    table      incident_tables (table_id, created_at)
+
+``similar`` fuses the three rankings with reciprocal rank fusion. Writes are
+embedded and committed by a background thread so a triage response never waits
+on them. ``compact`` applies the retention window and size cap, then optimizes
+the FTS index.
+"""
+
+import os
+import atexit
+import re
+import json
+import time
+import uuid
+import queue
+import sqlite3
+import threading
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Callable
+
+import numpy as np
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS incidents (
+    incident_id TEXT PRIMARY KEY,
+    triage_id TEXT,
+    question TEXT NOT NULL,
+    brief TEXT NOT NULL,
+    tables TEXT,
+    blast_radius TEXT,
+    priority TEXT,
+    created_at REAL NOT NULL,
+    vector BLOB
+);
+CREATE INDEX IF NOT EXISTS idx_incidents_created ON incidents (created_at);
+CREATE TABLE IF NOT EXISTS incident_tables (
+    incident_id TEXT NOT NULL,
+    table_id TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_incident_tables_table ON incident_tables (table_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_incident_tables_incident ON incident_tables (incident_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS incidents_fts USING fts5(
+    question, brief, content='incidents', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS incidents_fts_insert AFTER INSERT ON incidents BEGIN
+    INSERT INTO incidents_fts (rowid, question, brief) VALUES (new.rowid, new.question, new.brief);
+END;
+CREATE TRIGGER IF NOT EXISTS incidents_fts_delete AFTER DELETE ON incidents BEGIN
+    INSERT INTO incidents_fts (incidents_fts, rowid, question, brief) VALUES ('delete', old.rowid, old.question, old.brief);
+END;
+"""
+
+# Candidates taken from each index before fusion, and the usual RRF constant
+CANDIDATES_PER_INDEX = 20
+RRF_K = 60
+
+# Characters of the brief embedded alongside the question
+EMBEDDED_BRIEF_CHARS = 1000
+
+_STOP = object()
+
+
+def default_history_path() -> Path:
+    project_root = Path(__file__).parent.parent.parent
+    return Path(os.getenv("TRACEBACK_HISTORY_DB", project_root / "data" / "incident_history.db"))
+
+
+def keyword_query(text: str) -> Optional[str]:
+    """FTS5 query matching any word of ``text`` (quoted, so punctuation can't break the syntax)."""
+    words = sorted(set(re.findall(r"[a-z0-9_]{3,}", text.lower())))
+    return " OR ".join(f'"{word}"' for word in words) or None
+
+
+class IncidentHistory:
+    """Indexed store of completed triages with background writes."""
+
+    def __init__(
+        self,
+        path=None,
+        embed: Optional[Callable[[str], List[float]]] = None,
+        retention_seconds: Optional[float] = None,
+        max_incidents: Optional[int] = None
+    ):
+        self.path = Path(path) if path else default_history_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.embed = embed
+        self.retention_seconds = retention_seconds
+        self.max_incidents = max_incidents
+        self._local = threading.local()
+        self._index_lock = threading.Lock()
+        self._conn().executescript(SCHEMA)
+        self._load_vectors()
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self.stats = {"recorded": 0, "dropped": 0, "searches": 0}
+        self._writer = threading.Thread(target=self._write_loop, name="history-writer", daemon=True)
+        self._writer.start()
+        # Pending writes from short-lived processes (CLI triage) are flushed at exit
+        atexit.register(self.close)
+
+    @classmethod
+    def from_env(cls, embed: Optional[Callable[[str], List[float]]] = None) -> Optional["IncidentHistory"]:
+        """History configured by TRACEBACK_INCIDENT_HISTORY / TRACEBACK_HISTORY_*, or None unless enabled."""
+        if os.getenv("TRACEBACK_INCIDENT_HISTORY", "false").lower() not in ("1", "true", "yes"):
+            return None
+        retention_days = float(os.getenv("TRACEBACK_HISTORY_RETENTION_DAYS", "730"))
+        max_incidents = int(os.getenv("TRACEBACK_HISTORY_MAX_INCIDENTS", "100000"))
+        return cls(
+            embed=embed,
+            retention_seconds=retention_days * 86400 if retention_days > 0 else None,
+            max_incidents=max_incidents if max_incidents > 0 else None
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def _load_vectors(self):
+        """(Re)build the in-memory vector index from the stored embeddings."""
+        ids, vectors = [], []
+        for row in self._conn().execute("SELECT incident_id, vector FROM incidents WHERE vector IS NOT NULL ORDER BY created_at DESC"):
+            vector = np.frombuffer(row["vector"], dtype=np.float32)
+            # Only the embedding size in current use (the newest incident's) is searchable
+            if vectors and len(vector) != len(vectors[0]):
+                continue
+            ids.append(row["incident_id"])
+            vectors.append(vector)
+        ids.reverse()
+        vectors.reverse()
+        with self._index_lock:
+            self._ids = ids
+            self._buffer = np.vstack(vectors) if vectors else None
+
+    def count(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM incidents").fetchone()[0]
+
+    def record(
+        self,
+        question: str,
+        brief: str,
+        tables: Optional[List[str]] = None,
+        blast_radius: Optional[List[str]] = None,
+        priority: Optional[str] = None,
+        triage_id: Optional[str] = None
+    ) -> str:
+        """Queue a completed triage for indexing and return its incident id immediately."""
+        incident_id = uuid.uuid4().hex
+        self._queue.put({
+            "incident_id": incident_id,
+            "triage_id": triage_id,
+            "question": question,
+            "brief": brief,
+            "tables": sorted(set(tables or [])),
+            "blast_radius": sorted(set(blast_radius or [])),
+            "priority": priority,
+            "created_at": time.time(),
+        })
+        return incident_id
+
+    def _vector(self, text: str) -> Optional[np.ndarray]:
+        if not self.embed:
+            return None
+        vector = np.asarray(self.embed(text), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def _write_loop(self):
+        while True:
+            entry = self._queue.get()
+            try:
+                if entry is _STOP:
+                    return
+                self._write(entry)
+                self.stats["recorded"] += 1
+            except Exception as e:
+                self.stats["dropped"] += 1
+                print(f"⚠️ Incident history write failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _write(self, entry: Dict[str, Any]):
+        vector = self._vector(f"{entry['question']}\n{entry['brief'][:EMBEDDED_BRIEF_CHARS]}")
+        conn = self._conn()
+        conn.execute("BEGIN")
+        try:
+            conn.execute(
+                "INSERT INTO incidents (incident_id, triage_id, question, brief, tables, blast_radius, priority, created_at, vector) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (entry["incident_id"], entry["triage_id"], entry["question"], entry["brief"],
+                 json.dumps(entry["tables"]), json.dumps(entry["blast_radius"]), entry["priority"],
+                 entry["created_at"], vector.tobytes() if vector is not None else None)
+            )
+            conn.executemany(
+                "INSERT INTO incident_tables (incident_id, table_id, created_at) VALUES (?, ?, ?)",
+                [(entry["incident_id"], table, entry["created_at"]) for table in entry["tables"]]
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if vector is not None:
+            with self._index_lock:
+                if self._buffer is None or self._buffer.shape[1] != len(vector):
+                    # First vector, or the embedding size changed: the newest size wins
+                    self._ids, self._buffer = [], np.empty((64, len(vector)), dtype=np.float32)
+                elif len(self._ids) == len(self._buffer):
+                    # Grow by doubling so appends stay amortized O(1)
+                    grown = np.empty((2 * len(self._buffer), self._buffer.shape[1]), dtype=np.float32)
+                    grown[:len(self._ids)] = self._buffer[:len(self._ids)]
+                    self._buffer = grown
+                self._buffer[len(self._ids)] = vector
+                self._ids.append(entry["incident_id"])
+
+    def flush(self):
+        """Block until every queued incident has been written."""
+        self._queue.join()
+
+    def close(self):
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+
+    def similar(self, question: str, tables: Optional[List[str]] = None, k: int = 3,
+                min_similarity: float = 0.0) -> List[Dict[str, Any]]:
+        """Top ``k`` past incidents by fused vector, keyword and table-id rankings.
+
+        Incidents that share no table with ``tables`` and fall below
+        ``min_similarity`` (cosine) are left out.
+        """
+        self.stats["searches"] += 1
+        rankings: List[List[str]] = []
+        similarity: Dict[str, float] = {}
+
+        query_vector = None
+        if self._ids:
+            try:
+                query_vector = self._vector(question)
+            except Exception as e:
+                print(f"⚠️ Incident history embedding failed, using keyword and table indexes: {e}")
+        if query_vector is not None:
+            with self._index_lock:
+                # Appends only extend past this prefix, so it stays valid without the lock
+                ids, matrix = self._ids, self._buffer[:len(self._ids)]
+            if matrix.shape[1] == len(query_vector):
+                scores = matrix @ query_vector
+                count = min(CANDIDATES_PER_INDEX, len(scores))
+                top = np.argpartition(-scores, count - 1)[:count]
+                top = top[np.argsort(-scores[top])]
+                rankings.append([ids[i] for i in top])
+                similarity = {ids[i]: float(scores[i]) for i in top}
+
+        conn = self._conn()
+        match = keyword_query(question)
+        if match:
+            rankings.append([row[0] for row in conn.execute(
+                "SELECT i.incident_id FROM incidents_fts JOIN incidents i ON i.rowid = incidents_fts.rowid "
+                "WHERE incidents_fts MATCH ? ORDER BY bm25(incidents_fts) LIMIT ?",
+                (match, CANDIDATES_PER_INDEX)
+            )])
+
+        table_matches = set()
+        if tables:
+            placeholders = ", ".join("?" * len(tables))
+            ranked = [row[0] for row in conn.execute(
+                f"SELECT incident_id FROM incident_tables WHERE table_id IN ({placeholders}) "
+                f"ORDER BY created_at DESC LIMIT ?",
+                list(tables) + [CANDIDATES_PER_INDEX]
+            )]
+            table_matches = set(ranked)
+            rankings.append(list(dict.fromkeys(ranked)))
+
+        fused: Dict[str, float] = {}
+        for ranking in rankings:
+            for rank, incident_id in enumerate(ranking):
+                fused[incident_id] = fused.get(incident_id, 0.0) + 1.0 / (RRF_K + rank + 1)
+        candidates = [
+            incident_id for incident_id in sorted(fused, key=fused.get, reverse=True)
+            if incident_id in table_matches or similarity.get(incident_id, 0.0) >= min_similarity
+        ][:k]
+        if not candidates:
+            return []
+
+        rows = {
+            row["incident_id"]: row for row in conn.execute(
+                f"SELECT incident_id, triage_id, question, brief, tables, blast_radius, priority, created_at "
+                f"FROM incidents WHERE incident_id IN ({', '.join('?' * len(candidates))})", candidates
+            )
+        }
+        return [
+            {
+                **{key: rows[incident_id][key] for key in ("incident_id", "triage_id", "question", "brief", "priority", "created_at")},
+                "tables": json.loads(rows[incident_id]["tables"] or "[]"),
+                "blast_radius": json.loads(rows[incident_id]["blast_radius"] or "[]"),
+                "score": fused[incident_id],
+                "similarity": similarity.get(incident_id),
+            }
+            for incident_id in candidates if incident_id in rows
+        ]
+
+    def compact(self) -> int:
+        """Drop incidents beyond the retention window or size cap; returns how many were removed."""
+        conn = self._conn()
+        removed = 0
+        conn.execute("BEGIN")
+        try:
+            if self.retention_seconds:
+                cutoff = time.time() - self.retention_seconds
+                conn.execute("DELETE FROM incident_tables WHERE created_at < ?", (cutoff,))
+                removed += conn.execute("DELETE FROM incidents WHERE created_at < ?", (cutoff,)).rowcount
+            if self.max_incidents:
+                stale = "SELECT incident_id FROM incidents ORDER BY created_at DESC LIMIT -1 OFFSET ?"
+                conn.execute(f"DELETE FROM incident_tables WHERE incident_id IN ({stale})", (self.max_incidents,))
+                removed += conn.execute(f"DELETE FROM incidents WHERE incident_id IN ({stale})", (self.max_incidents,)).rowcount
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if removed:
+            conn.execute("INSERT INTO incidents_fts (incidents_fts) VALUES ('optimize')")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._load_vectors()
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "path": str(self.path),
+            "incidents": self.count(),
+            "indexed_vectors": len(self._ids),
+            "queued": self._queue.qsize(),
+            **self.stats,
+        }
@@ -0,0 +1,129 @@
+"""
+Traceback Impact Index
+
+Reverse indexes from table ids to the dashboards that read them, the teams
+behind those dashboards, and the pipelines (and owners) that produce them.
+Combined with the retriever's memoized downstream closures, one lookup turns a
+failed table into the full set of affected dashboards, teams and owners.
+"""
+
+from typing import List, Dict, Any, Iterable
+
+# Weight of a dashboard by how often it refreshes
+REFRESH_WEIGHTS = {
+    "real-time": 5.0,
+    "realtime": 5.0,
+    "streaming": 5.0,
+    "hourly": 4.0,
+    "daily": 2.0,
+    "weekly": 1.0,
+    "monthly": 0.5,
+}
+
+
+class ImpactIndex:
+    """Table -> dashboards / producing pipelines / owners reverse indexes."""
+
+    def __init__(
+        self,
+        dashboards: List[Dict[str, Any]],
+        pipelines: List[Dict[str, Any]],
+        dashboards_by_table: Dict[str, List[int]],
+        pipelines_by_table: Dict[str, List[int]],
+        owners_by_table: Dict[str, List[str]]
+    ):
+        self.dashboards = dashboards
+        self.pipelines = pipelines
+        self.dashboards_by_table = dashboards_by_table
+        self.pipelines_by_table = pipelines_by_table
+        self.owners_by_table = owners_by_table
+
+    @classmethod
+    def from_lineage(cls, lineage_data: Dict[str, Any]) -> "ImpactIndex":
+        dashboards = [
+            {
+                "id": dashboard.get("id"),
+                "name": dashboard.get("name", dashboard.get("id")),
+                "teams": list(dashboard.get("teams", [])),
+                "refresh_frequency": dashboard.get("refresh_frequency"),
+            }
+            for dashboard in lineage_data.get("dashboards", [])
+        ]
+        dashboards_by_table: Dict[str, List[int]] = {}
+        for position, dashboard in enumerate(lineage_data.get("dashboards", [])):
+            for table in dashboard.get("tables", []):
+                dashboards_by_table.setdefault(table, []).append(position)
+
+        pipelines = [
+            {
+                "id": pipeline.get("id"),
+                "name": pipeline.get("name", pipeline.get("id")),
+                "file": pipeline.get("file"),
+                "owner": pipeline.get("owner"),
+                "schedule": pipeline.get("schedule"),
+            }
+            for pipeline in lineage_data.get("pipelines", [])
+        ]
+        pipelines_by_table: Dict[str, List[int]] = {}
+        for position, pipeline in enumerate(lineage_data.get("pipelines", [])):
+            for table in pipeline.get("outputs", []):
+                pipelines_by_table.setdefault(table, []).append(position)
+
+        owners_by_table = {
+            node["id"]: list(node.get("owners", []))
+            for node in lineage_data.get("nodes", [])
+            if node.get("id") and node.get("owners")
+        }
+        return cls(dashboards, pipelines, dashboards_by_table, pipelines_by_table, owners_by_table)
+
+    def lookup(self, tables: Iterable[str]) -> Dict[str, Any]:
+        """Dashboards, teams, producing pipelines and owners affected by ``tables``.
+
+        Dashboards are ordered by refresh frequency (most frequent first), so the
+        ones users will notice soonest lead the list.
+        """
+        dashboard_hits: Dict[int, List[str]] = {}
+        pipeline_hits: Dict[int, List[str]] = {}
+        owners = set()
+        for table in tables:
+            for position in self.dashboards_by_table.get(table, ()):
+                dashboard_hits.setdefault(position, []).append(table)
+            for position in self.pipelines_by_table.get(table, ()):
+                pipeline_hits.setdefault(position, []).append(table)
+            owners.update(self.owners_by_table.get(table, ()))
+
+        dashboards = [
+            dict(self.dashboards[position], via=sorted(set(via)))
+            for position, via in dashboard_hits.items()
+        ]
+        dashboards.sort(key=lambda dashboard: (
+            -REFRESH_WEIGHTS.get(str(dashboard["refresh_frequency"] or "").lower(), 1.0),
+            str(dashboard["id"])
+        ))
+        pipelines = [
+            dict(self.pipelines[position], outputs=sorted(set(outputs)))
+            for position, outputs in sorted(pipeline_hits.items())
+        ]
+        owners.update(pipeline["owner"] for pipeline in pipelines if pipeline["owner"])
+
+        return {
+            "dashboards": dashboards,
+            "teams": sorted({team for dashboard in dashboards for team in dashboard["teams"]}),
+            "pipelines": pipelines,
+            "owners": sorted(owners),
+        }
+
+
+def summarize_impact(affected_assets: Dict[str, Any]) -> str:
+    """One-paragraph summary of affected dashboards, teams and owners for prompts and briefs."""
+    if not affected_assets:
+        return "None identified"
+    dashboards = ", ".join(
+        f"{dashboard['name']} ({dashboard['refresh_frequency']})" if dashboard.get("refresh_frequency") else dashboard["name"]
+        for dashboard in affected_assets.get("dashboards", [])
+    )
+    return (
+        f"Dashboards: {dashboards or 'None identified'}. "
+        f"Teams: {', '.join(affected_assets.get('teams', [])) or 'None identified'}. "
+        f"Owners: {', '.join(affected_assets.get('owners', [])) or 'None identified'}."
+    )
@@ -0,0 +1,239 @@
+"""
+Traceback LLM Call Cache
+
+Opt-in, disk-backed exact cache for chat completions. ``CachedChatModel`` wraps
+the ``llm`` built by ``initialize_system`` and keys every call by
+(model, sampling parameters, prompt hash); structured-output calls also key on
+the output schema. Entries are zlib-compressed in SQLite (WAL mode) and the
+least recently used ones are evicted once the database exceeds its size budget.
+
+Repeated evaluation and benchmark runs then replay completions at disk speed;
+hit/miss counters are kept per run (``reset_stats``) and lifetime.
+"""
+
+import os
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    model TEXT,
+    response BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache (last_used);
+"""
+
+# Sampling parameters that change the completion (anything else is ignored in the key)
+KEY_PARAMS = ("model_name", "model", "temperature", "top_p", "max_tokens", "seed", "n",
+              "frequency_penalty", "presence_penalty", "stop", "response_format", "reasoning_effort")
+
+
+def default_cache_path() -> Path:
+    project_root = Path(__file__).parent.parent.parent
+    return Path(os.getenv("TRACEBACK_LLM_CACHE_DB", project_root / "data" / "llm_cache.db"))
+
+
+def normalize_messages(messages) -> List[Dict[str, Any]]:
+    """Prompt as a list of role/content dicts, whatever form ``invoke`` received."""
+    if isinstance(messages, str):
+        return [{"role": "user", "content": messages}]
+    if isinstance(messages, BaseMessage):
+        messages = [messages]
+    normalized = []
+    for message in messages:
+        if isinstance(message, BaseMessage):
+            normalized.append({"role": message.type, "content": message.content})
+        elif isinstance(message, dict):
+            normalized.append({"role": message.get("role"), "content": message.get("content")})
+        elif isinstance(message, (tuple, list)) and len(message) == 2:
+            normalized.append({"role": message[0], "content": message[1]})
+        else:
+            normalized.append({"role": "user", "content": str(message)})
+    return normalized
+
+
+class LLMCache:
+    """SQLite store of compressed completions with LRU eviction under a byte budget."""
+
+    def __init__(self, path=None, max_bytes: int = 256 * 1024 * 1024):
+        self.path = Path(path) if path else default_cache_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._conn().executescript(SCHEMA)
+        self._total_bytes = self._conn().execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        self.lifetime = {"hits": 0, "misses": 0, "evictions": 0}
+        self.run = {"hits": 0, "misses": 0}
+
+    @classmethod
+    def from_env(cls) -> Optional["LLMCache"]:
+        """Cache configured by TRACEBACK_LLM_CACHE / _DB / _MAX_MB, or None when not enabled."""
+        if os.getenv("TRACEBACK_LLM_CACHE", "false").lower() not in ("1", "true", "yes"):
+            return None
+        return cls(max_bytes=int(float(os.getenv("TRACEBACK_LLM_CACHE_MAX_MB", "256")) * 1024 * 1024))
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Any]:
+        row = self._conn().execute("SELECT response FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self._count("misses")
+            return None
+        self._conn().execute("UPDATE llm_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+        self._count("hits")
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, key: str, model: str, value: Any):
+        blob = zlib.compress(json.dumps(value, default=str).encode("utf-8"), 6)
+        now = time.time()
+        conn = self._conn()
+        with self._lock:
+            previous = conn.execute("SELECT size FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, model, response, size, created_at, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, blob, len(blob), now, now)
+            )
+            self._total_bytes += len(blob) - (previous[0] if previous else 0)
+            if self._total_bytes > self.max_bytes:
+                self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Drop least recently used entries until the cache is back under 90% of its budget."""
+        target = int(self.max_bytes * 0.9)
+        while self._total_bytes > target:
+            rows = conn.execute("SELECT key, size FROM llm_cache ORDER BY last_used LIMIT 256").fetchall()
+            if not rows:
+                self._total_bytes = 0
+                break
+            evicted = []
+            for key, size in rows:
+                evicted.append((key,))
+                self._total_bytes -= size
+                if self._total_bytes <= target:
+                    break
+            conn.executemany("DELETE FROM llm_cache WHERE key = ?", evicted)
+            self.lifetime["evictions"] += len(evicted)
+
+    def _count(self, outcome: str):
+        with self._lock:
+            self.run[outcome] += 1
+            self.lifetime[outcome] += 1
+
+    def reset_stats(self) -> Dict[str, int]:
+        """Start a new run; returns the counts of the run that ended."""
+        with self._lock:
+            finished, self.run = self.run, {"hits": 0, "misses": 0}
+        return finished
+
+    def get_stats(self) -> Dict[str, Any]:
+        entries = self._conn().execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        lookups = self.run["hits"] + self.run["misses"]
+        return {
+            "path": str(self.path),
+            "entries": entries,
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "run": dict(self.run, hit_rate=self.run["hits"] / lookups if lookups else 0.0),
+            "lifetime": dict(self.lifetime),
+        }
+
+
+class CachedChatModel:
+    """Wraps a chat model so identical calls are answered from an ``LLMCache``.
+
+    Exposes ``invoke`` and ``with_structured_output``; every other attribute is
+    delegated to the wrapped model.
+    """
+
+    def __init__(self, llm, cache: LLMCache):
+        self.llm = llm
+        self.cache = cache
+
+    def __getattr__(self, name):
+        return getattr(self.llm, name)
+
+    def _params(self) -> Dict[str, Any]:
+        params = {}
+        for source in (getattr(self.llm, "_identifying_params", None), getattr(self.llm, "__dict__", {})):
+            if isinstance(source, dict):
+                for name in KEY_PARAMS:
+                    if name in source and source[name] is not None and name not in params:
+                        params[name] = source[name]
+        return params
+
+    def _model_name(self) -> str:
+        return str(getattr(self.llm, "model_name", None) or getattr(self.llm, "model", "unknown"))
+
+    def cache_key(self, messages, kind: str = "chat", extra: Optional[Dict[str, Any]] = None) -> str:
+        payload = {
+            "kind": kind,
+            "model": self._model_name(),
+            "params": self._params(),
+            "prompt": hashlib.sha256(
+                json.dumps(normalize_messages(messages), sort_keys=True, default=str).encode("utf-8")
+            ).hexdigest(),
+            "extra": extra or {},
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def invoke(self, messages, config=None, **kwargs):
+        key = self.cache_key(messages, extra=kwargs)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return messages_from_dict([cached])[0]
+        response = self.llm.invoke(messages, config, **kwargs) if config is not None else self.llm.invoke(messages, **kwargs)
+        if isinstance(response, BaseMessage):
+            self.cache.put(key, self._model_name(), message_to_dict(response))
+        return response
+
+    def with_structured_output(self, schema, **kwargs) -> "CachedStructuredModel":
+        return CachedStructuredModel(self, self.llm.with_structured_output(schema, **kwargs), schema, kwargs)
+
+
+class CachedStructuredModel:
+    """Structured-output runnable whose parsed results are cached by prompt and schema."""
+
+    def __init__(self, parent: CachedChatModel, runnable, schema, options: Dict[str, Any]):
+        self.parent = parent
+        self.runnable = runnable
+        self.schema = schema
+        json_schema = schema.model_json_schema() if hasattr(schema, "model_json_schema") else schema
+        self.extra = {
+            "schema": hashlib.sha256(json.dumps(json_schema, sort_keys=True, default=str).encode("utf-8")).hexdigest(),
+            "options": options,
+        }
+
+    def __getattr__(self, name):
+        return getattr(self.runnable, name)
+
+    def invoke(self, messages, config=None, **kwargs):
+        key = self.parent.cache_key(messages, kind="structured", extra=dict(self.extra, kwargs=kwargs))
+        cached = self.parent.cache.get(key)
+        if cached is not None:
+            return self.schema.model_validate(cached) if hasattr(self.schema, "model_validate") else cached
+        result = self.runnable.invoke(messages, config, **kwargs) if config is not None else self.runnable.invoke(messages, **kwargs)
+        self.parent.cache.put(
+            key, self.parent._model_name(),
+            result.model_dump() if hasattr(result, "model_dump") else result
+        )
+        return result
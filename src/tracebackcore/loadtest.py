@@ -0,0 +1,227 @@
+"""
+Traceback Load Generator
+
+Replays a question mix against a running API (``POST /incident/triage``) and
+reports throughput and latency percentiles, overall and per retriever.
+
+Two arrival models:
+
+    rate > 0    open loop: Poisson arrivals at ``rate`` requests/second, served by
+                up to ``concurrency`` in-flight requests. Latency is measured from
+                the scheduled send time, so client-side queueing when the API
+                falls behind shows up in the percentiles instead of being hidden.
+    rate = 0    closed loop: ``concurrency`` clients each send their next request
+                as soon as the previous one returns
+
+Pair it with ``benchmarks/fake_openai.py`` to size the API without real LLM calls.
+"""
+
+import json
+import math
+import time
+import random
+import threading
+import http.client
+import statistics
+from pathlib import Path
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Tuple
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def load_questions(path: Path) -> List[str]:
+    """Questions from a JSON list (strings or objects with ``question``) or a text file, one per line."""
+    with open(path, "r", encoding="utf-8") as f:
+        if path.suffix == ".json":
+            items = json.load(f)
+            return [item["question"] if isinstance(item, dict) else str(item) for item in items]
+        return [line.strip() for line in f if line.strip()]
+
+
+def parse_mix(mix: str) -> List[Tuple[str, float]]:
+    """``"Original RAG=3,Hybrid Search=1"`` -> ``[("Original RAG", 3.0), ("Hybrid Search", 1.0)]``."""
+    weighted = []
+    for part in mix.split(","):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition("=")
+        weighted.append((name.strip(), float(weight) if weight.strip() else 1.0))
+    if not weighted or sum(weight for _, weight in weighted) <= 0:
+        raise ValueError(f"Empty retriever mix: {mix!r}")
+    return weighted
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # Nearest-rank percentile
+    index = min(len(sorted_values) - 1, max(0, math.ceil(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def latency_summary(latencies: List[float]) -> Dict[str, Any]:
+    values = sorted(latencies)
+    summary = {f"p{p}": percentile(values, p) for p in PERCENTILES}
+    summary["mean"] = statistics.mean(values) if values else 0.0
+    summary["max"] = values[-1] if values else 0.0
+    return summary
+
+
+@dataclass
+class RequestResult:
+    retriever: str
+    status: int
+    latency: float
+    scheduled_at: float
+    processing_time: Optional[float] = None
+    queue_wait_time: Optional[float] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class LoadTestConfig:
+    url: str = "http://127.0.0.1:8000"
+    questions: List[str] = field(default_factory=list)
+    retrievers: List[Tuple[str, float]] = field(default_factory=lambda: [("Original RAG", 1.0)])
+    concurrency: int = 4
+    rate: float = 0.0
+    requests: Optional[int] = 100
+    duration: Optional[float] = None
+    priority: str = "medium"
+    timeout: float = 120.0
+    seed: Optional[int] = None
+
+
+class LoadGenerator:
+    """Drives POST /incident/triage per LoadTestConfig and collects per-request results."""
+
+    def __init__(self, config: LoadTestConfig):
+        if not config.questions:
+            raise ValueError("No questions to replay")
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.results: List[RequestResult] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        target = urlsplit(config.url)
+        self.host = target.hostname or "127.0.0.1"
+        self.port = target.port or (443 if target.scheme == "https" else 80)
+        self.https = target.scheme == "https"
+        self.path = target.path.rstrip("/") + "/incident/triage"
+        self.started_at = 0.0
+        self.elapsed = 0.0
+
+    def _connection(self) -> http.client.HTTPConnection:
+        # One keep-alive connection per client thread
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection_class = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            connection = connection_class(self.host, self.port, timeout=self.config.timeout)
+            self._local.connection = connection
+        return connection
+
+    def _next_request(self) -> Tuple[str, str]:
+        with self._lock:
+            question = self.random.choice(self.config.questions)
+            names, weights = zip(*self.config.retrievers)
+            retriever = self.random.choices(names, weights=weights)[0]
+        return question, retriever
+
+    def _send(self, question: str, retriever: str, scheduled_at: float) -> RequestResult:
+        body = json.dumps({"question": question, "retriever": retriever, "priority": self.config.priority})
+        try:
+            connection = self._connection()
+            connection.request("POST", self.path, body=body, headers={"Content-Type": "application/json"})
+            response = connection.getresponse()
+            payload = response.read()
+            latency = time.perf_counter() - scheduled_at
+            result = RequestResult(retriever, response.status, latency, scheduled_at)
+            if response.status == 200:
+                data = json.loads(payload)
+                result.processing_time = data.get("processing_time")
+                result.queue_wait_time = data.get("queue_wait_time")
+            else:
+                result.error = payload[:200].decode("utf-8", "replace")
+        except Exception as e:
+            self._local.connection = None
+            result = RequestResult(retriever, 0, time.perf_counter() - scheduled_at, scheduled_at, error=str(e))
+        with self._lock:
+            self.results.append(result)
+        return result
+
+    def _more(self, sent: int) -> bool:
+        if self.config.requests is not None and sent >= self.config.requests:
+            return False
+        if self.config.duration is not None and time.perf_counter() - self.started_at >= self.config.duration:
+            return False
+        return True
+
+    def _closed_loop_client(self, counter: List[int]):
+        while True:
+            with self._lock:
+                if not self._more(counter[0]):
+                    return
+                counter[0] += 1
+            question, retriever = self._next_request()
+            self._send(question, retriever, time.perf_counter())
+
+    def run(self) -> Dict[str, Any]:
+        config = self.config
+        self.started_at = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=config.concurrency, thread_name_prefix="loadtest") as pool:
+            if config.rate > 0:
+                sent = 0
+                next_at = self.started_at
+                while self._more(sent):
+                    delay = next_at - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                    question, retriever = self._next_request()
+                    pool.submit(self._send, question, retriever, next_at)
+                    sent += 1
+                    next_at += self.random.expovariate(config.rate)
+            else:
+                counter = [0]
+                for _ in range(config.concurrency):
+                    pool.submit(self._closed_loop_client, counter)
+        self.elapsed = time.perf_counter() - self.started_at
+        return self.report()
+
+    def report(self) -> Dict[str, Any]:
+        ok = [result for result in self.results if result.status == 200]
+        statuses: Dict[str, int] = {}
+        for result in self.results:
+            key = str(result.status) if result.status else "connection_error"
+            statuses[key] = statuses.get(key, 0) + 1
+
+        by_retriever = {}
+        for name, _ in self.config.retrievers:
+            rows = [result for result in self.results if result.retriever == name]
+            if rows:
+                by_retriever[name] = {
+                    "requests": len(rows),
+                    "errors": len([row for row in rows if row.status != 200]),
+                    "latency": latency_summary([row.latency for row in rows if row.status == 200]),
+                }
+
+        server_times = [result.processing_time for result in ok if result.processing_time is not None]
+        queue_waits = [result.queue_wait_time for result in ok if result.queue_wait_time is not None]
+        return {
+            "url": self.config.url,
+            "mode": f"open loop at {self.config.rate}/s" if self.config.rate > 0 else "closed loop",
+            "concurrency": self.config.concurrency,
+            "requests": len(self.results),
+            "succeeded": len(ok),
+            "error_rate": (len(self.results) - len(ok)) / len(self.results) if self.results else 0.0,
+            "statuses": statuses,
+            "elapsed_seconds": self.elapsed,
+            "throughput_rps": len(ok) / self.elapsed if self.elapsed else 0.0,
+            "latency": latency_summary([result.latency for result in ok]),
+            "server_processing_mean": statistics.mean(server_times) if server_times else None,
+            "server_queue_wait_mean": statistics.mean(queue_waits) if queue_waits else None,
+            "by_retriever": by_retriever,
+            "sample_errors": [result.error for result in self.results if result.error][:5],
+        }
@@ -0,0 +1,267 @@
+"""
+Traceback On-Demand Profiling
+
+Profiles a single CLI command or API request and writes three files per run
+to ``TRACEBACK_PROFILE_DIR`` (default ``data/profiles``):
+
+    <name>.folded      sampled stacks in collapsed format (flamegraph.pl, speedscope, inferno)
+    <name>.prof        cProfile statistics (pstats, snakeviz, gprof2dot)
+    <name>.alloc.txt   tracemalloc: top allocation sites during the run
+
+A profile covers the threads that ``attach()`` to it: the thread that opened
+the session, plus worker threads entered through ``profiled()`` (the API uses
+it for triage work handed to the threadpool). CLI sessions sample every
+thread instead.
+
+API profiling is admin-gated. It is only available when
+``TRACEBACK_PROFILE_TOKEN`` is set, and a request opts in by sending that token
+in the ``X-Traceback-Profile`` header or the ``profile`` query parameter.
+Without the token the middleware is not installed. Code paths outside a
+session then only pay one context-variable lookup.
+"""
+
+import os
+import sys
+import hmac
+import time
+import uuid
+import pstats
+import cProfile
+import threading
+import functools
+import tracemalloc
+from pathlib import Path
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from urllib.parse import parse_qs
+from typing import Dict, Any, List, Optional
+
+PROFILE_TOKEN = os.getenv("TRACEBACK_PROFILE_TOKEN") or None
+PROFILE_HEADER = b"x-traceback-profile"
+SAMPLE_INTERVAL = float(os.getenv("TRACEBACK_PROFILE_INTERVAL_MS", "5")) / 1000
+# Frames kept per tracemalloc traceback and allocation sites written to .alloc.txt
+TRACEMALLOC_FRAMES = 16
+TOP_ALLOCATIONS = 40
+
+_active: ContextVar[Optional["ProfileSession"]] = ContextVar("traceback_profile", default=None)
+
+# cProfile allows one profiler per thread, so API requests are profiled one at a time
+_request_slot = threading.Lock()
+
+
+def profile_dir() -> Path:
+    project_root = Path(__file__).parent.parent.parent
+    return Path(os.getenv("TRACEBACK_PROFILE_DIR", project_root / "data" / "profiles"))
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})".replace(";", ":")
+
+
+class ProfileSession:
+    """cProfile per attached thread, a stack sampler and a tracemalloc diff for one run."""
+
+    def __init__(self, name: str, all_threads: bool = False, interval: float = SAMPLE_INTERVAL):
+        self.name = name
+        self.all_threads = all_threads
+        self.interval = interval
+        self.profiles: List[cProfile.Profile] = []
+        self.threads: Dict[int, str] = {}
+        self.samples: Counter = Counter()
+        self.paths: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler = None
+        self._started_tracemalloc = False
+        self._baseline = None
+        self.started_at = 0.0
+        self.elapsed = 0.0
+
+    def start(self) -> "ProfileSession":
+        self.started_at = time.perf_counter()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            self._started_tracemalloc = True
+        self._baseline = tracemalloc.take_snapshot()
+        self._sampler = threading.Thread(target=self._sample, name="traceback-profiler", daemon=True)
+        self._sampler.start()
+        return self
+
+    @contextmanager
+    def attach(self):
+        """Profile the current thread until the block exits."""
+        ident = threading.get_ident()
+        if ident in self.threads:
+            yield self
+            return
+        profile = cProfile.Profile()
+        with self._lock:
+            self.profiles.append(profile)
+            self.threads[ident] = threading.current_thread().name
+        profile.enable()
+        try:
+            yield self
+        finally:
+            profile.disable()
+            with self._lock:
+                self.threads.pop(ident, None)
+
+    def _sample(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                threads = None if self.all_threads else dict(self.threads)
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own or (threads is not None and ident not in threads):
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.samples[";".join(reversed(stack))] += 1
+
+    def stop(self) -> Dict[str, str]:
+        """Stop sampling and write the .folded, .prof and .alloc.txt files; returns their paths."""
+        self._stop.set()
+        if self._sampler:
+            self._sampler.join()
+        self.elapsed = time.perf_counter() - self.started_at
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+
+        output_dir = profile_dir()
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        folded = output_dir / f"{self.name}.folded"
+        with open(folded, "w", encoding="utf-8") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+        self.paths["folded"] = str(folded)
+
+        profiles = [profile for profile in self.profiles if profile.getstats()]
+        if profiles:
+            stats = pstats.Stats(profiles[0])
+            for profile in profiles[1:]:
+                stats.add(profile)
+            prof = output_dir / f"{self.name}.prof"
+            stats.dump_stats(prof)
+            self.paths["prof"] = str(prof)
+
+        alloc = output_dir / f"{self.name}.alloc.txt"
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+        diff = snapshot.filter_traces(ignore).compare_to(self._baseline.filter_traces(ignore), "lineno")
+        with open(alloc, "w", encoding="utf-8") as f:
+            f.write(f"# {self.name}: {self.elapsed:.3f}s, {sum(self.samples.values())} samples\n")
+            f.write(f"# traced memory at end {current / 1e6:.1f} MB, peak {peak / 1e6:.1f} MB\n")
+            f.write(f"# top {TOP_ALLOCATIONS} allocation sites by growth during the run\n")
+            for stat in diff[:TOP_ALLOCATIONS]:
+                f.write(f"{stat}\n")
+        self.paths["alloc"] = str(alloc)
+
+        print(f"🔬 Profiled {self.name} in {self.elapsed:.2f}s -> {output_dir / self.name}.{{folded,prof,alloc.txt}}")
+        return self.paths
+
+
+def new_session_name(label: str) -> str:
+    safe = "".join(c if c.isalnum() or c in "-_" else "-" for c in label).strip("-") or "profile"
+    return f"{safe}-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+@contextmanager
+def profile_session(label: str, all_threads: bool = False):
+    """Profile the enclosed block (and threads entered through ``profiled``)."""
+    session = ProfileSession(new_session_name(label), all_threads=all_threads).start()
+    token = _active.set(session)
+    try:
+        with session.attach():
+            yield session
+    finally:
+        _active.reset(token)
+        session.stop()
+
+
+def current_session() -> Optional[ProfileSession]:
+    return _active.get()
+
+
+@contextmanager
+def attach():
+    """Join the active profile session from a worker thread; a no-op without one."""
+    session = _active.get()
+    if session is None:
+        yield None
+        return
+    with session.attach():
+        yield session
+
+
+def profiled(func):
+    """Wrap ``func`` so a call made inside a profile session, on any thread, is profiled."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _active.get() is None:
+            return func(*args, **kwargs)
+        with attach():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def is_authorized(value: Optional[str]) -> bool:
+    return bool(PROFILE_TOKEN and value and hmac.compare_digest(value, PROFILE_TOKEN))
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling requests that present TRACEBACK_PROFILE_TOKEN.
+
+    The response carries ``X-Traceback-Profile-Id``, the basename of the files written.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get("headers") or [])
+        value = headers.get(PROFILE_HEADER, b"").decode("latin-1")
+        if not value and b"profile=" in scope.get("query_string", b""):
+            value = parse_qs(scope["query_string"].decode("latin-1")).get("profile", [""])[0]
+        if not is_authorized(value):
+            await self.app(scope, receive, send)
+            return
+        if not _request_slot.acquire(blocking=False):
+            print(f"⚠️ Profile already running; serving {scope['method']} {scope['path']} unprofiled")
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self._profile(scope, receive, send)
+        finally:
+            _request_slot.release()
+
+    async def _profile(self, scope, receive, send):
+        with profile_session(f"{scope['method']}{scope['path']}") as session:
+            async def tagged_send(message):
+                if message["type"] == "http.response.start":
+                    message = {
+                        **message,
+                        "headers": list(message.get("headers", [])) + [(b"x-traceback-profile-id", session.name.encode("latin-1"))]
+                    }
+                await send(message)
+
+            await self.app(scope, receive, tagged_send)
+
+
+def get_profile_stats() -> Dict[str, Any]:
+    return {
+        "enabled": PROFILE_TOKEN is not None,
+        "directory": str(profile_dir()),
+        "sample_interval_ms": SAMPLE_INTERVAL * 1000,
+    }
@@ -0,0 +1,225 @@
+"""
+Traceback Admission Scheduler
+
+Priority-aware admission control in front of the triage pipeline.
+"""
+
+import os
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Any, Optional
+
+from tracebackcore import deadlines
+
+# Priorities in rank order (lower rank is served first)
+PRIORITIES = ("critical", "high", "medium", "low")
+PRIORITY_RANK = {name: rank for rank, name in enumerate(PRIORITIES)}
+
+# Common aliases used by on-call tooling
+PRIORITY_ALIASES = {
+    "p0": "critical",
+    "p1": "critical",
+    "p2": "high",
+    "p3": "medium",
+    "p4": "low",
+    "urgent": "critical",
+    "normal": "medium",
+}
+
+# Priorities allowed to use the reserved capacity
+RESERVED_PRIORITIES = ("critical", "high")
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed instead of being queued."""
+
+    def __init__(self, priority: str, reason: str):
+        super().__init__(f"{priority} request rejected: {reason}")
+        self.priority = priority
+        self.reason = reason
+
+
+@dataclass
+class AdmissionTicket:
+    """Admission decision for a single request."""
+    priority: str
+    queue_wait_time: float = 0.0
+    degraded: bool = False
+
+
+def normalize_priority(priority: Optional[str]) -> str:
+    """Map a user supplied priority onto one of PRIORITIES (default: medium)."""
+    if not priority:
+        return "medium"
+    value = str(priority).strip().lower()
+    value = PRIORITY_ALIASES.get(value, value)
+    return value if value in PRIORITY_RANK else "medium"
+
+
+class AdmissionScheduler:
+    """Bounded priority queues with reserved capacity for critical/high work.
+
+    - At most ``max_concurrent`` triages run at once; ``reserved_slots`` of them
+      are only available to critical/high requests.
+    - Waiting requests are served strictly by priority, then arrival order.
+    - Each priority has a bounded queue; when it is full the request is shed.
+    - Medium/low requests admitted while the system is loaded are marked as
+      degraded so the pipeline can skip the writer LLM call.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 4,
+        reserved_slots: int = 1,
+        queue_limits: Optional[Dict[str, int]] = None,
+        degrade_threshold: Optional[int] = None,
+        max_wait: Optional[float] = 30.0,
+    ):
+        self.max_concurrent = max(1, max_concurrent)
+        self.reserved_slots = min(max(0, reserved_slots), self.max_concurrent - 1)
+        self.queue_limits = {"critical": 64, "high": 32, "medium": 16, "low": 8}
+        if queue_limits:
+            self.queue_limits.update(queue_limits)
+        # Load (running + queued) at which medium/low work is degraded
+        self.degrade_threshold = degrade_threshold if degrade_threshold is not None else self.max_concurrent
+        self.max_wait = max_wait
+
+        self._cond = threading.Condition()
+        self._active = 0
+        self._waiting = []  # heap of (rank, seq)
+        self._queued = {name: 0 for name in PRIORITIES}
+        self._seq = itertools.count()
+        self._stats = {
+            name: {"admitted": 0, "shed": 0, "degraded": 0, "total_wait": 0.0, "max_wait": 0.0}
+            for name in PRIORITIES
+        }
+
+    @classmethod
+    def from_env(cls) -> "AdmissionScheduler":
+        """Build a scheduler from TRACEBACK_* environment variables."""
+        max_wait = os.getenv("TRACEBACK_MAX_QUEUE_WAIT", "30")
+        queue_limits = {}
+        for name in PRIORITIES:
+            value = os.getenv(f"TRACEBACK_QUEUE_LIMIT_{name.upper()}")
+            if value:
+                queue_limits[name] = int(value)
+        degrade_threshold = os.getenv("TRACEBACK_DEGRADE_THRESHOLD")
+        return cls(
+            max_concurrent=int(os.getenv("TRACEBACK_MAX_CONCURRENT_TRIAGES", "4")),
+            reserved_slots=int(os.getenv("TRACEBACK_RESERVED_SLOTS", "1")),
+            queue_limits=queue_limits,
+            degrade_threshold=int(degrade_threshold) if degrade_threshold else None,
+            max_wait=float(max_wait) if max_wait else None,
+        )
+
+    def _limit(self, priority: str) -> int:
+        """Number of concurrent slots a priority may occupy."""
+        if priority in RESERVED_PRIORITIES:
+            return self.max_concurrent
+        return self.max_concurrent - self.reserved_slots
+
+    def _load(self) -> int:
+        return self._active + len(self._waiting)
+
+    def _should_degrade(self, priority: str) -> bool:
+        if priority in RESERVED_PRIORITIES:
+            return False
+        return self._load() >= self.degrade_threshold
+
+    def acquire(self, priority: Optional[str]) -> AdmissionTicket:
+        """Block until the request may run; raise AdmissionRejected if shed."""
+        priority = normalize_priority(priority)
+        start = time.perf_counter()
+
+        with self._cond:
+            stats = self._stats[priority]
+            # Decide degradation on arrival, before our own entry adds to the load
+            degraded = self._should_degrade(priority)
+
+            if self._queued[priority] >= self.queue_limits.get(priority, 0) and self._active >= self._limit(priority):
+                stats["shed"] += 1
+                raise AdmissionRejected(priority, "queue full")
+
+            entry = (PRIORITY_RANK[priority], next(self._seq))
+            heapq.heappush(self._waiting, entry)
+            self._queued[priority] += 1
+            deadline = start + self.max_wait if self.max_wait else None
+            timeout_reason = f"waited more than {self.max_wait:.1f}s" if self.max_wait else None
+            # Never wait past the request's own deadline
+            request_left = deadlines.remaining()
+            if request_left is not None and (deadline is None or start + request_left < deadline):
+                deadline = start + request_left
+                timeout_reason = "request deadline reached while queued"
+
+            try:
+                # Highest priority waiter is always the heap head; lower priorities
+                # have smaller limits, so if the head cannot run neither can they.
+                while not (self._waiting[0] == entry and self._active < self._limit(priority)):
+                    remaining = None if deadline is None else deadline - time.perf_counter()
+                    if remaining is not None and remaining <= 0:
+                        stats["shed"] += 1
+                        raise AdmissionRejected(priority, timeout_reason)
+                    self._cond.wait(remaining)
+            except BaseException:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                self._queued[priority] -= 1
+                self._cond.notify_all()
+                raise
+
+            heapq.heappop(self._waiting)
+            self._queued[priority] -= 1
+            self._active += 1
+
+            wait = time.perf_counter() - start
+            stats["admitted"] += 1
+            stats["total_wait"] += wait
+            stats["max_wait"] = max(stats["max_wait"], wait)
+            if degraded:
+                stats["degraded"] += 1
+            # Let the next waiter re-check now that the head has moved
+            self._cond.notify_all()
+
+        return AdmissionTicket(priority=priority, queue_wait_time=wait, degraded=degraded)
+
+    def release(self, ticket: AdmissionTicket):
+        """Return a slot to the pool."""
+        with self._cond:
+            self._active -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def admit(self, priority: Optional[str]):
+        """Context manager wrapping acquire/release."""
+        ticket = self.acquire(priority)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Snapshot of current load and per-priority counters."""
+        with self._cond:
+            per_priority = {}
+            for name, stats in self._stats.items():
+                admitted = stats["admitted"]
+                per_priority[name] = {
+                    "admitted": admitted,
+                    "shed": stats["shed"],
+                    "degraded": stats["degraded"],
+                    "queued": self._queued[name],
+                    "avg_wait": stats["total_wait"] / admitted if admitted else 0.0,
+                    "max_wait": stats["max_wait"],
+                }
+            return {
+                "active": self._active,
+                "queued": len(self._waiting),
+                "max_concurrent": self.max_concurrent,
+                "reserved_slots": self.reserved_slots,
+                "degrade_threshold": self.degrade_threshold,
+                "priorities": per_priority,
+            }
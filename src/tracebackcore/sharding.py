@@ -0,0 +1,179 @@
+"""
+Traceback Domain Sharding
+
+Documents are split into one Qdrant collection per domain (the pipeline a spec
+or SQL file belongs to, e.g. ``hr_analytics``; documents without a pipeline go
+to ``general``). ``DomainRouter`` picks the shards for a query from the lineage
+tables it mentions and from domain keywords, and ``ShardedVectorStore`` embeds
+the query once, searches the selected shards in parallel and merges by score.
+Queries the router cannot place search every shard, and queries whose routed
+shards return fewer than ``k`` hits are topped up from the remaining shards.
+"""
+
+import re
+import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Callable, Iterable, Tuple
+
+from langchain.schema import Document
+from qdrant_client.models import Distance, VectorParams, PayloadSchemaType
+
+GENERAL_DOMAIN = "general"
+
+# Words that say nothing about which domain a query belongs to
+STOPWORDS = {"pipeline", "pipelines", "data", "table", "tables", "job", "failed", "spec", "the", "and", "for"}
+
+
+def document_domain(metadata: Dict[str, Any]) -> str:
+    """Domain of a document: its pipeline without the ``_pipeline`` suffix, else ``general``."""
+    pipeline = metadata.get("pipeline")
+    if not pipeline:
+        return GENERAL_DOMAIN
+    return pipeline[:-len("_pipeline")] if pipeline.endswith("_pipeline") else pipeline
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in re.findall(r"[a-z0-9]+", text.lower()) if token not in STOPWORDS and len(token) > 1]
+
+
+class DomainRouter:
+    """Maps a query to domain shards via linked lineage tables and IDF-weighted keywords."""
+
+    def __init__(self, lineage_data: Dict[str, Any], find_tables: Optional[Callable[[str], List[str]]] = None,
+                 keyword_ratio: float = 0.5):
+        self.find_tables = find_tables
+        self.keyword_ratio = keyword_ratio
+        # Tables produced or read by each domain's pipeline
+        self.domains_by_table: Dict[str, set] = {}
+        self.keywords: Dict[str, set] = {}
+        for pipeline in lineage_data.get("pipelines", []):
+            domain = document_domain({"pipeline": pipeline.get("id")})
+            for table in list(pipeline.get("outputs", [])) + list(pipeline.get("dependencies", [])):
+                self.domains_by_table.setdefault(table, set()).add(domain)
+            self.keywords.setdefault(domain, set()).update(tokenize(f"{domain.replace('_', ' ')} {pipeline.get('name', '')}"))
+        for edge in lineage_data.get("edges", []):
+            if edge.get("pipeline"):
+                domain = document_domain({"pipeline": edge["pipeline"].rsplit(".", 1)[0]})
+                for table in (edge.get("from"), edge.get("to")):
+                    self.domains_by_table.setdefault(table, set()).add(domain)
+
+    def add_domain(self, domain: str):
+        """Register keywords for a shard that has no lineage pipeline (e.g. spec-only domains)."""
+        self.keywords.setdefault(domain, set()).update(tokenize(domain.replace("_", " ")))
+
+    def route(self, query: str, available: Iterable[str]) -> List[str]:
+        """Shards to search for ``query``; empty when the query can't be placed."""
+        available = set(available)
+        selected = set()
+        if self.find_tables:
+            for table in self.find_tables(query):
+                selected.update(self.domains_by_table.get(table, ()))
+
+        # Keyword match, weighted so words shared by many domains count little
+        query_tokens = set(tokenize(query))
+        document_frequency: Dict[str, int] = {}
+        for domain in available:
+            for token in self.keywords.get(domain, ()):
+                document_frequency[token] = document_frequency.get(token, 0) + 1
+        scores = {}
+        for domain in available:
+            matched = query_tokens & self.keywords.get(domain, set())
+            if matched:
+                scores[domain] = sum(math.log(1 + len(available) / document_frequency[token]) for token in matched)
+        if scores:
+            best = max(scores.values())
+            selected.update(domain for domain, score in scores.items() if score >= best * self.keyword_ratio)
+
+        selected &= available
+        if selected and GENERAL_DOMAIN in available:
+            # Playbooks and standards apply to every incident
+            selected.add(GENERAL_DOMAIN)
+        return sorted(selected)
+
+
+class ShardedVectorStore:
+    """Per-domain Qdrant collections behind the LangChain vector store calls Traceback uses."""
+
+    def __init__(self, client, embeddings, collection_prefix: str = "traceback_documents",
+                 dimensions: int = 1536, quantization_config=None, index_fields: Iterable[str] = (), router: Optional[DomainRouter] = None,
+                 max_workers: int = 8):
+        from langchain_qdrant import Qdrant
+        self._qdrant_class = Qdrant
+        self.client = client
+        self.embeddings = embeddings
+        self.collection_prefix = collection_prefix
+        self.collection_name = collection_prefix
+        self.dimensions = dimensions
+        self.quantization_config = quantization_config
+        self.index_fields = list(index_fields)
+        self.router = router
+        self.shards: Dict[str, Any] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="shard-search")
+        self.stats = {"routed": 0, "fallback": 0, "topped_up": 0, "shards_searched": 0}
+
+    def _shard(self, domain: str):
+        shard = self.shards.get(domain)
+        if shard is None:
+            collection_name = f"{self.collection_prefix}__{domain}"
+            self.client.create_collection(
+                collection_name=collection_name,
+                vectors_config=VectorParams(size=self.dimensions, distance=Distance.COSINE),
+                quantization_config=self.quantization_config
+            )
+            for field in self.index_fields:
+                self.client.create_payload_index(
+                    collection_name=collection_name,
+                    field_name=f"metadata.{field}",
+                    field_schema=PayloadSchemaType.KEYWORD
+                )
+            shard = self._qdrant_class(client=self.client, collection_name=collection_name, embeddings=self.embeddings)
+            self.shards[domain] = shard
+            if self.router:
+                self.router.add_domain(domain)
+        return shard
+
+    def add_documents(self, documents: List[Document]) -> List[str]:
+        by_domain: Dict[str, List[Document]] = {}
+        for doc in documents:
+            by_domain.setdefault(document_domain(doc.metadata), []).append(doc)
+        ids = []
+        for domain, docs in by_domain.items():
+            ids.extend(self._shard(domain).add_documents(docs))
+        return ids
+
+    def count(self) -> int:
+        return sum(self.client.count(shard.collection_name).count for shard in self.shards.values())
+
+    def _search_shards(self, domains: List[str], query_vector, k: int, filter) -> List[Tuple[Document, float]]:
+        self.stats["shards_searched"] += len(domains)
+        futures = [
+            self._executor.submit(self.shards[domain].similarity_search_with_score_by_vector, query_vector, k=k, filter=filter)
+            for domain in domains
+        ]
+        results = [pair for future in futures for pair in future.result()]
+        results.sort(key=lambda pair: -pair[1])
+        return results[:k]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, filter=None, **kwargs) -> List[Tuple[Document, float]]:
+        if not self.shards:
+            return []
+        query_vector = self.embeddings.embed_query(query)
+        domains = self.router.route(query, self.shards) if self.router else []
+        if not domains:
+            self.stats["fallback"] += 1
+            return self._search_shards(sorted(self.shards), query_vector, k, filter)
+
+        self.stats["routed"] += 1
+        results = self._search_shards(domains, query_vector, k, filter)
+        remaining = sorted(set(self.shards) - set(domains))
+        if len(results) < k and remaining:
+            # Routed shards could not fill k: top up from the others, merged by score
+            self.stats["topped_up"] += 1
+            results = sorted(
+                results + self._search_shards(remaining, query_vector, k, filter),
+                key=lambda pair: -pair[1]
+            )[:k]
+        return results
+
+    def similarity_search(self, query: str, k: int = 4, filter=None, **kwargs) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k=k, filter=filter)]
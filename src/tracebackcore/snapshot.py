@@ -0,0 +1,302 @@
+"""
+Traceback System Snapshot
+
+On-disk format for an initialized system that one builder process writes and
+every API worker memory-maps read-only at startup:
+
+    manifest.json        format version, embedding model, counts, source fingerprint
+    vectors.npy          float32 [N, D] L2-normalized document vectors (mmap)
+    texts.bin            UTF-8 page contents, concatenated (mmap)
+    text_offsets.npy     int64 [N + 1] byte offsets into texts.bin (mmap)
+    metadata.json        per-document metadata payloads
+    lineage_index.pkl    lineage data plus compiled adjacency and entity-linker indexes
+    vectors_int8.npy     optional int8 [N, D] scalar-quantized vectors (mmap)
+    int8_scales.npy      optional float32 [D] per-dimension dequantization scales
+
+Workers share the physical pages of the mmapped files (vectors, texts and
+offsets), so N workers hold one copy of them instead of re-embedding the corpus
+N times. ``metadata.json`` and ``lineage_index.pkl`` are small next to the
+vectors and are loaded into every worker's own memory.
+
+With int8 quantization, search scans the 4x smaller int8 matrix for a coarse
+top ``k * oversampling`` and re-scores only those rows against the float32
+vectors, so the full-precision matrix is paged in a few rows at a time.
+
+Quantization is off by default because it trades latency for resident memory.
+NumPy has no int8 BLAS kernel, so the int8 scan is slower than the float32 one
+whenever the float32 matrix is already in RAM. A blocked upcast to float32 and
+an int32-accumulated product are slower still. Measured with
+``benchmarks/quantization.py --fake --pad 20000`` (20k documents, one core):
+
+    1536 dims   float32 10.1 ms   int8 13.9 ms   scanned 123 MB -> 31 MB
+     512 dims   float32  2.0 ms   int8  4.1 ms   scanned  41 MB -> 10 MB
+
+The float32 matrix is still written (the snapshot is 1.25x larger on disk).
+Enable int8 only when the float32 vectors do not fit in the page cache of
+every worker.
+
+The manifest records a fingerprint of the lineage file and source documents the
+snapshot was built from (``source_fingerprint``), so a stale snapshot can be
+detected without loading the system.
+"""
+
+import json
+import pickle
+import hashlib
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+from langchain.schema import Document
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+QUANTIZATION_MODES = ("none", "int8")
+
+# Source files an initialized system is built from, relative to the data directory
+SOURCE_PATTERNS = ("lineage.json", "docs/*.md", "repo/*.sql")
+
+
+def source_fingerprint(data_dir=None) -> str:
+    """Short content hash of the lineage file and source documents under ``data_dir``."""
+    data_dir = Path(data_dir) if data_dir else Path(__file__).parent.parent.parent / "data"
+    digest = hashlib.sha1()
+    for path in sorted(path for pattern in SOURCE_PATTERNS for path in data_dir.glob(pattern)):
+        digest.update(path.relative_to(data_dir).as_posix().encode("utf-8") + b"\0")
+        digest.update(path.read_bytes() + b"\0")
+    return digest.hexdigest()[:12]
+
+
+def read_manifest(path) -> Dict[str, Any]:
+    with open(Path(path) / "manifest.json", "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def quantize_int8(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-dimension scalar quantization; returns (int8 codes, float32 scales)."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    scales = np.abs(vectors).max(axis=0) / 127.0 if len(vectors) else np.ones(vectors.shape[1], dtype=np.float32)
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scales), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def write_snapshot(
+    output_dir,
+    documents: List[Document],
+    vectors,
+    lineage_index: Dict[str, Any],
+    embedding_model: str,
+    quantization: str = "none",
+    fingerprint: Optional[str] = None
+) -> Path:
+    """Write a snapshot directory; files are written to a temp dir and renamed into place."""
+    if quantization not in QUANTIZATION_MODES:
+        raise ValueError(f"Unknown quantization {quantization!r} (expected one of {', '.join(QUANTIZATION_MODES)})")
+    output_dir = Path(output_dir)
+    output_dir.parent.mkdir(parents=True, exist_ok=True)
+    # Same parent directory, so the final renames stay on one filesystem
+    tmp_dir = Path(tempfile.mkdtemp(prefix=output_dir.name + ".tmp-", dir=output_dir.parent))
+    try:
+        _write_snapshot_files(tmp_dir, documents, vectors, lineage_index, embedding_model, quantization, fingerprint)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    # A directory cannot be renamed over a non-empty one: move the old snapshot
+    # aside, rename the new one into place, then delete the old one
+    old_dir = None
+    if output_dir.exists():
+        old_dir = Path(tempfile.mkdtemp(prefix=output_dir.name + ".old-", dir=output_dir.parent))
+        output_dir.rename(old_dir / output_dir.name)
+    tmp_dir.rename(output_dir)
+    if old_dir is not None:
+        shutil.rmtree(old_dir, ignore_errors=True)
+    return output_dir
+
+
+def _write_snapshot_files(tmp_dir: Path, documents: List[Document], vectors, lineage_index: Dict[str, Any],
+                          embedding_model: str, quantization: str, fingerprint: Optional[str]):
+
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    vectors = vectors / norms
+    np.save(tmp_dir / "vectors.npy", vectors)
+    if quantization == "int8" and len(vectors):
+        codes, scales = quantize_int8(vectors)
+        np.save(tmp_dir / "vectors_int8.npy", codes)
+        np.save(tmp_dir / "int8_scales.npy", scales)
+
+    encoded = [doc.page_content.encode("utf-8") for doc in documents]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(blob) for blob in encoded])
+    with open(tmp_dir / "texts.bin", "wb") as f:
+        for blob in encoded:
+            f.write(blob)
+    np.save(tmp_dir / "text_offsets.npy", offsets)
+
+    with open(tmp_dir / "metadata.json", "w", encoding="utf-8") as f:
+        json.dump([doc.metadata for doc in documents], f)
+
+    with open(tmp_dir / "lineage_index.pkl", "wb") as f:
+        pickle.dump(lineage_index, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    manifest = {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "created_at": time.time(),
+        "embedding_model": embedding_model,
+        "documents": len(documents),
+        "dimensions": int(vectors.shape[1]) if len(vectors) else 0,
+        "quantization": quantization if len(vectors) else "none",
+        "source_fingerprint": fingerprint,
+    }
+    with open(tmp_dir / "manifest.json", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+
+class Snapshot:
+    """Read-only view over a snapshot directory (vectors and texts are memory-mapped)."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.manifest = read_manifest(self.path)
+        if self.manifest.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported snapshot format {self.manifest.get('format_version')} "
+                f"(expected {SNAPSHOT_FORMAT_VERSION})"
+            )
+
+        self.vectors = np.load(self.path / "vectors.npy", mmap_mode="r")
+        self.quantization = self.manifest.get("quantization", "none")
+        self.codes = self.scales = None
+        if self.quantization == "int8":
+            self.codes = np.load(self.path / "vectors_int8.npy", mmap_mode="r")
+            self.scales = np.load(self.path / "int8_scales.npy")
+        self.text_offsets = np.load(self.path / "text_offsets.npy", mmap_mode="r")
+        self.texts = np.memmap(self.path / "texts.bin", dtype=np.uint8, mode="r") if self.text_offsets[-1] else None
+        with open(self.path / "metadata.json", "r", encoding="utf-8") as f:
+            self.metadata: List[Dict[str, Any]] = json.load(f)
+        with open(self.path / "lineage_index.pkl", "rb") as f:
+            self.lineage_index: Dict[str, Any] = pickle.load(f)
+
+    def __len__(self) -> int:
+        return len(self.metadata)
+
+    def text(self, index: int) -> str:
+        start, end = int(self.text_offsets[index]), int(self.text_offsets[index + 1])
+        return bytes(self.texts[start:end]).decode("utf-8") if end > start else ""
+
+    def document(self, index: int) -> Document:
+        return Document(page_content=self.text(index), metadata=dict(self.metadata[index]))
+
+
+def is_snapshot(path) -> bool:
+    """True if ``path`` looks like a snapshot directory."""
+    return bool(path) and (Path(path) / "manifest.json").exists()
+
+
+class SnapshotVectorStore:
+    """Brute-force cosine search over snapshot vectors.
+
+    Implements the subset of the LangChain vector store interface used by
+    Traceback (``similarity_search`` / ``similarity_search_with_score``) and
+    accepts the Qdrant filters produced by ``build_search_filter``.
+    """
+
+    def __init__(self, snapshot: Snapshot, embeddings, oversampling: float = 4.0):
+        self.snapshot = snapshot
+        self.embeddings = embeddings
+        # Coarse int8 candidates re-scored at full precision per requested result
+        self.oversampling = oversampling
+        self.collection_name = snapshot.path.name
+        # Inverted index: metadata field -> value -> sorted document indices
+        self._metadata_index: Dict[str, Dict[Any, np.ndarray]] = {}
+        postings: Dict[str, Dict[Any, List[int]]] = {}
+        for index, metadata in enumerate(snapshot.metadata):
+            for field, value in metadata.items():
+                values = value if isinstance(value, list) else [value]
+                for item in values:
+                    if isinstance(item, (str, int, bool)):
+                        postings.setdefault(field, {}).setdefault(item, []).append(index)
+        for field, values in postings.items():
+            self._metadata_index[field] = {value: np.asarray(ids, dtype=np.int64) for value, ids in values.items()}
+
+    def count(self) -> int:
+        return len(self.snapshot)
+
+    def _candidate_mask(self, filter) -> Optional[np.ndarray]:
+        """Evaluate ``must`` conditions of a Qdrant filter against the metadata index."""
+        if filter is None or not getattr(filter, "must", None):
+            return None
+        mask = np.ones(len(self.snapshot), dtype=bool)
+        for condition in filter.must:
+            field = condition.key.split(".", 1)[1] if condition.key.startswith("metadata.") else condition.key
+            match = condition.match
+            values = getattr(match, "any", None)
+            if values is None:
+                values = [match.value]
+            field_index = self._metadata_index.get(field, {})
+            condition_mask = np.zeros(len(self.snapshot), dtype=bool)
+            for value in values:
+                ids = field_index.get(value)
+                if ids is not None:
+                    condition_mask[ids] = True
+            mask &= condition_mask
+        return mask
+
+    def search_by_vector(self, query_vector, k: int = 4, filter=None) -> List[Tuple[int, float]]:
+        """Return (document index, cosine score) pairs for the top ``k`` documents."""
+        if not len(self.snapshot):
+            return []
+        query = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+
+        mask = self._candidate_mask(filter)
+        candidates = None
+        if mask is not None:
+            candidates = np.flatnonzero(mask)
+            if not len(candidates):
+                return []
+
+        if self.snapshot.codes is not None:
+            candidates = self._coarse_candidates(query, candidates, max(k, int(k * self.oversampling)))
+        if candidates is None:
+            scores = self.snapshot.vectors @ query
+        else:
+            # Full-precision scores for the filtered or coarse candidates only
+            scores = self.snapshot.vectors[candidates] @ query
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        indices = top if candidates is None else candidates[top]
+        return [(int(index), float(score)) for index, score in zip(indices, scores[top])]
+
+    def _coarse_candidates(self, query: np.ndarray, candidates: Optional[np.ndarray], limit: int) -> np.ndarray:
+        """Sorted indices of the ``limit`` best documents by approximate int8 score."""
+        codes = self.snapshot.codes
+        scaled_query = query * self.snapshot.scales
+        total = len(codes) if candidates is None else len(candidates)
+        if total <= limit:
+            return np.arange(total) if candidates is None else candidates
+        # einsum upcasts int8 in small buffers instead of materializing a float32 copy
+        # (faster here than a blocked upcast followed by a BLAS matmul)
+        scores = np.einsum("ij,j->i", codes if candidates is None else codes[candidates], scaled_query, dtype=np.float32)
+        top = np.sort(np.argpartition(-scores, limit - 1)[:limit])
+        return top if candidates is None else candidates[top]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, filter=None, **kwargs) -> List[Tuple[Document, float]]:
+        query_vector = self.embeddings.embed_query(query)
+        return [
+            (self.snapshot.document(index), score)
+            for index, score in self.search_by_vector(query_vector, k=k, filter=filter)
+        ]
+
+    def similarity_search(self, query: str, k: int = 4, filter=None, **kwargs) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k=k, filter=filter)]
@@ -0,0 +1,267 @@
+"""
+Traceback Lineage Subgraphs
+
+Exports the lineage neighborhood of a table as nodes and edges (JSON) or as
+Graphviz DOT, sized for a UI or a terminal instead of the whole warehouse.
+
+The neighborhood is every table within ``depth`` hops upstream and/or
+downstream. When it fits in ``budget`` nodes it is returned as is. Otherwise
+the closest and most critical tables keep their own nodes, and the rest are
+collapsed into one cluster per schema or per producing pipeline. Edges between
+clusters are merged and carry a count.
+
+Every node carries a layered layout: ``layer`` is the signed hop distance
+(upstream negative) and ``position`` its slot within that layer. A client can
+draw the graph without running a layout engine.
+
+Results are cached (LRU) under the lineage version, a hash of the lineage
+data, together with the request parameters. The cache is shared by request
+threads: it is guarded by a lock, and callers get their own copy of a graph.
+"""
+
+import copy
+import json
+import hashlib
+import threading
+from collections import OrderedDict, deque
+from typing import List, Dict, Any, Iterable, Tuple
+
+# Nodes visited per direction before the neighborhood is reported as truncated
+SUBGRAPH_MAX_SCAN = 20000
+SUBGRAPH_CACHE_SIZE = 256
+# Sample of member ids listed on a cluster node
+CLUSTER_SAMPLE = 5
+
+GROUPINGS = ("schema", "pipeline")
+
+
+def lineage_version(lineage_data: Dict[str, Any]) -> str:
+    """Short content hash of the lineage graph."""
+    canonical = json.dumps(
+        {key: lineage_data.get(key, []) for key in ("nodes", "edges", "dashboards", "pipelines")},
+        sort_keys=True, default=str
+    )
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()[:12]
+
+
+def _schema(table: str) -> str:
+    return table.split(".", 1)[0] if "." in table else "default"
+
+
+class SubgraphExporter:
+    """Bounded, optionally clustered lineage neighborhoods with a version-keyed cache."""
+
+    def __init__(
+        self,
+        downstream: Dict[str, List[str]],
+        upstream: Dict[str, List[str]],
+        criticality: Dict[str, float],
+        pipelines_by_table: Dict[str, List[str]],
+        version: str,
+        tables: Iterable[str] = (),
+        cache_size: int = SUBGRAPH_CACHE_SIZE
+    ):
+        self.tables = set(tables)
+        self.downstream = downstream
+        self.upstream = upstream
+        self.criticality = criticality
+        self.pipelines_by_table = pipelines_by_table
+        self.version = version
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def knows(self, table: str) -> bool:
+        return table in self.tables or table in self.downstream or table in self.upstream
+
+    def subgraph(
+        self,
+        table: str,
+        depth: int = 2,
+        direction: str = "both",
+        budget: int = 100,
+        group_by: str = "schema"
+    ) -> Dict[str, Any]:
+        """Neighborhood of ``table`` within ``depth`` hops, clustered beyond ``budget`` nodes.
+
+        Returns a copy the caller may modify; the cached graph is never handed out.
+        """
+        if direction not in ("both", "upstream", "downstream"):
+            raise ValueError(f"Unknown lineage direction: {direction}")
+        if group_by not in GROUPINGS:
+            raise ValueError(f"Unknown grouping: {group_by} (expected one of {', '.join(GROUPINGS)})")
+        if depth < 1 or budget < 2:
+            raise ValueError("depth must be at least 1 and budget at least 2")
+
+        key = (self.version, table, depth, direction, budget, group_by)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.stats["hits"] += 1
+                return copy.deepcopy(cached)
+            self.stats["misses"] += 1
+
+        # Built outside the lock; two threads missing the same key both build it
+        graph = self._build(table, depth, direction, budget, group_by)
+        with self._lock:
+            self._cache[key] = graph
+            self._cache.move_to_end(key)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return copy.deepcopy(graph)
+
+    def _walk(self, table: str, adjacency: Dict[str, List[str]], depth: int, sign: int,
+              layers: Dict[str, int]) -> bool:
+        """BFS recording signed distances into ``layers``; returns False if the scan cap was hit."""
+        queue = deque([(table, 0)])
+        seen = {table}
+        while queue:
+            current, distance = queue.popleft()
+            if distance >= depth:
+                continue
+            for neighbor in adjacency.get(current, []):
+                if neighbor in seen:
+                    continue
+                seen.add(neighbor)
+                if len(seen) > SUBGRAPH_MAX_SCAN:
+                    return False
+                # A table both upstream and downstream (a cycle) keeps its first layer
+                layers.setdefault(neighbor, sign * (distance + 1))
+                queue.append((neighbor, distance + 1))
+        return True
+
+    def _group(self, table: str, group_by: str) -> str:
+        if group_by == "pipeline":
+            pipelines = self.pipelines_by_table.get(table)
+            if pipelines:
+                return f"pipeline:{pipelines[0]}"
+        return f"schema:{_schema(table)}"
+
+    def _build(self, table: str, depth: int, direction: str, budget: int, group_by: str) -> Dict[str, Any]:
+        layers = {table: 0}
+        complete = True
+        if direction in ("both", "upstream"):
+            complete &= self._walk(table, self.upstream, depth, -1, layers)
+        if direction in ("both", "downstream"):
+            complete &= self._walk(table, self.downstream, depth, 1, layers)
+
+        # Closest, then most critical, tables keep their own node
+        ranked = sorted(layers, key=lambda node: (abs(layers[node]), -self.criticality.get(node, 0.0), node))
+        collapsed = len(ranked) > budget
+        if collapsed:
+            detailed = set(ranked[:max(1, budget // 2)])
+            # Upstream and downstream members of a group stay in separate clusters
+            groups: Dict[str, List[str]] = {}
+            for node in ranked:
+                if node not in detailed:
+                    side = "upstream" if layers[node] < 0 else "downstream"
+                    groups.setdefault(f"{side}:{self._group(node, group_by)}", []).append(node)
+            # Keep the largest clusters within the remaining budget; merge the rest into one
+            cluster_slots = budget - len(detailed)
+            ordered = sorted(groups, key=lambda name: (-len(groups[name]), name))
+            if len(ordered) > cluster_slots:
+                overflow = [node for name in ordered[cluster_slots - 1:] for node in groups.pop(name)]
+                groups["other:other"] = overflow
+        else:
+            detailed = set(ranked)
+            groups = {}
+
+        owner = {node: node for node in detailed}
+        for name, members in groups.items():
+            for member in members:
+                owner[member] = f"cluster:{name}"
+
+        nodes = []
+        for node in ranked:
+            if node in detailed:
+                nodes.append({
+                    "id": node,
+                    "kind": "table",
+                    "layer": layers[node],
+                    "criticality": self.criticality.get(node, 0.0),
+                    "focus": node == table
+                })
+        for name, members in groups.items():
+            side, group = name.split(":", 1)
+            nodes.append({
+                "id": f"cluster:{name}",
+                "kind": "cluster",
+                "label": group.split(":", 1)[-1] if side == "other" else f"{group.split(':', 1)[-1]} ({side})",
+                # Clusters sit at their nearest member's layer
+                "layer": min((layers[member] for member in members), key=abs),
+                "size": len(members),
+                "criticality": sum(self.criticality.get(member, 0.0) for member in members),
+                "members": members[:CLUSTER_SAMPLE]
+            })
+
+        # Layout: order each layer by criticality so the important nodes sit on top
+        by_layer: Dict[int, List[Dict[str, Any]]] = {}
+        for node in nodes:
+            by_layer.setdefault(node["layer"], []).append(node)
+        for layer_nodes in by_layer.values():
+            layer_nodes.sort(key=lambda node: (-node["criticality"], node["id"]))
+            for position, node in enumerate(layer_nodes):
+                node["position"] = position
+
+        edge_counts: Dict[Tuple[str, str], int] = {}
+        for source in layers:
+            for target in self.downstream.get(source, []):
+                if target not in layers:
+                    continue
+                edge = (owner[source], owner[target])
+                if edge[0] != edge[1]:
+                    edge_counts[edge] = edge_counts.get(edge, 0) + 1
+        edges = [
+            {"from": source, "to": target, "count": count}
+            for (source, target), count in sorted(edge_counts.items())
+        ]
+
+        return {
+            "table": table,
+            "lineage_version": self.version,
+            "depth": depth,
+            "direction": direction,
+            "budget": budget,
+            "group_by": group_by,
+            "tables": len(layers),
+            "collapsed": collapsed,
+            "complete": complete,
+            "nodes": nodes,
+            "edges": edges
+        }
+
+
+def _dot_id(value: str) -> str:
+    # Backslashes are left alone so \n in labels stays a Graphviz line break
+    return '"' + value.replace('"', '\\"') + '"'
+
+
+def to_dot(graph: Dict[str, Any]) -> str:
+    """Graphviz DOT for a subgraph; layers become ranks, clusters are drawn as folders."""
+    lines = [
+        f"digraph {_dot_id('lineage ' + graph['table'])} {{",
+        "  rankdir=LR;",
+        '  node [shape=box, style="rounded,filled", fillcolor=white, fontname=Helvetica];'
+    ]
+    by_layer: Dict[int, List[Dict[str, Any]]] = {}
+    for node in graph["nodes"]:
+        by_layer.setdefault(node["layer"], []).append(node)
+        if node["kind"] == "cluster":
+            label = f"{node['label']}\\n{node['size']} tables"
+            lines.append(f"  {_dot_id(node['id'])} [shape=folder, fillcolor=lightgrey, label={_dot_id(label)}];")
+        elif node.get("focus"):
+            lines.append(f"  {_dot_id(node['id'])} [fillcolor=salmon, penwidth=2];")
+        elif node["criticality"]:
+            lines.append(f"  {_dot_id(node['id'])} [fillcolor=lightyellow];")
+        else:
+            lines.append(f"  {_dot_id(node['id'])};")
+    for layer in sorted(by_layer):
+        members = " ".join(_dot_id(node["id"]) for node in sorted(by_layer[layer], key=lambda node: node["position"]))
+        lines.append(f"  {{ rank=same; {members} }}")
+    for edge in graph["edges"]:
+        label = f" [label={edge['count']}]" if edge["count"] > 1 else ""
+        lines.append(f"  {_dot_id(edge['from'])} -> {_dot_id(edge['to'])}{label};")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
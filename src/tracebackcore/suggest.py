@@ -0,0 +1,151 @@
+"""
+Traceback Name Suggestions
+
+Prefix autocomplete over lineage table, dashboard and pipeline ids and names,
+ranked by criticality, for use on every keystroke.
+
+Each entity is indexed under several lowercase keys: its id, its name, and
+every suffix starting at a word boundary (``curated.sales_orders`` is also
+found by ``sales`` and ``orders``). The keys are sorted once, so the keys
+matching a prefix form one contiguous range (two bisections). Every key also
+carries a global rank: entity criticality first, then shorter keys. A sparse
+table of range minima over those ranks returns the best key in any range in
+O(1). The top ``k`` entities are then drawn from a small heap of subranges.
+Query cost therefore depends on ``k``, not on how many names share the prefix.
+"""
+
+import re
+import heapq
+import bisect
+from typing import List, Dict, Any, Tuple
+
+import numpy as np
+
+from tracebackcore.impact import REFRESH_WEIGHTS
+
+# Separators that start a new word inside ids and names
+WORD_BOUNDARY = re.compile(r"[._\-\s/]+")
+
+MAX_SUGGESTIONS = 50
+
+
+def index_keys(*surfaces: str) -> List[str]:
+    """Lowercase keys for an entity: each surface form and its word-boundary suffixes."""
+    keys = set()
+    for surface in surfaces:
+        surface = (surface or "").strip().lower()
+        if not surface:
+            continue
+        keys.add(surface)
+        for match in WORD_BOUNDARY.finditer(surface):
+            if match.end() < len(surface):
+                keys.add(surface[match.end():])
+    return sorted(keys)
+
+
+class SuggestIndex:
+    """Sorted prefix index with a range-minimum sparse table over key ranks."""
+
+    def __init__(self, entities: List[Dict[str, Any]]):
+        """Index entities given as dicts with ``id``, ``kind``, ``name`` and ``criticality``."""
+        self.entities = entities
+        entries = [
+            (key, entity_index)
+            for entity_index, entity in enumerate(entities)
+            for key in index_keys(entity["id"], entity.get("name") or "")
+        ]
+        entries.sort()
+        self.keys: List[str] = [key for key, _ in entries]
+        self.key_entities = np.fromiter((entity_index for _, entity_index in entries), dtype=np.int32, count=len(entries))
+
+        # Global rank per key: higher criticality first, then shorter keys, then alphabetical
+        order = sorted(
+            range(len(entries)),
+            key=lambda i: (-entities[entries[i][1]]["criticality"], len(entries[i][0]), entries[i][0])
+        )
+        self.ranks = np.empty(len(entries), dtype=np.int32)
+        self.ranks[order] = np.arange(len(entries), dtype=np.int32)
+        self._levels = self._build_sparse_table(self.ranks)
+
+    @staticmethod
+    def _build_sparse_table(ranks: np.ndarray) -> List[np.ndarray]:
+        """levels[j][i] = position of the minimum rank in ranks[i : i + 2**j]."""
+        levels = [np.arange(len(ranks), dtype=np.int32)]
+        width = 1
+        while width * 2 <= len(ranks):
+            previous = levels[-1]
+            left, right = previous[:-width], previous[width:]
+            levels.append(np.where(ranks[left] <= ranks[right], left, right).astype(np.int32))
+            width *= 2
+        return levels
+
+    @classmethod
+    def from_lineage(cls, lineage_data: Dict[str, Any], criticality: Dict[str, float]) -> "SuggestIndex":
+        """Tables rank by dashboard criticality, dashboards by refresh weight, pipelines by their outputs."""
+        entities = []
+        for node in lineage_data.get("nodes", []):
+            entities.append({
+                "id": node["id"],
+                "kind": node.get("type", "table"),
+                "name": node.get("name") or "",
+                "criticality": criticality.get(node["id"], 0.0),
+            })
+        for dashboard in lineage_data.get("dashboards", []):
+            entities.append({
+                "id": dashboard["id"],
+                "kind": "dashboard",
+                "name": dashboard.get("name") or "",
+                "criticality": REFRESH_WEIGHTS.get(str(dashboard.get("refresh_frequency", "")).lower(), 1.0),
+            })
+        for pipeline in lineage_data.get("pipelines", []):
+            entities.append({
+                "id": pipeline["id"],
+                "kind": "pipeline",
+                "name": pipeline.get("name") or "",
+                "criticality": sum(criticality.get(table, 0.0) for table in pipeline.get("outputs", [])),
+            })
+        return cls(entities)
+
+    def __len__(self) -> int:
+        return len(self.entities)
+
+    def _best(self, lo: int, hi: int) -> int:
+        """Position of the best-ranked key in keys[lo:hi] (hi > lo)."""
+        level = (hi - lo).bit_length() - 1
+        left = self._levels[level][lo]
+        right = self._levels[level][hi - (1 << level)]
+        return int(left if self.ranks[left] <= self.ranks[right] else right)
+
+    def prefix_range(self, prefix: str) -> Tuple[int, int]:
+        """Positions [lo, hi) of the keys starting with ``prefix``."""
+        lo = bisect.bisect_left(self.keys, prefix)
+        hi = bisect.bisect_left(self.keys, prefix + "\uffff", lo)
+        return lo, hi
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Up to ``limit`` distinct entities with a key starting with ``prefix``, best ranked first."""
+        prefix = prefix.strip().lower()
+        limit = max(0, min(limit, MAX_SUGGESTIONS))
+        if not prefix or not limit:
+            return []
+        lo, hi = self.prefix_range(prefix)
+        if lo >= hi:
+            return []
+
+        heap = []
+        best = self._best(lo, hi)
+        heapq.heappush(heap, (int(self.ranks[best]), best, lo, hi))
+        seen = set()
+        results = []
+        while heap and len(results) < limit:
+            _, position, lo, hi = heapq.heappop(heap)
+            for sub_lo, sub_hi in ((lo, position), (position + 1, hi)):
+                if sub_lo < sub_hi:
+                    sub_best = self._best(sub_lo, sub_hi)
+                    heapq.heappush(heap, (int(self.ranks[sub_best]), sub_best, sub_lo, sub_hi))
+            entity_index = int(self.key_entities[position])
+            if entity_index in seen:
+                continue
+            seen.add(entity_index)
+            results.append(dict(self.entities[entity_index], matched=self.keys[position]))
+        return results
@@ -0,0 +1,166 @@
+"""
+Traceback Cache Warming
+
+After ``initialize_system`` the first triage for a table pays cold costs
+(lineage traversals, code and lineage context, LLM calls). The warmer ranks
+tables by how many dashboards they feed (weighted by refresh frequency) and
+precomputes, for the top N, the per-table artifacts every question about the
+table reuses: blast radius and affected assets, producing code documents and
+lineage summaries. It can also precompute full briefs. It runs in a background
+thread with a time budget so it never delays readiness.
+
+Warmed briefs are keyed by question, triage options (single-pass, degraded) and
+lineage version, and expire after ``TRACEBACK_WARMUP_BRIEF_TTL`` seconds.
+"""
+
+import os
+import re
+import time
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+
+from tracebackcore.impact import REFRESH_WEIGHTS
+
+# Question used to warm each table (matches the phrasing on-call engineers use)
+WARMUP_QUESTION = "Job {table} failed — who's impacted?"
+
+
+def normalize_question(question: str) -> str:
+    return re.sub(r"\s+", " ", (question or "").strip().lower())
+
+
+def brief_key(question: str, single_pass: bool, degraded: bool, lineage_version: Optional[str]) -> Tuple:
+    """Key of a warmed brief: the question, the options it ran with and the lineage it saw."""
+    return (normalize_question(question), bool(single_pass), bool(degraded), lineage_version)
+
+
+def rank_critical_tables(lineage_data: Dict[str, Any], find_downstream_impact, top_n: int = 10) -> List[Tuple[str, float]]:
+    """Rank tables by refresh-weighted dashboard fan-out, including dashboards fed downstream."""
+    dashboards_by_table: Dict[str, List[Dict[str, Any]]] = {}
+    for dashboard in lineage_data.get("dashboards", []):
+        for table in dashboard.get("tables", []):
+            dashboards_by_table.setdefault(table, []).append(dashboard)
+
+    tables = [
+        node["id"] for node in lineage_data.get("nodes", [])
+        if node.get("type", "table") == "table" and node.get("id")
+    ]
+    scored = []
+    for table in tables:
+        affected = {table, *find_downstream_impact(table)}
+        seen = {}
+        for affected_table in affected:
+            for dashboard in dashboards_by_table.get(affected_table, []):
+                seen[dashboard["id"]] = dashboard
+        score = sum(
+            REFRESH_WEIGHTS.get(str(dashboard.get("refresh_frequency", "")).lower(), 1.0)
+            for dashboard in seen.values()
+        )
+        if score:
+            # Ties go to tables that feed dashboards directly
+            scored.append((table, score, len(dashboards_by_table.get(table, []))))
+
+    scored.sort(key=lambda item: (-item[1], -item[2], item[0]))
+    return [(table, score) for table, score, _ in scored[:top_n]]
+
+
+class CacheWarmer:
+    """Background warm-up of lineage, retrieval and (optionally) brief caches."""
+
+    def __init__(
+        self,
+        lineage_retriever,
+        traceback_graph=None,
+        create_initial_state=None,
+        top_n: int = 10,
+        budget_seconds: float = 60.0,
+        include_briefs: bool = False,
+        brief_ttl: float = 900.0
+    ):
+        self.lineage_retriever = lineage_retriever
+        self.traceback_graph = traceback_graph
+        self.create_initial_state = create_initial_state
+        self.top_n = top_n
+        self.budget_seconds = budget_seconds
+        self.include_briefs = include_briefs and traceback_graph is not None and create_initial_state is not None
+        self.brief_ttl = brief_ttl
+
+        # brief_key -> (monotonic time warmed, triage result)
+        self.briefs: Dict[Tuple, Tuple[float, Dict[str, Any]]] = {}
+        self.status: Dict[str, Any] = {"state": "idle", "warmed_tables": [], "ranking": [], "errors": []}
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_env(cls, lineage_retriever, traceback_graph=None, create_initial_state=None) -> "CacheWarmer":
+        return cls(
+            lineage_retriever,
+            traceback_graph=traceback_graph,
+            create_initial_state=create_initial_state,
+            top_n=int(os.getenv("TRACEBACK_WARMUP_TOP_N", "10")),
+            budget_seconds=float(os.getenv("TRACEBACK_WARMUP_BUDGET", "60")),
+            include_briefs=os.getenv("TRACEBACK_WARMUP_BRIEFS", "false").lower() in ("1", "true", "yes"),
+            brief_ttl=float(os.getenv("TRACEBACK_WARMUP_BRIEF_TTL", "900")),
+        )
+
+    def get_brief(self, question: str, single_pass: bool, degraded: bool,
+                  lineage_version: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Warmed triage result for this question, options and lineage version, unless expired."""
+        key = brief_key(question, single_pass, degraded, lineage_version)
+        entry = self.briefs.get(key)
+        if entry is None:
+            return None
+        warmed_at, result = entry
+        if time.monotonic() - warmed_at > self.brief_ttl:
+            self.briefs.pop(key, None)
+            return None
+        return result
+
+    def run(self) -> Dict[str, Any]:
+        """Warm caches for the top-N tables until the budget runs out."""
+        start = time.perf_counter()
+        deadline = start + self.budget_seconds
+        self.status.update({"state": "running", "started_at": time.time()})
+
+        ranking = rank_critical_tables(
+            self.lineage_retriever.lineage_data,
+            self.lineage_retriever.find_downstream_impact,
+            self.top_n
+        )
+        self.status["ranking"] = [{"table": table, "score": score} for table, score in ranking]
+
+        for table, _ in ranking:
+            if time.perf_counter() >= deadline:
+                self.status["state"] = "budget_exhausted"
+                break
+            question = WARMUP_QUESTION.format(table=table)
+            try:
+                self.lineage_retriever.find_upstream_dependencies(table)
+                self.lineage_retriever.find_affected_assets([table])
+                # Keyed on the linked table, not the wording, so any question about it hits
+                self.lineage_retriever.code_documents([table])
+                self.lineage_retriever.lineage_summaries([table])
+
+                if self.include_briefs and time.perf_counter() < deadline:
+                    state = self.create_initial_state(question)
+                    result = self.traceback_graph.invoke(state)
+                    if not result.get("error"):
+                        key = brief_key(
+                            question, state["single_pass"], state["degraded"],
+                            getattr(self.lineage_retriever, "lineage_version", None)
+                        )
+                        self.briefs[key] = (time.monotonic(), result)
+                self.status["warmed_tables"].append(table)
+            except Exception as e:
+                self.status["errors"].append(f"{table}: {str(e)}")
+        else:
+            self.status["state"] = "complete"
+
+        self.status["elapsed"] = time.perf_counter() - start
+        self.status["briefs"] = len(self.briefs)
+        return self.status
+
+    def start_background(self) -> threading.Thread:
+        """Run the warm-up in a daemon thread."""
+        self._thread = threading.Thread(target=self.run, name="cache-warmer", daemon=True)
+        self._thread.start()
+        return self._thread
@@ -0,0 +1,394 @@
+"""
+Traceback Alert Watcher
+
+Consumes alert events continuously and triages them before anyone asks:
+
+    source  ->  dedup (sliding window)  ->  group by table  ->  worker pool  ->  sink
+
+Sources yield alert dicts: a JSONL file (optionally followed like ``tail -f``),
+stdin, or any queue adapter class given as ``module:Class`` that implements
+``AlertSource``. An alert needs a ``message`` (or ``question``); ``table``,
+``id``, ``priority``, ``timestamp`` and ``dedup_key`` are optional, and a
+missing table is linked from the message.
+
+Duplicate alerts (same dedup key) inside the window are dropped. Alerts for the
+same table that arrive within the grouping window become one triage. The pool
+runs at most ``workers`` triages with ``queue_size`` more waiting; when both
+are full the reader stops pulling from the source, so a slow LLM applies
+backpressure instead of growing memory. Each triage runs under its own request
+deadline, as API requests do. Briefs go to a JSONL file, stdout, or one
+markdown file per brief in a directory. Diagnostics go to stderr so they
+never mix with briefs written to stdout.
+"""
+
+import re
+import sys
+import json
+import time
+import queue
+import hashlib
+import importlib
+import threading
+import statistics
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Callable, Iterator
+
+from tracebackcore import deadlines
+from tracebackcore.scheduler import PRIORITY_RANK, normalize_priority
+
+# Grouping key for alerts no table could be linked to
+UNLINKED = "unlinked"
+
+_END = object()
+
+
+class AlertSource:
+    """Base class for alert sources; iterate to receive alert dicts."""
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def ack(self, alert: Dict[str, Any]):
+        """Called once an alert has been triaged (or dropped as a duplicate)."""
+
+    def close(self):
+        pass
+
+
+class JSONLSource(AlertSource):
+    """Alerts from a JSONL file, or stdin for ``-``; ``follow`` keeps reading appended lines."""
+
+    def __init__(self, path: str = "-", follow: bool = False, poll_interval: float = 0.5):
+        self.path = path
+        self.follow = follow and path != "-"
+        self.poll_interval = poll_interval
+        self._closed = threading.Event()
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        stream = sys.stdin if self.path == "-" else open(self.path, "r", encoding="utf-8")
+        try:
+            while not self._closed.is_set():
+                line = stream.readline()
+                if not line:
+                    if not self.follow:
+                        return
+                    time.sleep(self.poll_interval)
+                    continue
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    alert = json.loads(line)
+                except json.JSONDecodeError:
+                    alert = {"message": line}
+                if isinstance(alert, dict):
+                    yield alert
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+    def close(self):
+        self._closed.set()
+
+
+def load_source(spec: str, follow: bool = False) -> AlertSource:
+    """``-`` (stdin), a JSONL path, or ``module:Class`` for a queue adapter."""
+    if spec != "-" and ":" in spec and not Path(spec).exists():
+        module_name, class_name = spec.split(":", 1)
+        return getattr(importlib.import_module(module_name), class_name)()
+    return JSONLSource(spec, follow=follow)
+
+
+class BriefSink:
+    """Writes triage results as JSONL (file or stdout) or markdown files in a directory."""
+
+    def __init__(self, target: str = "-"):
+        self.target = target
+        self._lock = threading.Lock()
+        self._directory = None
+        self._stream = None
+        self._owns_stream = False
+        if target == "-":
+            self._stream = sys.stdout
+        elif target.endswith(".jsonl") or target.endswith(".json"):
+            Path(target).parent.mkdir(parents=True, exist_ok=True)
+            self._stream = open(target, "a", encoding="utf-8")
+            self._owns_stream = True
+        else:
+            self._directory = Path(target)
+            self._directory.mkdir(parents=True, exist_ok=True)
+
+    def write(self, record: Dict[str, Any]):
+        with self._lock:
+            if self._directory is not None:
+                # The table comes from the alert, so keep it from adding path separators
+                table = re.sub(r"[^A-Za-z0-9._-]", "_", str(record["table"]))
+                name = f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime(record['finished_at']))}_{table}_{record['triage_id'][:8]}.md"
+                with open(self._directory / name, "w", encoding="utf-8") as f:
+                    f.write(f"# {record['table']} ({record['priority']})\n\n")
+                    f.write(f"Alerts: {record['alerts']} | Triage ID: {record['triage_id']}\n\n")
+                    f.write(record.get("incident_brief") or f"Triage failed: {record.get('error')}")
+                    f.write("\n")
+            else:
+                self._stream.write(json.dumps(record, default=str) + "\n")
+                self._stream.flush()
+
+    def close(self):
+        # sys.stdout may be redirected by now, so only close a file this sink opened
+        if self._owns_stream:
+            self._stream.close()
+
+
+def alert_time(alert: Dict[str, Any], default: float) -> float:
+    """Alert ``timestamp`` as epoch seconds (accepts numbers and ISO 8601), else ``default``."""
+    value = alert.get("timestamp")
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            pass
+    return default
+
+
+class Deduplicator:
+    """Drops alerts whose key was already seen within the last ``window`` seconds."""
+
+    def __init__(self, window: float):
+        self.window = window
+        self._seen: "OrderedDict[str, float]" = OrderedDict()
+
+    @staticmethod
+    def key(alert: Dict[str, Any], table: str) -> str:
+        if alert.get("dedup_key"):
+            return str(alert["dedup_key"])
+        message = " ".join(str(alert.get("message") or alert.get("question") or "").lower().split())
+        return hashlib.sha256(f"{table}|{message}".encode("utf-8")).hexdigest()
+
+    def is_duplicate(self, key: str, now: float) -> bool:
+        # Keys are kept in first-seen order, so expired ones are at the front
+        while self._seen and next(iter(self._seen.values())) < now - self.window:
+            self._seen.popitem(last=False)
+        if key in self._seen:
+            return True
+        self._seen[key] = now
+        return False
+
+
+class AlertGroup:
+    """Alerts for one table collected during the grouping window."""
+
+    def __init__(self, table: str, opened_at: float):
+        self.table = table
+        self.opened_at = opened_at
+        self.alerts: List[Dict[str, Any]] = []
+        self.first_alert_at = opened_at
+
+    def add(self, alert: Dict[str, Any], received_at: float):
+        self.alerts.append(alert)
+        self.first_alert_at = min(self.first_alert_at, alert_time(alert, received_at))
+
+    @property
+    def priority(self) -> str:
+        return min((normalize_priority(alert.get("priority")) for alert in self.alerts), key=PRIORITY_RANK.get)
+
+    def question(self) -> str:
+        messages = []
+        for alert in self.alerts:
+            message = str(alert.get("message") or alert.get("question") or "").strip()
+            if message and message not in messages:
+                messages.append(message)
+        if self.table == UNLINKED:
+            return "; ".join(messages)
+        return f"{len(self.alerts)} alert(s) on {self.table}: " + "; ".join(messages)
+
+
+class WatchStats:
+    """Throughput and lag (first alert to brief written) of a watch session."""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.counts = {"received": 0, "duplicates": 0, "groups": 0, "triaged": 0, "failed": 0}
+        self.lags: List[float] = []
+        self._lock = threading.Lock()
+
+    def count(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counts[name] += amount
+
+    def record_lag(self, lag: float):
+        with self._lock:
+            self.lags.append(lag)
+
+    def snapshot(self, in_flight: int = 0) -> Dict[str, Any]:
+        with self._lock:
+            elapsed = max(time.time() - self.started_at, 1e-9)
+            lags = sorted(self.lags)
+            return {
+                **self.counts,
+                "in_flight": in_flight,
+                "elapsed_seconds": elapsed,
+                "triages_per_minute": (self.counts["triaged"] + self.counts["failed"]) * 60 / elapsed,
+                "mean_lag_seconds": statistics.mean(lags) if lags else None,
+                "p95_lag_seconds": lags[min(len(lags) - 1, int(len(lags) * 0.95))] if lags else None,
+                "max_lag_seconds": lags[-1] if lags else None,
+            }
+
+
+class AlertWatcher:
+    """Runs the dedup -> group -> triage pipeline over an ``AlertSource``."""
+
+    def __init__(
+        self,
+        source: AlertSource,
+        sink: BriefSink,
+        triage: Callable[[str, str], Dict[str, Any]],
+        find_tables: Callable[[str], List[str]],
+        workers: int = 2,
+        queue_size: int = 8,
+        dedup_window: float = 300.0,
+        group_window: float = 5.0,
+        max_group_size: int = 20,
+        report_interval: float = 30.0,
+        report: Optional[Callable[[Dict[str, Any]], None]] = None,
+        timeout: Optional[float] = None
+    ):
+        self.source = source
+        self.sink = sink
+        self.triage = triage
+        self.find_tables = find_tables
+        self.workers = workers
+        self.group_window = group_window
+        self.max_group_size = max_group_size
+        self.report_interval = report_interval
+        self.report = report
+        self.timeout = timeout
+        self.dedup = Deduplicator(dedup_window)
+        self.stats = WatchStats()
+        self.groups: Dict[str, AlertGroup] = {}
+        # Reader -> main loop hand-off; bounded so a stalled pool stops the reader
+        self._inbox: "queue.Queue" = queue.Queue(maxsize=max(1, queue_size))
+        # Slots for running plus waiting triages
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._in_flight = 0
+        self._in_flight_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def _read(self):
+        try:
+            for alert in self.source:
+                if self._stop.is_set():
+                    break
+                self._inbox.put((alert, time.time()))
+        except Exception as e:
+            print(f"⚠️ Alert source failed: {e}", file=sys.stderr)
+        finally:
+            self._inbox.put(_END)
+
+    def stop(self):
+        self._stop.set()
+        self.source.close()
+
+    def run(self) -> Dict[str, Any]:
+        """Consume until the source ends (or ``stop``); returns the final stats."""
+        reader = threading.Thread(target=self._read, name="alert-reader", daemon=True)
+        reader.start()
+        next_report = time.time() + self.report_interval
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="watch-triage") as pool:
+            while True:
+                try:
+                    item = self._inbox.get(timeout=self._next_timeout())
+                except queue.Empty:
+                    item = None
+                if item is _END:
+                    break
+                if item is not None:
+                    self._accept(*item, pool=pool)
+                self._flush(pool, force=False)
+                if self.report and time.time() >= next_report:
+                    self.report(self.get_stats())
+                    next_report = time.time() + self.report_interval
+            self._flush(pool, force=True)
+        self.sink.close()
+        return self.get_stats()
+
+    def _next_timeout(self) -> float:
+        if not self.groups:
+            return min(self.report_interval, 1.0)
+        oldest = min(group.opened_at for group in self.groups.values())
+        return max(0.01, oldest + self.group_window - time.time())
+
+    def _accept(self, alert: Dict[str, Any], received_at: float, pool: ThreadPoolExecutor):
+        self.stats.count("received")
+        message = str(alert.get("message") or alert.get("question") or "")
+        table = alert.get("table") or next(iter(self.find_tables(message)), UNLINKED)
+        if self.dedup.is_duplicate(Deduplicator.key(alert, table), received_at):
+            self.stats.count("duplicates")
+            self.source.ack(alert)
+            return
+        group = self.groups.get(table)
+        if group is None:
+            group = self.groups[table] = AlertGroup(table, received_at)
+        group.add(alert, received_at)
+        if len(group.alerts) >= self.max_group_size:
+            self._submit(self.groups.pop(table), pool)
+
+    def _flush(self, pool: ThreadPoolExecutor, force: bool):
+        now = time.time()
+        for table in [table for table, group in self.groups.items() if force or now - group.opened_at >= self.group_window]:
+            self._submit(self.groups.pop(table), pool)
+
+    def _submit(self, group: AlertGroup, pool: ThreadPoolExecutor):
+        # Blocks while every worker is busy and the wait queue is full (backpressure)
+        self._slots.acquire()
+        self.stats.count("groups")
+        with self._in_flight_lock:
+            self._in_flight += 1
+        pool.submit(self._run_group, group)
+
+    def _run_group(self, group: AlertGroup):
+        started_at = time.time()
+        record = {
+            "table": group.table,
+            "priority": group.priority,
+            "alerts": len(group.alerts),
+            "alert_ids": [alert.get("id") for alert in group.alerts if alert.get("id") is not None],
+            "question": group.question(),
+            "first_alert_at": group.first_alert_at,
+            "started_at": started_at,
+        }
+        try:
+            # Same budget as an API request: the caller's timeout, capped by TRACEBACK_TRIAGE_DEADLINE
+            with deadlines.request_deadline(deadlines.budget(self.timeout)):
+                result = self.triage(record["question"], record["priority"])
+            record.update({
+                "triage_id": result.get("triage_id") or "",
+                "incident_brief": result.get("incident_brief", ""),
+                "blast_radius": result.get("blast_radius", []),
+                "affected_assets": result.get("affected_assets"),
+                "error": result.get("error"),
+            })
+        except Exception as e:
+            record.update({"triage_id": "", "incident_brief": "", "error": str(e)})
+        record["finished_at"] = time.time()
+        record["lag_seconds"] = record["finished_at"] - group.first_alert_at
+        try:
+            self.sink.write(record)
+        except Exception as e:
+            print(f"⚠️ Failed to write brief for {group.table}: {e}", file=sys.stderr)
+        self.stats.count("failed" if record.get("error") else "triaged")
+        self.stats.record_lag(record["lag_seconds"])
+        for alert in group.alerts:
+            self.source.ack(alert)
+        with self._in_flight_lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._in_flight_lock:
+            in_flight = self._in_flight
+        return self.stats.snapshot(in_flight=in_flight)
@@ -0,0 +1,77 @@
+"""Circuit breakers only count provider-side failures, not a caller's own deadline."""
+
+import time
+
+import httpx
+import openai
+import pytest
+
+from tracebackcore import deadlines
+from tracebackcore.deadlines import CircuitBreaker, DeadlineExceeded, ProviderError, ProviderUnavailable
+
+
+def slow_provider():
+    time.sleep(0.3)
+    return "answer"
+
+
+def test_short_request_deadline_leaves_breaker_closed():
+    circuit = CircuitBreaker("test", failure_threshold=2, reset_timeout=30)
+    for _ in range(5):
+        with deadlines.request_deadline(0.02):
+            with pytest.raises(DeadlineExceeded):
+                circuit.call(slow_provider)
+
+    stats = circuit.snapshot()
+    assert stats["state"] == "closed"
+    assert stats["failures"] == 0
+    assert stats["abandoned"] == 5
+    # The next caller with a normal budget still reaches the provider
+    with deadlines.request_deadline(5):
+        assert circuit.call(slow_provider) == "answer"
+
+
+def test_provider_timeouts_open_the_breaker():
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+
+    def timing_out():
+        raise openai.APITimeoutError(request)
+
+    circuit = CircuitBreaker("test", failure_threshold=2, reset_timeout=30)
+    for _ in range(2):
+        with pytest.raises(ProviderError):
+            circuit.call(timing_out)
+
+    stats = circuit.snapshot()
+    assert stats["state"] == "open"
+    assert stats["timeouts"] == 2
+    with pytest.raises(ProviderUnavailable):
+        circuit.call(slow_provider)
+
+
+def test_client_errors_do_not_count():
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+
+    def bad_request():
+        raise openai.BadRequestError("bad", response=httpx.Response(400, request=request), body=None)
+
+    circuit = CircuitBreaker("test", failure_threshold=1, reset_timeout=30)
+    with pytest.raises(openai.BadRequestError):
+        circuit.call(bad_request)
+    assert circuit.snapshot()["state"] == "closed"
+
+
+def test_query_embeddings_are_reused():
+    class CountingEmbeddings:
+        calls = 0
+
+        def embed_query(self, text):
+            CountingEmbeddings.calls += 1
+            return [float(len(text)), 1.0]
+
+    embeddings = deadlines.GuardedEmbeddings(CountingEmbeddings(), query_cache_size=1)
+    assert embeddings.embed_query("curated.sales_orders is late") == embeddings.embed_query("curated.sales_orders is late")
+    assert CountingEmbeddings.calls == 1
+    embeddings.embed_query("another question")
+    embeddings.embed_query("curated.sales_orders is late")
+    assert CountingEmbeddings.calls == 3
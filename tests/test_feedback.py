@@ -0,0 +1,47 @@
+"""Importing the notebook feedback log is idempotent."""
+
+import json
+import sqlite3
+
+from tracebackcore.feedback import FeedbackStore
+
+LEGACY = {
+    "feedback_entries": [
+        {"question": "Job curated.sales_orders failed", "query_type": "hybrid", "response": "brief",
+         "timestamp": "2025-01-10T08:30:00.123", "user_feedback": {"rating": 4}},
+        {"question": "Why is revenue_summary late?", "query_type": "naive", "response": "brief"},
+    ]
+}
+
+
+def test_reimport_adds_nothing(tmp_path):
+    legacy_file = tmp_path / "feedback_log.json"
+    legacy_file.write_text(json.dumps(LEGACY))
+    store = FeedbackStore(tmp_path / "feedback.db")
+    try:
+        assert store.import_legacy_json(legacy_file) == 2
+        assert store.import_legacy_json(legacy_file) == 0
+        assert store.count() == 2
+    finally:
+        store.close()
+
+
+def test_existing_duplicates_are_removed_when_keys_are_added(tmp_path):
+    path = tmp_path / "feedback.db"
+    store = FeedbackStore(path)
+    store.close()
+    conn = sqlite3.connect(str(path))
+    conn.executescript("DROP INDEX idx_feedback_entry; DROP INDEX idx_feedback_tables_entry;")
+    for entry_id in ("a", "b"):
+        conn.execute("INSERT INTO feedback (id, kind, timestamp, question_hash) VALUES (?, 'interaction', 1.0, 'q')", (entry_id,))
+        conn.execute("INSERT INTO feedback_tables (feedback_id, table_id, timestamp) VALUES (?, 'curated.sales_orders', 1.0)", (entry_id,))
+    conn.commit()
+    conn.close()
+
+    store = FeedbackStore(path)
+    try:
+        assert store.count() == 1
+        assert store.lookup(table="curated.sales_orders")[0]["id"] == "a"
+        assert len(store.lookup(table="curated.sales_orders")) == 1
+    finally:
+        store.close()
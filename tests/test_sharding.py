@@ -0,0 +1,47 @@
+"""Routed shard searches are topped up from the other shards when they return fewer than k hits."""
+
+from langchain.schema import Document
+from qdrant_client import QdrantClient
+
+from tracebackcore.benchmarks.fakes import FakeEmbeddings
+from tracebackcore.sharding import ShardedVectorStore
+
+
+class FixedRouter:
+    def __init__(self, domains):
+        self.domains = domains
+
+    def add_domain(self, domain):
+        pass
+
+    def route(self, query, shards):
+        return [domain for domain in self.domains if domain in shards]
+
+
+def build_store(router):
+    store = ShardedVectorStore(QdrantClient(":memory:"), FakeEmbeddings(dimensions=64), dimensions=64, router=router)
+    documents = [Document(page_content=f"hr headcount report {i}", metadata={"pipeline": "hr_analytics_pipeline"}) for i in range(2)]
+    documents += [Document(page_content=f"sales orders load {i}", metadata={"pipeline": "sales_orders_pipeline"}) for i in range(6)]
+    documents += [Document(page_content="incident playbook", metadata={})]
+    store.add_documents(documents)
+    return store
+
+
+def test_underfilled_routed_search_is_topped_up():
+    store = build_store(FixedRouter(["general", "hr_analytics"]))
+    results = store.similarity_search_with_score("hr headcount report", k=6)
+
+    assert len(results) == 6
+    assert store.stats["topped_up"] == 1
+    # Routed hits still rank first, and scores stay sorted after the merge
+    assert results[0][0].metadata["pipeline"] == "hr_analytics_pipeline"
+    assert [score for _, score in results] == sorted((score for _, score in results), reverse=True)
+
+
+def test_filled_routed_search_is_not_topped_up():
+    store = build_store(FixedRouter(["sales_orders"]))
+    results = store.similarity_search_with_score("sales orders load", k=4)
+
+    assert len(results) == 4
+    assert store.stats["topped_up"] == 0
+    assert {doc.metadata["pipeline"] for doc, _ in results} == {"sales_orders_pipeline"}
@@ -0,0 +1,25 @@
+"""Warm-up caches per-table context, so questions worded differently from the warm-up still hit."""
+
+from tracebackcore.benchmarks.fakes import install_fake_providers
+
+install_fake_providers()
+
+from tracebackcore import core  # noqa: E402
+from tracebackcore.core import LineageAwareRetriever  # noqa: E402
+from tracebackcore.warmup import CacheWarmer  # noqa: E402
+
+
+def test_differently_worded_question_hits_warm_context():
+    retriever = LineageAwareRetriever(
+        core.vectorstore, core.lineage_retriever.lineage_data, index=core.lineage_retriever.build_index()
+    )
+    status = CacheWarmer(retriever, top_n=3).run()
+    table = status["warmed_tables"][0]
+
+    misses = retriever.cache_stats["context_misses"]
+    hits = retriever.cache_stats["context_hits"]
+    retriever.search_with_lineage(f"why is {table} missing rows since 6am?", k=4)
+
+    # Code documents and lineage summaries both come from the warmed table's entries
+    assert retriever.cache_stats["context_misses"] == misses
+    assert retriever.cache_stats["context_hits"] == hits + 2
@@ -0,0 +1,45 @@
+"""Watcher briefs: safe file names from alert tables and a request deadline per triage."""
+
+from tracebackcore import deadlines
+from tracebackcore.watch import AlertWatcher, AlertSource, BriefSink
+
+
+class ListSource(AlertSource):
+    def __init__(self, alerts):
+        self.alerts = alerts
+
+    def __iter__(self):
+        return iter(self.alerts)
+
+
+def test_brief_file_name_is_sanitized(tmp_path):
+    sink = BriefSink(str(tmp_path / "briefs"))
+    sink.write({
+        "table": "../../etc/cron.d x", "priority": "high", "alerts": 1,
+        "triage_id": "abcdef0123", "finished_at": 0, "incident_brief": "brief",
+    })
+
+    written = list((tmp_path / "briefs").iterdir())
+    assert len(written) == 1
+    assert written[0].name == "19700101T000000_.._.._etc_cron.d_x_abcdef01.md"
+
+
+def test_each_triage_runs_under_a_deadline(tmp_path):
+    budgets = []
+
+    def triage(question, priority):
+        budgets.append(deadlines.remaining())
+        return {"triage_id": "t1", "incident_brief": "brief"}
+
+    watcher = AlertWatcher(
+        ListSource([{"message": "curated.sales_orders failed", "table": "curated.sales_orders"}]),
+        BriefSink(str(tmp_path / "briefs.jsonl")),
+        triage=triage,
+        find_tables=lambda text: [],
+        group_window=0.01,
+        timeout=5
+    )
+    stats = watcher.run()
+
+    assert stats["triaged"] == 1
+    assert budgets[0] is not None and 0 < budgets[0] <= 5
@@ -1,42 +1,194 @@
 #!/usr/bin/env python3
 """
 Simple HTTP server to serve the Traceback Web UI
+
+Requests are served concurrently (one thread per connection) with strong ETags
+(one per content encoding, e.g. ``"<hash>-gzip"``), Cache-Control headers and gzip/brotli compression. Precompressed ``.gz``/``.br``
+siblings are used when present; run ``python server.py --precompress`` to build them.
 """
 
+import gzip
+import hashlib
 import http.server
-import socketserver
-import webbrowser
 import os
+import re
+import threading
+import webbrowser
+from email.utils import formatdate
 from pathlib import Path
+from urllib.parse import urlsplit, parse_qs
+
+try:
+    import brotli  # Optional: enables .br precompression
+except ImportError:
+    brotli = None
+
+# Content types worth compressing
+COMPRESSIBLE_SUFFIXES = {".html", ".css", ".js", ".json", ".svg", ".txt", ".md", ".map"}
+
+# Assets with a content hash in the name (app.3f9a1c2e.js) never change
+VERSIONED_NAME = re.compile(r"\.[0-9a-f]{8,}\.[a-z0-9]+$")
+
+# Long-lived caching for versioned assets, revalidation for everything else
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+
+
+def precompress_assets(web_ui_dir: Path):
+    """Write .gz (and .br when brotli is installed) next to each compressible asset."""
+    for asset in web_ui_dir.rglob("*"):
+        if not asset.is_file() or asset.suffix not in COMPRESSIBLE_SUFFIXES:
+            continue
+        data = asset.read_bytes()
+        asset.with_name(asset.name + ".gz").write_bytes(gzip.compress(data, compresslevel=9, mtime=0))
+        if brotli is not None:
+            asset.with_name(asset.name + ".br").write_bytes(brotli.compress(data, quality=11))
+        print(f"📦 Precompressed {asset.relative_to(web_ui_dir)}")
+    if brotli is None:
+        print("⚠️  brotli not installed, only gzip assets were written")
+
+
+class AssetCache:
+    """In-memory cache of file bodies, ETags and compressed variants keyed by (path, mtime, size)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get(self, path: Path):
+        stat = path.stat()
+        key = (str(path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            entry = self._entries.get(str(path))
+            if entry and entry["key"] == key:
+                return entry
+
+        data = path.read_bytes()
+        entry = {
+            "key": key,
+            "identity": data,
+            "hash": hashlib.sha256(data).hexdigest()[:32],
+            "last_modified": formatdate(stat.st_mtime, usegmt=True),
+            "encodings": {},
+        }
+        # Prefer precompressed siblings written by --precompress, if they are current
+        for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+            sibling = path.with_name(path.name + suffix)
+            if sibling.exists() and sibling.stat().st_mtime_ns >= stat.st_mtime_ns:
+                entry["encodings"][encoding] = sibling.read_bytes()
+        if "gzip" not in entry["encodings"] and path.suffix in COMPRESSIBLE_SUFFIXES:
+            entry["encodings"]["gzip"] = gzip.compress(data, compresslevel=6, mtime=0)
+
+        with self._lock:
+            self._entries[str(path)] = entry
+        return entry
+
+
+def entity_tag(entry, encoding=None):
+    """Strong ETag of one representation; each content encoding gets its own."""
+    return '"' + entry["hash"] + (f"-{encoding}" if encoding else "") + '"'
+
+
+def accepted_encodings(header: str):
+    """Parse Accept-Encoding into the set of encodings with a non-zero q value."""
+    encodings = set()
+    for part in (header or "").split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        encodings.add(name.strip().lower())
+    return encodings
+
 
 def serve_web_ui(port=3000):
     """Serve the web UI on the specified port."""
-    
+
     # The script is already in the web_ui directory
-    web_ui_dir = Path(__file__).parent
+    web_ui_dir = Path(__file__).parent.resolve()
     os.chdir(web_ui_dir)
-    
+    asset_cache = AssetCache()
+
     # Create a custom handler to serve index.html for root requests
     class CustomHandler(http.server.SimpleHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
         def do_GET(self):
-            if self.path == '/':
-                self.path = '/index.html'
-            return super().do_GET()
-    
-    # Start the server
-    with socketserver.TCPServer(("", port), CustomHandler) as httpd:
+            self.send_asset(include_body=True)
+
+        def do_HEAD(self):
+            self.send_asset(include_body=False)
+
+        def send_asset(self, include_body: bool):
+            url = urlsplit(self.path)
+            if url.path == '/':
+                self.path = '/index.html' + (f"?{url.query}" if url.query else "")
+                url = urlsplit(self.path)
+
+            path = Path(self.translate_path(url.path))
+            if not path.is_file() or path.suffix in (".gz", ".br") or web_ui_dir not in path.resolve().parents:
+                # Directories, missing files and raw compressed siblings
+                self.send_error(404, "File not found")
+                return
+
+            entry = asset_cache.get(path)
+            versioned = "v" in parse_qs(url.query) or bool(VERSIONED_NAME.search(path.name))
+
+            # Pick the representation first: its ETag depends on the encoding
+            body = entry["identity"]
+            encoding = None
+            accepted = accepted_encodings(self.headers.get("Accept-Encoding"))
+            for candidate in ("br", "gzip"):
+                if candidate in accepted and candidate in entry["encodings"]:
+                    body = entry["encodings"][candidate]
+                    encoding = candidate
+                    break
+            etag = entity_tag(entry, encoding)
+
+            headers = {
+                "ETag": etag,
+                "Last-Modified": entry["last_modified"],
+                "Cache-Control": IMMUTABLE_CACHE if versioned else REVALIDATE_CACHE,
+                "Vary": "Accept-Encoding",
+            }
+
+            if encoding:
+                headers["Content-Encoding"] = encoding
+
+            # If-None-Match uses weak comparison, so a W/ prefix added by a proxy still matches
+            if_none_match = self.headers.get("If-None-Match", "")
+            tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            if etag in tags or if_none_match.strip() == "*":
+                self.send_response(304)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", self.guess_type(str(path)))
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            if include_body:
+                self.wfile.write(body)
+
+    # Start the server (one thread per connection so slow clients don't block others)
+    with http.server.ThreadingHTTPServer(("", port), CustomHandler) as httpd:
         print(f"🌐 Traceback Web UI server starting...")
         print(f"📱 Web UI available at: http://localhost:{port}")
         print(f"🔗 Make sure the Traceback API is running at: http://localhost:8000")
         print(f"⏹️  Press Ctrl+C to stop the server")
-        
+
         # Try to open the browser automatically
         try:
             webbrowser.open(f'http://localhost:{port}')
             print(f"🚀 Browser opened automatically")
         except:
             print(f"⚠️  Could not open browser automatically")
-        
+
         try:
             httpd.serve_forever()
         except KeyboardInterrupt:
@@ -44,12 +196,19 @@ def serve_web_ui(port=3000):
 
 if __name__ == "__main__":
     import sys
-    
+
+    args = sys.argv[1:]
+    if "--precompress" in args:
+        precompress_assets(Path(__file__).parent)
+        args.remove("--precompress")
+        if not args:
+            sys.exit(0)
+
     port = 3000
-    if len(sys.argv) > 1:
+    if len(args) > 0:
         try:
-            port = int(sys.argv[1])
+            port = int(args[0])
         except ValueError:
             print("Invalid port number. Using default port 3000.")
-    
+
     serve_web_ui(port)